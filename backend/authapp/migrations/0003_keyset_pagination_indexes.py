@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("authapp", "0002_user_gender_alter_user_email"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["user_type", "username"], name="authapp_use_user_ty_5b1437_idx"
+            ),
+        ),
+    ]
@@ -71,6 +71,13 @@ class User(AbstractUser):
         default=Gender.MALE
     )
 
+    # The player list pages through players in username order,
+    # so this index lets each page start right where the previous one ended.
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["user_type", "username"]),
+        ]
+
     # This special method controls what gets shown when you print a User object.
     # For example, in Django admin, shell, or logs,
     # instead of seeing something unclear like "User object (1)",
@@ -0,0 +1,31 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def validator_etag(*parts):
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12)
+    return quote_etag(digest.hexdigest())
+
+
+def conditional_response(request, build, etag_parts, last_modified=None):
+    """
+    Return 304 Not Modified when the request's If-None-Match or
+    If-Modified-Since matches, otherwise build() the response and attach the
+    validators. Compute etag_parts from a cheap aggregate (max(updated_at),
+    counts, versions) so unchanged polls never serialize anything.
+    """
+    etag = validator_etag(request.get_full_path(), *etag_parts)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if not_modified is not None:
+        return not_modified
+
+    response = build()
+    if 200 <= response.status_code < 300:
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+    return response
@@ -0,0 +1,178 @@
+import base64
+import binascii
+import datetime as dt
+import json
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def ordering_keys(queryset):
+    """
+    Return [(field, descending), ...] for the queryset's ordering with a
+    primary key tiebreaker appended, so every row has a unique position.
+    """
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+
+    keys = []
+    for entry in ordering:
+        if not isinstance(entry, str):
+            raise TypeError("Keyset pagination only supports ordering by field names.")
+        descending = entry.startswith("-")
+        keys.append((entry.lstrip("-"), descending))
+
+    pk_names = {"pk", queryset.model._meta.pk.name}
+    if not any(field in pk_names for field, _ in keys):
+        keys.append(("pk", keys[0][1] if keys else False))
+    return keys
+
+
+def key_value(obj, field):
+    if isinstance(obj, dict):
+        # Rows from .values() must include every ordering field by name.
+        return obj[field]
+    for attr in field.split("__"):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def encode_value(value):
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def seek_q(keys, values, backwards=False):
+    """
+    Rows strictly after `values` in `keys` order (before them when
+    backwards). Expands the row comparison into OR-ed prefixes and repeats
+    the leading bound so the planner can range-scan the composite index.
+    """
+    def op(descending, inclusive=False):
+        greater = descending == backwards
+        return ("gte" if inclusive else "gt") if greater else ("lte" if inclusive else "lt")
+
+    after = Q()
+    equal = {}
+    for (field, descending), value in zip(keys, values):
+        after |= Q(**equal, **{f"{field}__{op(descending)}": value})
+        equal[field] = value
+
+    first_field, first_descending = keys[0]
+    return Q(**{f"{first_field}__{op(first_descending, True)}": values[0]}) & after
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the queryset's own ordering. Cursors carry the
+    sort key of the boundary row, so every page is an index seek plus a
+    LIMIT regardless of how deep the client has paged.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = ordering_keys(queryset)
+
+        values, backwards = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(seek_q(self.keys, values, backwards))
+        queryset = queryset.order_by(*(
+            field if descending == backwards else f"-{field}"
+            for field, descending in self.keys
+        ))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        if backwards:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            values = payload["v"]
+            backwards = bool(payload.get("r"))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        return values, backwards
+
+    def encode_cursor(self, obj, backwards=False):
+        payload = {"v": [encode_value(key_value(obj, field)) for field, _ in self.keys]}
+        if backwards:
+            payload["r"] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token.decode("ascii"))
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+def paginated_response(request, queryset, serializer_class, view=None, context=None):
+    """Paginate and serialize a queryset for views that don't use GenericAPIView.list."""
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    serializer = serializer_class(page, many=True, context=context or {"request": request})
+    return paginator.get_paginated_response(serializer.data)
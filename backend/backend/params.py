@@ -0,0 +1,11 @@
+import datetime as dt
+
+
+def parse_date_param(value):
+    """
+    Parse a YYYY-MM-DD query parameter. Returns None when it is missing and
+    raises ValueError for anything that is not a real date, 2026-02-30 included.
+    """
+    if not value:
+        return None
+    return dt.datetime.strptime(value, "%Y-%m-%d").date()
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third party
     "rest_framework",
@@ -89,6 +90,28 @@ DATABASES = {
     }
 }
 
+# Cache
+# Payment intents and slot grids live here. Set REDIS_URL when running more
+# than one worker so they share one cache; give the Redis server a maxmemory
+# limit with the allkeys-lru policy. Without it each process keeps its own
+# LRU-evicted local cache capped at CACHE_MAX_ENTRIES.
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "10000"))},
+        }
+    }
+
 AUTH_USER_MODEL = "authapp.User"
 
 # DRF + JWT
@@ -96,6 +119,7 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "backend.pagination.KeysetPagination",
 }
 
 SIMPLE_JWT = {
@@ -1,8 +1,11 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from grounds.images import VARIANT_ROOT
+from grounds.views import serve_image_variant
+
 urlpatterns = [
     path("admin/", admin.site.urls),
 
@@ -17,5 +20,15 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
+    # Development only, like the rest of /media/. In production the web server
+    # or storage backend serves grounds/variants/ with the immutable
+    # Cache-Control of grounds.images.VARIANT_CACHE_CONTROL.
+    urlpatterns += [
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}{VARIANT_ROOT}/(?P<path>.+)$",
+            serve_image_variant,
+            name="ground-image-variant",
+        ),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
@@ -1,4 +1,7 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, BookingRollup, BookingSeries, WaitlistEntry
 
-admin.site.register(Booking)
\ No newline at end of file
+admin.site.register(Booking)
+admin.site.register(BookingRollup)
+admin.site.register(BookingSeries)
+admin.site.register(WaitlistEntry)
@@ -0,0 +1,97 @@
+from django.db import IntegrityError, connections, transaction
+
+from grounds.models import Ground
+from grounds.slot_constants import MAX_SLOTS_PER_BOOKING
+from .holds import expire_holds, expired_hold_q
+from .models import Booking
+
+
+# Statuses that hold a slot; matches the condition on uniq_active_booking_slot.
+ACTIVE_STATUSES = (Booking.Status.PENDING, Booking.Status.BOOKED)
+
+
+def slot_count(grid, start_time, end_time):
+    """Consecutive slots a slot-aligned range covers, or 0 when it is not aligned."""
+    span = grid.span(start_time, end_time)
+    return 0 if span is None else span[1] - span[0] + 1
+
+
+def is_bookable_range(grid, start_time, end_time):
+    return 1 <= slot_count(grid, start_time, end_time) <= MAX_SLOTS_PER_BOOKING
+
+
+def bookings_in_range(ground, dates, start_time, end_time):
+    """Every booking of `ground` on `dates` that shares any time with [start_time, end_time)."""
+    return Booking.objects.filter(
+        ground=ground,
+        date__in=dates,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+
+
+def overlapping_bookings(ground, d, start_time, end_time, statuses=ACTIVE_STATUSES):
+    """
+    Bookings of `ground` on `d` in `statuses` that share any time with
+    [start_time, end_time). One range query covers every slot of a
+    multi-slot booking. Expired holds are treated as free.
+    """
+    return (
+        bookings_in_range(ground, [d], start_time, end_time)
+        .filter(status__in=statuses)
+        .exclude(expired_hold_q())
+    )
+
+
+def conflicting_dates(ground, dates, start_time, end_time, statuses=ACTIVE_STATUSES):
+    """The subset of `dates` on which [start_time, end_time) is already taken, in one query."""
+    return set(
+        bookings_in_range(ground, dates, start_time, end_time)
+        .filter(status__in=statuses)
+        .exclude(expired_hold_q())
+        .values_list("date", flat=True)
+    )
+
+
+class SlotTaken(Exception):
+    """The requested range overlaps an active booking."""
+
+
+def enforces_overlap(using):
+    """Whether the database itself rejects overlapping active bookings."""
+    # excl_active_booking_overlap only exists on PostgreSQL.
+    return connections[using].vendor == "postgresql"
+
+
+def lock_ground(ground):
+    """Serialize booking writes for `ground` until the transaction ends."""
+    list(Ground.objects.select_for_update().filter(pk=ground.pk).values_list("pk"))
+
+
+def create_booking(**fields):
+    """
+    Insert a booking, raising SlotTaken when its range overlaps an active
+    booking. On PostgreSQL the exclusion constraint decides as part of the
+    INSERT; other backends lock the ground row and run the overlap query
+    first. Expired holds in the range are cancelled first so they stop
+    blocking the constraints.
+    """
+    ground = fields["ground"]
+    conflicts = overlapping_bookings(
+        ground, fields["date"], fields["start_time"], fields["end_time"]
+    )
+
+    try:
+        with transaction.atomic():
+            expire_holds(bookings_in_range(ground, [fields["date"]], fields["start_time"], fields["end_time"]))
+            if not enforces_overlap(conflicts.db):
+                lock_ground(ground)
+                if conflicts.exists():
+                    raise SlotTaken
+            return Booking.objects.create(**fields)
+    except IntegrityError as exc:
+        # Exclusion, unique-slot and transaction_uuid violations all surface
+        # as IntegrityError; only the first two mean the slot is taken.
+        if conflicts.exists():
+            raise SlotTaken from exc
+        raise
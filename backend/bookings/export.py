@@ -0,0 +1,69 @@
+import csv
+import json
+from itertools import islice
+
+from .listing import BOOKING_VALUES, iter_booking_rows
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Flat columns of the serialized booking; nested image URLs are left out.
+EXPORT_FIELDS = (
+    "id",
+    "date",
+    "start_time",
+    "end_time",
+    "ground",
+    "ground_name",
+    "location",
+    "player",
+    "created_by",
+    "status",
+    "source",
+    "payment_mode",
+    "payment_display",
+    "booking_type",
+    "current_players",
+    "required_players",
+    "series",
+    "total_amount",
+    "paid_amount",
+    "remaining_amount",
+    "transaction_uuid",
+    "transaction_code",
+    "created_at",
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() returns the line for csv.writer to hand back."""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(bookings, output, context, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield `bookings` as CSV or NDJSON text, one chunk of rows per piece.
+    Rows are read through a server-side cursor and formatted as they
+    arrive, so memory stays flat however many bookings there are.
+    """
+    rows = iter_booking_rows(bookings.values(*BOOKING_VALUES).iterator(chunk_size=chunk_size), context)
+
+    writer = csv.writer(Echo())
+
+    def encode(row):
+        if output == "csv":
+            return writer.writerow([row[field] for field in EXPORT_FIELDS])
+        return json.dumps({field: row[field] for field in EXPORT_FIELDS}) + "\n"
+
+    if output == "csv":
+        yield writer.writerow(EXPORT_FIELDS)
+
+    while chunk := list(islice(rows, chunk_size)):
+        yield "".join(map(encode, chunk))
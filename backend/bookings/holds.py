@@ -0,0 +1,123 @@
+import datetime as dt
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from grounds.slot_grid import get_slot_grid
+from grounds.utils import bump_slots_version
+from .models import Booking, WaitlistEntry
+
+
+# How long an unpaid PENDING booking keeps its slot.
+HOLD_TTL = dt.timedelta(minutes=15)
+REAP_BATCH_SIZE = 500
+
+
+def hold_expiry(now=None):
+    return (now or timezone.now()) + HOLD_TTL
+
+
+def expired_hold_q(now=None):
+    return Q(status=Booking.Status.PENDING, expires_at__lte=now or timezone.now())
+
+
+def promote_into_expired(ranges):
+    # Imported here: waitlist needs availability, which needs this module.
+    from .waitlist import promote_freed_ranges
+
+    promote_freed_ranges(ranges)
+
+
+def expire_holds(bookings=None, now=None, batch_size=REAP_BATCH_SIZE):
+    """
+    Cancel the expired PENDING holds among `bookings` (every booking by
+    default) with one UPDATE per batch. Rows another worker has locked are
+    skipped. Each batch bumps slots_version on its grounds and, once
+    committed, promotes waiters into the freed ranges. Returns the number
+    cancelled.
+    """
+    now = now or timezone.now()
+    expired = (Booking.objects.all() if bookings is None else bookings).filter(expired_hold_q(now))
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                expired
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("expires_at")
+                .values_list("pk", "ground_id", "date", "start_time", "end_time")[:batch_size]
+            )
+            if not batch:
+                return total
+
+            Booking.objects.filter(pk__in=[row[0] for row in batch]).update(
+                status=Booking.Status.CANCELLED,
+                updated_at=timezone.now(),
+            )
+
+            # Lapsed holds were never BOOKED, so the rollups do not change.
+            bump_slots_version(*{row[1] for row in batch})
+            transaction.on_commit(partial(promote_into_expired, [row[1:5] for row in batch]))
+
+        total += len(batch)
+        if len(batch) < batch_size:
+            return total
+
+
+def promoted_holds(player_id, ground, d, start_time, end_time, now=None):
+    """
+    The unexpired hold a waitlist promotion gave the player on exactly this
+    range. Booking or paying for the range completes that hold instead of
+    colliding with it.
+    """
+    return (
+        Booking.objects
+        .filter(
+            player_id=player_id,
+            ground=ground,
+            date=d,
+            start_time=start_time,
+            end_time=end_time,
+            status=Booking.Status.PENDING,
+        )
+        .filter(Exists(WaitlistEntry.objects.filter(promoted_booking=OuterRef("pk"))))
+        .exclude(expired_hold_q(now))
+    )
+
+
+def confirm_hold(hold, **fields):
+    """
+    Turn a locked hold into a BOOKED booking in place. Occupancy and
+    rollups are left to the caller, exactly as for a newly created booking.
+    """
+    for field, value in fields.items():
+        setattr(hold, field, value)
+    hold.status = Booking.Status.BOOKED
+    hold.expires_at = None
+    hold.save()
+    return hold
+
+
+def live_hold_masks(ground_ids, dates, now=None):
+    """
+    {(ground_id, date): slot mask} of the unexpired PENDING holds on
+    `ground_ids` and `dates`, in one query. Holds block new bookings but
+    are not part of the SlotOccupancy masks.
+    """
+    masks = {}
+    holds = (
+        Booking.objects
+        .filter(ground_id__in=ground_ids, date__in=dates, status=Booking.Status.PENDING)
+        .exclude(expired_hold_q(now))
+        .values_list(
+            "ground_id", "date", "start_time", "end_time",
+            "ground__opens_at", "ground__closes_at", "ground__slot_minutes",
+        )
+    )
+    for ground_id, d, start_time, end_time, *layout in holds:
+        key = (ground_id, d)
+        masks[key] = masks.get(key, 0) | get_slot_grid(*layout).range_mask(start_time, end_time)
+    return masks
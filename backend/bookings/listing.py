@@ -0,0 +1,221 @@
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from chat.utils import joined_group_ids
+from grounds.images import image_url, variant_urls
+from grounds.models import Ground
+from .models import Booking
+
+
+# Everything BookingSerializer reads, as flat columns. "pk" keeps keyset
+# pagination cursors working on the row dicts.
+BOOKING_VALUES = (
+    "pk",
+    "ground_id",
+    "ground__name",
+    "ground__location",
+    "ground__phone",
+    "ground__owner_id",
+    "ground__price_per_hour",
+    "ground__image",
+    "ground__image_variants",
+    "date",
+    "start_time",
+    "end_time",
+    "status",
+    "source",
+    "payment_mode",
+    "booking_type",
+    "player_id",
+    "created_by_id",
+    "current_players",
+    "required_players",
+    "open_game_note",
+    "series_id",
+    "transaction_uuid",
+    "transaction_code",
+    "paid_amount",
+    "created_at",
+    "chat_group__id",
+)
+
+# The same field class BookingSerializer formats amounts with.
+AMOUNT_FIELD = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+def payment_display(payment_mode, source):
+    if payment_mode == Booking.PaymentMode.PAY_DEPOSIT:
+        return "PAY ON FIELD"
+    if payment_mode == Booking.PaymentMode.PAY_FULL_ONLINE:
+        return "ONLINE"
+    if source == Booking.Source.OFFLINE:
+        return "PAY ON FIELD"
+    if source == Booking.Source.ONLINE:
+        return "ONLINE"
+    return "N/A"
+
+
+def total_amount(price_per_hour, start_time, end_time):
+    # Same arithmetic as BookingSerializer.get_total_amount.
+    if not start_time or not end_time or not price_per_hour:
+        return None
+
+    start_minutes = start_time.hour * 60 + start_time.minute
+    end_minutes = end_time.hour * 60 + end_time.minute
+    duration_hours = Decimal(end_minutes - start_minutes) / Decimal(60)
+
+    return (Decimal(price_per_hour) * duration_hours).quantize(CENT)
+
+
+def iter_booking_rows(rows, context):
+    """
+    Yield BookingSerializer output for dicts from .values(*BOOKING_VALUES).
+    Ground columns, prices and durations are formatted once per distinct
+    value rather than once per row.
+    """
+    request = context.get("request")
+    user = getattr(request, "user", None)
+    user_id = user.pk if user and user.is_authenticated else None
+
+    joined = context.get("joined_group_ids")
+    if joined is None and user_id is not None:
+        joined = joined_group_ids(user)
+
+    # Resolve the current timezone once instead of once per row.
+    created_at_field = serializers.DateTimeField(
+        default_timezone=serializers.DateTimeField().default_timezone()
+    )
+
+    grounds = {}
+    totals = {}
+    remaining = {}
+    amounts = {None: None}
+    displays = {}
+
+    def ground_columns(row):
+        ground_id = row["ground_id"]
+        columns = grounds.get(ground_id)
+        if columns is None:
+            ground = Ground(
+                pk=ground_id,
+                image=row["ground__image"],
+                image_variants=row["ground__image_variants"],
+            )
+            price = row["ground__price_per_hour"]
+            phone = row["ground__phone"]
+            columns = grounds[ground_id] = {
+                "ground": ground_id,
+                "ground_name": row["ground__name"],
+                "location": row["ground__location"],
+                "ground_phone": None if phone is None else str(phone),
+                "ground_owner_id": row["ground__owner_id"],
+                "ground_price_per_hour": None if price is None else AMOUNT_FIELD.to_representation(price),
+                "ground_image_url": image_url(ground, request),
+                "ground_image_variants": variant_urls(ground, request),
+                "price": price,
+            }
+        return columns
+
+    for row in rows:
+        ground = ground_columns(row)
+        start_time = row["start_time"]
+        end_time = row["end_time"]
+        paid = row["paid_amount"]
+        if paid not in amounts:
+            amounts[paid] = AMOUNT_FIELD.to_representation(paid)
+        status = row["status"]
+        booking_type = row["booking_type"]
+        current_players = row["current_players"]
+        required_players = row["required_players"]
+        group_id = row["chat_group__id"]
+
+        key = (ground["price"], start_time, end_time)
+        if key not in totals:
+            total = total_amount(*key)
+            totals[key] = (total, None if total is None else str(total))
+        total, total_str = totals[key]
+
+        if total is None:
+            remaining_str = None
+        else:
+            key = (total, paid)
+            remaining_str = remaining.get(key)
+            if remaining_str is None:
+                left = total - Decimal(paid or 0)
+                remaining_str = remaining[key] = str((left if left >= 0 else ZERO).quantize(CENT))
+
+        key = (row["payment_mode"], row["source"])
+        display = displays.get(key)
+        if display is None:
+            display = displays[key] = payment_display(*key)
+
+        if user_id is None:
+            is_joined = False
+        elif row["created_by_id"] == user_id:
+            is_joined = True
+        else:
+            is_joined = group_id is not None and group_id in joined
+
+        yield {
+            "id": row["pk"],
+            "player": row["player_id"],
+            "ground": ground["ground"],
+            "ground_name": ground["ground_name"],
+            "location": ground["location"],
+            "ground_phone": ground["ground_phone"],
+            "ground_owner_id": ground["ground_owner_id"],
+            "ground_price_per_hour": ground["ground_price_per_hour"],
+            "ground_image_url": ground["ground_image_url"],
+            "ground_image_variants": ground["ground_image_variants"],
+            "date": row["date"].isoformat(),
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "status": status,
+            "source": row["source"],
+            "payment_mode": row["payment_mode"],
+            "payment_display": display,
+            "booking_type": booking_type,
+            "created_by": row["created_by_id"],
+            "current_players": current_players,
+            "required_players": required_players,
+            "spots_left": max(required_players - current_players, 0),
+            "is_open_joinable": (
+                booking_type == Booking.BookingType.OPEN
+                and status == Booking.Status.BOOKED
+                and current_players < required_players
+            ),
+            "is_joined": is_joined,
+            "group_chat_id": group_id,
+            "open_game_note": row["open_game_note"],
+            "series": row["series_id"],
+            "transaction_uuid": row["transaction_uuid"],
+            "transaction_code": row["transaction_code"],
+            "paid_amount": amounts[paid],
+            "total_amount": total_str,
+            "remaining_amount": remaining_str,
+            "created_at": created_at_field.to_representation(row["created_at"]),
+        }
+
+
+def serialize_booking_rows(rows, context):
+    return list(iter_booking_rows(rows, context))
+
+
+class BookingRowSerializer:
+    """
+    Read-only stand-in for BookingSerializer(many=True) over rows from
+    .values(*BOOKING_VALUES), for list endpoints that serialize thousands
+    of bookings.
+    """
+
+    def __init__(self, rows, many=True, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @property
+    def data(self):
+        return serialize_booking_rows(self.rows, self.context)
@@ -0,0 +1,114 @@
+import datetime as dt
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory
+
+from bookings.listing import BOOKING_VALUES, BookingRowSerializer
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from chat.utils import joined_group_ids
+from grounds.models import Ground
+from grounds.slot_grid import DEFAULT_GRID
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Seed throwaway owner bookings and compare BookingSerializer with the values() row path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grounds", type=int, default=10)
+        parser.add_argument("--bookings", type=int, default=3000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                owner = self.seed(options["grounds"], options["bookings"])
+                self.run(owner, options["repeat"])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def seed(self, ground_count, booking_count):
+        rng = random.Random(42)
+        owner = get_user_model().objects.create_user(
+            username="bench-serialize-owner",
+            email="bench-serialize-owner@example.com",
+            password=None,
+            phone="bench-serialize",
+            user_type="owner",
+        )
+        grounds = Ground.objects.bulk_create([
+            Ground(
+                owner=owner,
+                name=f"Bench Serialize {i}",
+                location="Kathmandu",
+                price_per_hour=rng.choice([800, 1000, 1500]),
+                status=Ground.Status.APPROVED,
+            )
+            for i in range(ground_count)
+        ])
+
+        slots = DEFAULT_GRID.slots
+        start = dt.date.today()
+        bookings = []
+        for i in range(booking_count):
+            day, slot = divmod(i // ground_count, len(slots))
+            bookings.append(Booking(
+                ground=grounds[i % ground_count],
+                date=start + dt.timedelta(days=day),
+                start_time=slots[slot][0],
+                end_time=slots[slot][1],
+                player=owner,
+                created_by=owner,
+                source=rng.choice(Booking.Source.values),
+                payment_mode=rng.choice(Booking.PaymentMode.values),
+                status=Booking.Status.BOOKED,
+                paid_amount=rng.choice([None, 0, 500, 1000]),
+            ))
+        Booking.objects.bulk_create(bookings, batch_size=5000)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE bookings_booking")
+
+        self.stdout.write(f"Seeded {booking_count} bookings over {ground_count} grounds on {connection.vendor}.")
+        return owner
+
+    def run(self, owner, repeat):
+        request = APIRequestFactory().get("/api/bookings/owner-bookings/")
+        request.user = owner
+        bookings = (
+            Booking.objects
+            .select_related("ground", "player", "created_by", "ground__owner", "chat_group")
+            .filter(ground__owner=owner)
+            .order_by("-date", "-start_time", "-created_at")
+        )
+
+        def serializer():
+            context = {"request": request, "joined_group_ids": joined_group_ids(owner)}
+            return BookingSerializer(bookings, many=True, context=context).data
+
+        def rows():
+            context = {"request": request, "joined_group_ids": joined_group_ids(owner)}
+            return BookingRowSerializer(bookings.values(*BOOKING_VALUES), context=context).data
+
+        results = {}
+        for name, build in (("serializer", serializer), ("values", rows)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                build()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+            self.stdout.write(f"{name:>10} p50={results[name]:8.2f}ms")
+
+        self.stdout.write(f"speedup x{results['serializer'] / results['values']:.1f}")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.holds import REAP_BATCH_SIZE, expire_holds
+
+
+class Command(BaseCommand):
+    help = "Cancel PENDING bookings whose hold has expired. Run from cron, or as a worker with --interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=REAP_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Keep running, reaping every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_holds(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Expired {expired} pending bookings."))
+
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.waitlist import PROMOTE_BATCH_SIZE, promote_waitlist
+
+
+class Command(BaseCommand):
+    help = "Promote waitlisted players into freed slots and open-game spots. Run as a worker with --interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=PROMOTE_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Keep running, promoting every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            promoted = promote_waitlist(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Promoted {promoted} waitlist entries."))
+
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,47 @@
+import datetime as dt
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from backend.params import parse_date_param
+from bookings.rollups import rebuild_booking_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild per (ground, date) booking rollups used by owner analytics. Run nightly."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ground", type=int, action="append", dest="grounds")
+        parser.add_argument("--since", help="Only rebuild dates on or after YYYY-MM-DD.")
+        parser.add_argument("--until", help="Only rebuild dates on or before YYYY-MM-DD.")
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Only rebuild the last N days up to today (the nightly window).",
+        )
+        parser.add_argument("--all", action="store_true", help="Rebuild every date.")
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_date_param(options["since"])
+            until = parse_date_param(options["until"])
+        except ValueError:
+            raise CommandError("--since and --until must be YYYY-MM-DD.")
+
+        if options["days"]:
+            until = timezone.localdate()
+            since = until - dt.timedelta(days=options["days"] - 1)
+        elif not (since or until or options["all"]):
+            raise CommandError("Pass --days, --since/--until or --all.")
+
+        with transaction.atomic():
+            written, deleted = rebuild_booking_rollups(
+                ground_ids=options["grounds"],
+                since=since,
+                until=until,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt booking rollups ({written} rows written, {deleted} removed)."
+        ))
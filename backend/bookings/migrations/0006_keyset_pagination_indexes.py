@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_remove_booking_uniq_booking_slot_and_more"),
+        ("grounds", "0009_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["player", "-created_at", "-id"],
+                name="bookings_bo_player__7e99cf_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["ground", "-date", "-start_time", "-created_at", "-id"],
+                name="bookings_bo_ground__c301ef_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_keyset_pagination_indexes"),
+        ("grounds", "0012_ground_slot_grid"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("booked_slots", models.IntegerField(default=0)),
+                ("cancelled_slots", models.IntegerField(default=0)),
+                ("online_bookings", models.IntegerField(default=0)),
+                ("offline_bookings", models.IntegerField(default=0)),
+                (
+                    "paid_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "booked_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "ground",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_rollups",
+                        to="grounds.ground",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ground", "date"), name="uniq_booking_rollup_day"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0007_booking_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
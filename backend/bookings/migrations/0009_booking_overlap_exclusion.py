@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:20
+
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+# Active statuses match bookings.availability.ACTIVE_STATUSES.
+FORWARD_SQL = [
+    """
+    ALTER TABLE bookings_booking
+    ADD COLUMN slot_range tsrange
+    GENERATED ALWAYS AS (tsrange("date" + start_time, "date" + end_time, '[)')) STORED
+    """,
+    """
+    ALTER TABLE bookings_booking
+    ADD CONSTRAINT excl_active_booking_overlap
+    EXCLUDE USING gist (ground_id WITH =, slot_range WITH &&)
+    WHERE (status IN ('PENDING', 'BOOKED'))
+    """,
+]
+
+REVERSE_SQL = [
+    "ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS excl_active_booking_overlap",
+    "ALTER TABLE bookings_booking DROP COLUMN IF EXISTS slot_range",
+]
+
+
+def run_postgres_sql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0008_booking_updated_at"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(
+            run_postgres_sql(FORWARD_SQL),
+            run_postgres_sql(REVERSE_SQL),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0010_booking_series"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(
+                    ("booking_type", "OPEN"),
+                    ("current_players__lt", models.F("required_players")),
+                    ("status", "BOOKED"),
+                ),
+                fields=["date", "start_time", "id"],
+                name="booking_joinable_open_idx",
+            ),
+        ),
+    ]
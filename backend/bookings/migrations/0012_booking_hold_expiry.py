@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0011_open_game_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["status", "expires_at"], name="bookings_bo_status_86acff_idx"
+            ),
+        ),
+    ]
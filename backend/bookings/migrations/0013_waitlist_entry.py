@@ -0,0 +1,121 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0012_booking_hold_expiry"),
+        ("grounds", "0015_ground_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("start_time", models.TimeField()),
+                ("end_time", models.TimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("WAITING", "Waiting"),
+                            ("PROMOTED", "Promoted"),
+                            ("CANCELLED", "Cancelled"),
+                            ("EXPIRED", "Expired"),
+                        ],
+                        default="WAITING",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "ground",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="grounds.ground",
+                    ),
+                ),
+                (
+                    "open_game",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist",
+                        to="bookings.booking",
+                    ),
+                ),
+                (
+                    "promoted_booking",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="bookings.booking",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["created_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created_at", "-id"],
+                        name="bookings_wa_user_id_05fe17_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(
+                            ("open_game__isnull", True), ("status", "WAITING")
+                        ),
+                        fields=["ground", "date", "start_time", "created_at", "id"],
+                        name="waitlist_slot_fifo_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("status", "WAITING")),
+                        fields=["open_game", "created_at", "id"],
+                        name="waitlist_open_game_fifo_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(
+                            ("open_game__isnull", True), ("status", "WAITING")
+                        ),
+                        fields=("user", "ground", "date", "start_time", "end_time"),
+                        name="uniq_waiting_slot_entry",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("status", "WAITING")),
+                        fields=("user", "open_game"),
+                        name="uniq_waiting_open_game_entry",
+                    ),
+                ],
+            },
+        ),
+    ]
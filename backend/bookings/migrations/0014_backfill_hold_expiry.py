@@ -0,0 +1,27 @@
+import datetime as dt
+
+from django.db import migrations
+from django.db.models import F
+
+
+# bookings.holds.HOLD_TTL when this migration was written.
+HOLD_TTL = dt.timedelta(minutes=15)
+
+
+def backfill_hold_expiry(apps, schema_editor):
+    """Give PENDING rows from before 0012 the expiry a new hold would have had."""
+    Booking = apps.get_model("bookings", "Booking")
+    Booking.objects.filter(status="PENDING", expires_at__isnull=True).update(
+        expires_at=F("created_at") + HOLD_TTL
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0013_waitlist_entry"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hold_expiry, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,19 @@
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import F, Q
 from django.utils import timezone
 from grounds.models import Ground
 
 
+# Open games that still have spots: the open-games listing's filter and the
+# condition of its partial index.
+JOINABLE_OPEN_GAME = Q(
+    booking_type="OPEN",
+    status="BOOKED",
+    current_players__lt=F("required_players"),
+)
+
+
 class Booking(models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending Payment"
@@ -95,10 +104,35 @@ class Booking(models.Model):
         blank=True
     )
 
+    # When a PENDING hold stops blocking its slot. Every hold sets it; 0014
+    # backfilled the rows created before the column existed.
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    series = models.ForeignKey(
+        "BookingSeries",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bookings",
+    )
+
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["player", "-created_at", "-id"]),
+            models.Index(fields=["ground", "-date", "-start_time", "-created_at", "-id"]),
+            models.Index(
+                fields=["date", "start_time", "id"],
+                condition=JOINABLE_OPEN_GAME,
+                name="booking_joinable_open_idx",
+            ),
+            models.Index(fields=["status", "expires_at"]),
+        ]
+        # On PostgreSQL, migration 0009 adds excl_active_booking_overlap, which
+        # also rejects partially overlapping active ranges.
         constraints = [
             models.UniqueConstraint(
                 fields=["ground", "date", "start_time", "end_time"],
@@ -120,4 +154,174 @@ class Booking(models.Model):
             self.booking_type == self.BookingType.OPEN
             and self.status == self.Status.BOOKED
             and self.current_players < self.required_players
-        )
\ No newline at end of file
+        )
+
+class BookingSeries(models.Model):
+    """
+    A weekly recurring booking: one Booking per week from start_date on
+    the same weekday and times. Cancelling the series cancels every
+    occurrence that can still be cancelled.
+    """
+
+    class Status(models.TextChoices):
+        ACTIVE = "ACTIVE", "Active"
+        CANCELLED = "CANCELLED", "Cancelled"
+
+    ground = models.ForeignKey(
+        Ground,
+        on_delete=models.CASCADE,
+        related_name="booking_series",
+    )
+    player = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="booking_series",
+    )
+
+    start_date = models.DateField()
+    weeks = models.PositiveSmallIntegerField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["player", "-created_at", "-id"]),
+            models.Index(fields=["ground", "-created_at", "-id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.ground_id} {self.start_date} x{self.weeks} {self.start_time}-{self.end_time}"
+
+    @property
+    def day_of_week(self):
+        return self.start_date.weekday()
+
+
+class WaitlistEntry(models.Model):
+    """
+    A player queued for a taken slot range (open_game empty) or for a spot
+    in a full open game. Entries are promoted first come, first served by
+    the promote_waitlist command once capacity frees up.
+    """
+
+    class Status(models.TextChoices):
+        WAITING = "WAITING", "Waiting"
+        PROMOTED = "PROMOTED", "Promoted"
+        CANCELLED = "CANCELLED", "Cancelled"
+        EXPIRED = "EXPIRED", "Expired"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    ground = models.ForeignKey(
+        Ground,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    open_game = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="waitlist",
+    )
+    # The hold created for a slot entry, or the open game joined.
+    promoted_booking = models.ForeignKey(
+        Booking,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.WAITING,
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"]),
+            # FIFO queues: the waiting entries of one slot or one game, oldest first.
+            models.Index(
+                fields=["ground", "date", "start_time", "created_at", "id"],
+                condition=Q(status="WAITING", open_game__isnull=True),
+                name="waitlist_slot_fifo_idx",
+            ),
+            models.Index(
+                fields=["open_game", "created_at", "id"],
+                condition=Q(status="WAITING"),
+                name="waitlist_open_game_fifo_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ground", "date", "start_time", "end_time"],
+                condition=Q(status="WAITING", open_game__isnull=True),
+                name="uniq_waiting_slot_entry",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "open_game"],
+                condition=Q(status="WAITING"),
+                name="uniq_waiting_open_game_entry",
+            ),
+        ]
+
+    def __str__(self):
+        target = f"game {self.open_game_id}" if self.open_game_id else f"{self.start_time}-{self.end_time}"
+        return f"{self.user_id} waiting for {self.ground_id} {self.date} {target}"
+
+
+class BookingRollup(models.Model):
+    """
+    Per (ground, date) booking totals for owner analytics. Kept current by
+    apply_booking_rollup() on every status change and rebuilt nightly by
+    the rebuild_booking_rollups command.
+    """
+
+    ground = models.ForeignKey(
+        Ground,
+        on_delete=models.CASCADE,
+        related_name="booking_rollups",
+    )
+    date = models.DateField()
+
+    booked_slots = models.IntegerField(default=0)
+    cancelled_slots = models.IntegerField(default=0)
+    online_bookings = models.IntegerField(default=0)
+    offline_bookings = models.IntegerField(default=0)
+    paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    booked_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ground", "date"], name="uniq_booking_rollup_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.ground_id} {self.date}"
@@ -0,0 +1,220 @@
+import datetime as dt
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from grounds.models import Ground
+from grounds.slot_grid import get_slot_grid, minute_of_day
+from .models import Booking, BookingRollup
+
+
+COUNTERS = (
+    "booked_slots",
+    "cancelled_slots",
+    "online_bookings",
+    "offline_bookings",
+    "paid_amount",
+    "booked_amount",
+)
+AMOUNTS = ("paid_amount", "booked_amount")
+CENT = Decimal("0.01")
+
+PERIOD_TRUNC = {
+    "daily": F,
+    "weekly": TruncWeek,
+    "monthly": TruncMonth,
+}
+
+
+def booking_amount(price_per_hour, start_time, end_time):
+    minutes = minute_of_day(end_time) - minute_of_day(start_time)
+    return (Decimal(price_per_hour) * minutes / 60).quantize(CENT)
+
+
+def rollup_contribution(grid, price_per_hour, status, source, start_time, end_time, paid_amount):
+    """What one booking in `status` adds to its day's BookingRollup counters."""
+    slots = grid.range_mask(start_time, end_time).bit_count()
+
+    if status == Booking.Status.BOOKED:
+        channel = "offline_bookings" if source == Booking.Source.OFFLINE else "online_bookings"
+        return {
+            "booked_slots": slots,
+            channel: 1,
+            "paid_amount": paid_amount or Decimal("0"),
+            "booked_amount": booking_amount(price_per_hour, start_time, end_time),
+        }
+    if status == Booking.Status.CANCELLED:
+        return {"cancelled_slots": slots}
+    return {}
+
+
+def apply_booking_rollup(booking, previous_status=None):
+    """
+    Apply a booking status change to its (ground, date) rollup as an
+    F() delta, so concurrent changes to the same day never overwrite each
+    other.
+    """
+    if booking.status == previous_status:
+        return
+    # Only a BOOKED booking can be cancelled in the stats; a hold that is
+    # withdrawn or lapses was never booked.
+    if booking.status == Booking.Status.CANCELLED and previous_status != Booking.Status.BOOKED:
+        return
+
+    ground = booking.ground
+    args = (booking.source, booking.start_time, booking.end_time, booking.paid_amount)
+    new = rollup_contribution(ground.slot_grid, ground.price_per_hour, booking.status, *args)
+    old = rollup_contribution(ground.slot_grid, ground.price_per_hour, previous_status, *args)
+
+    delta = {field: new.get(field, 0) - old.get(field, 0) for field in COUNTERS}
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta:
+        return
+
+    BookingRollup.objects.get_or_create(ground_id=booking.ground_id, date=booking.date)
+    BookingRollup.objects.filter(ground_id=booking.ground_id, date=booking.date).update(
+        **{field: F(field) + value for field, value in delta.items()}
+    )
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Add {(ground_id, date): {counter: delta}} to the rollups in one UPDATE
+    per day, for status changes applied to many bookings at once.
+    """
+    if not deltas:
+        return
+
+    BookingRollup.objects.bulk_create(
+        [BookingRollup(ground_id=ground_id, date=d) for ground_id, d in deltas],
+        ignore_conflicts=True,
+    )
+    for (ground_id, d), delta in deltas.items():
+        BookingRollup.objects.filter(ground_id=ground_id, date=d).update(
+            **{field: F(field) + value for field, value in delta.items() if value}
+        )
+
+
+def rebuild_booking_rollups(ground_ids=None, since=None, until=None):
+    """
+    Recompute rollups from bookings in one streamed pass, upserting rows
+    that exist and deleting ones with no bookings left. Returns
+    (written, deleted).
+    """
+    grounds = Ground.objects.all()
+    # Same rule as apply_booking_rollup: a cancelled hold was never booked.
+    # Holds keep expires_at when cancelled, and confirming one clears it.
+    bookings = Booking.objects.filter(
+        status__in=[Booking.Status.BOOKED, Booking.Status.CANCELLED]
+    ).exclude(status=Booking.Status.CANCELLED, expires_at__isnull=False)
+    rollups = BookingRollup.objects.all()
+
+    if ground_ids:
+        grounds = grounds.filter(pk__in=ground_ids)
+        bookings = bookings.filter(ground_id__in=ground_ids)
+        rollups = rollups.filter(ground_id__in=ground_ids)
+    if since:
+        bookings = bookings.filter(date__gte=since)
+        rollups = rollups.filter(date__gte=since)
+    if until:
+        bookings = bookings.filter(date__lte=until)
+        rollups = rollups.filter(date__lte=until)
+
+    pricing = {
+        pk: (get_slot_grid(opens_at, closes_at, slot_minutes), price)
+        for pk, opens_at, closes_at, slot_minutes, price in grounds.values_list(
+            "pk", "opens_at", "closes_at", "slot_minutes", "price_per_hour"
+        )
+    }
+
+    totals = {}
+    rows = bookings.values_list(
+        "ground_id", "date", "status", "source", "start_time", "end_time", "paid_amount"
+    )
+    for ground_id, d, *booking in rows.iterator(chunk_size=2000):
+        row = totals.setdefault((ground_id, d), dict.fromkeys(COUNTERS, 0))
+        for field, value in rollup_contribution(*pricing[ground_id], *booking).items():
+            row[field] += value
+
+    stale = [
+        pk for pk, ground_id, d in rollups.values_list("pk", "ground_id", "date")
+        if (ground_id, d) not in totals
+    ]
+    if stale:
+        BookingRollup.objects.filter(pk__in=stale).delete()
+
+    BookingRollup.objects.bulk_create(
+        [
+            BookingRollup(ground_id=ground_id, date=d, **row)
+            for (ground_id, d), row in totals.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["ground", "date"],
+        update_fields=[*COUNTERS, "updated_at"],
+    )
+    return len(totals), len(stale)
+
+
+def period_start(d, period):
+    if period == "weekly":
+        return d - dt.timedelta(days=d.weekday())
+    if period == "monthly":
+        return d.replace(day=1)
+    return d
+
+
+def next_period_start(d, period):
+    if period == "weekly":
+        return d + dt.timedelta(days=7)
+    if period == "monthly":
+        return (d.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+    return d + dt.timedelta(days=1)
+
+
+def owner_analytics(owner, period, start, end, ground_id=None):
+    """
+    Occupancy and revenue per daily/weekly/monthly bucket from the
+    rollups alone. Capacity is the number of slots on the grounds' grids
+    over the days of the bucket that fall inside [start, end].
+    """
+    grounds = Ground.objects.filter(owner=owner)
+    if ground_id is not None:
+        grounds = grounds.filter(pk=ground_id)
+
+    slots_per_day = sum(
+        len(get_slot_grid(*layout))
+        for layout in grounds.values_list("opens_at", "closes_at", "slot_minutes")
+    )
+
+    totals = {
+        row["bucket"]: row
+        for row in (
+            BookingRollup.objects
+            .filter(ground__in=grounds, date__gte=start, date__lte=end)
+            .annotate(bucket=PERIOD_TRUNC[period]("date"))
+            .values("bucket")
+            .annotate(**{field: Sum(field) for field in COUNTERS})
+            .order_by("bucket")
+        )
+    }
+
+    results = []
+    d = start
+    while d <= end:
+        bucket = period_start(d, period)
+        following = next_period_start(bucket, period)
+        capacity = slots_per_day * (min(following, end + dt.timedelta(days=1)) - d).days
+        row = totals.get(bucket, {})
+
+        item = {"period_start": bucket.isoformat()}
+        for field in COUNTERS:
+            value = row.get(field) or 0
+            item[field] = str(Decimal(value).quantize(CENT)) if field in AMOUNTS else value
+        item["capacity_slots"] = capacity
+        item["occupancy"] = round(item["booked_slots"] / capacity, 4) if capacity else 0.0
+        results.append(item)
+
+        d = following
+    return results
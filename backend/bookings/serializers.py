@@ -1,19 +1,26 @@
 # backend/bookings/serializers.py
 
 from decimal import Decimal
+from functools import partial
 
 from django.db import IntegrityError, transaction
 from django.db.models import F
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Booking
+from .availability import SlotTaken, create_booking, is_bookable_range, overlapping_bookings
+from .holds import hold_expiry, promoted_holds
+from .listing import payment_display, total_amount
+from .models import Booking, BookingSeries, WaitlistEntry
+from .rollups import apply_booking_rollup
+from .series import MAX_SERIES_WEEKS
+from .waitlist import promote_open_game
+from grounds.images import image_url, variant_urls
 from grounds.models import Ground
-from grounds.slot_constants import FIXED_SLOTS
+from grounds.slot_constants import MAX_SLOTS_PER_BOOKING
+from grounds.utils import sync_booking_occupancy
 from chat.models import ChatGroupMember
-
-
-def is_fixed_slot(start_time, end_time):
-    return any(s == start_time and e == end_time for (s, e) in FIXED_SLOTS)
+from chat.utils import joined_group_ids
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -51,8 +58,11 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         if ground.status != Ground.Status.APPROVED:
             raise serializers.ValidationError("Ground is not approved.")
 
-        if not is_fixed_slot(attrs["start_time"], attrs["end_time"]):
-            raise serializers.ValidationError("Invalid slot (must match system fixed timings).")
+        if not is_bookable_range(ground.slot_grid, attrs["start_time"], attrs["end_time"]):
+            raise serializers.ValidationError(
+                "Invalid slot (must be 1 to %d consecutive slots of the ground's slot timings)."
+                % MAX_SLOTS_PER_BOOKING
+            )
 
         if booking_type == Booking.BookingType.OPEN:
             if required_players < 1:
@@ -74,22 +84,41 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             Booking.PaymentMode.PAY_DEPOSIT,
         )
 
+        details = {
+            "payment_mode": payment_mode,
+            "booking_type": booking_type,
+            "required_players": required_players if booking_type == Booking.BookingType.OPEN else 1,
+            "open_game_note": open_game_note if booking_type == Booking.BookingType.OPEN else "",
+        }
+
         with transaction.atomic():
+            # The waitlist already holds this range for the player: take the
+            # new details but keep the hold's expiry.
+            hold = promoted_holds(
+                request.user.pk,
+                validated_data["ground"],
+                validated_data["date"],
+                validated_data["start_time"],
+                validated_data["end_time"],
+            ).select_for_update().first()
+            if hold is not None:
+                for field, value in details.items():
+                    setattr(hold, field, value)
+                hold.save(update_fields=[*details, "updated_at"])
+                return hold
+
             try:
-                booking = Booking.objects.create(
+                return create_booking(
                     player=request.user,
                     created_by=request.user,
                     source=Booking.Source.ONLINE,
-                    payment_mode=payment_mode,
                     status=Booking.Status.PENDING,
-                    booking_type=booking_type,
+                    expires_at=hold_expiry(),
                     current_players=1,
-                    required_players=required_players if booking_type == Booking.BookingType.OPEN else 1,
-                    open_game_note=open_game_note if booking_type == Booking.BookingType.OPEN else "",
+                    **details,
                     **validated_data,
                 )
-                return booking
-            except IntegrityError:
+            except SlotTaken:
                 raise serializers.ValidationError("This slot is already booked.")
 
 
@@ -109,6 +138,7 @@ class BookingSerializer(serializers.ModelSerializer):
     )
 
     ground_image_url = serializers.SerializerMethodField()
+    ground_image_variants = serializers.SerializerMethodField()
     spots_left = serializers.ReadOnlyField()
     is_open_joinable = serializers.ReadOnlyField()
     total_amount = serializers.SerializerMethodField()
@@ -129,6 +159,7 @@ class BookingSerializer(serializers.ModelSerializer):
             "ground_owner_id",
             "ground_price_per_hour",
             "ground_image_url",
+            "ground_image_variants",
             "date",
             "start_time",
             "end_time",
@@ -145,6 +176,7 @@ class BookingSerializer(serializers.ModelSerializer):
             "is_joined",
             "group_chat_id",
             "open_game_note",
+            "series",
             "transaction_uuid",
             "transaction_code",
             "paid_amount",
@@ -154,25 +186,14 @@ class BookingSerializer(serializers.ModelSerializer):
         ]
 
     def get_ground_image_url(self, obj):
-        request = self.context.get("request")
-        image = getattr(obj.ground, "image", None)
-
-        if not image:
-            return None
+        return image_url(obj.ground, self.context.get("request"))
 
-        url = image.url
-        return request.build_absolute_uri(url) if request else url
+    def get_ground_image_variants(self, obj):
+        return variant_urls(obj.ground, self.context.get("request"))
 
     def get_total_amount(self, obj):
-        if not obj.start_time or not obj.end_time or not obj.ground.price_per_hour:
-            return None
-
-        start_minutes = obj.start_time.hour * 60 + obj.start_time.minute
-        end_minutes = obj.end_time.hour * 60 + obj.end_time.minute
-        duration_hours = Decimal(end_minutes - start_minutes) / Decimal(60)
-
-        total = Decimal(obj.ground.price_per_hour) * duration_hours
-        return str(total.quantize(Decimal("0.01")))
+        total = total_amount(obj.ground.price_per_hour, obj.start_time, obj.end_time)
+        return None if total is None else str(total)
 
     def get_remaining_amount(self, obj):
         total_str = self.get_total_amount(obj)
@@ -189,15 +210,7 @@ class BookingSerializer(serializers.ModelSerializer):
         return str(remaining.quantize(Decimal("0.01")))
 
     def get_payment_display(self, obj):
-        if obj.payment_mode == Booking.PaymentMode.PAY_DEPOSIT:
-            return "PAY ON FIELD"
-        if obj.payment_mode == Booking.PaymentMode.PAY_FULL_ONLINE:
-            return "ONLINE"
-        if obj.source == Booking.Source.OFFLINE:
-            return "PAY ON FIELD"
-        if obj.source == Booking.Source.ONLINE:
-            return "ONLINE"
-        return "N/A"
+        return payment_display(obj.payment_mode, obj.source)
 
     def get_group_chat_id(self, obj):
         group = getattr(obj, "chat_group", None)
@@ -217,7 +230,12 @@ class BookingSerializer(serializers.ModelSerializer):
         if not group:
             return False
 
-        return ChatGroupMember.objects.filter(group=group, user=user).exists()
+        # List views pass the user's groups in; otherwise load them once
+        # and share them with the other rows through the context.
+        joined = self.context.get("joined_group_ids")
+        if joined is None:
+            joined = self.context["joined_group_ids"] = joined_group_ids(user)
+        return group.id in joined
 
 
 class JoinOpenBookingSerializer(serializers.Serializer):
@@ -267,12 +285,152 @@ class JoinOpenBookingSerializer(serializers.Serializer):
                 raise serializers.ValidationError("This game is already full.")
 
             booking.current_players = F("current_players") + 1
-            booking.save(update_fields=["current_players"])
+            booking.save(update_fields=["current_players", "updated_at"])
+            booking.refresh_from_db()
+
+        return booking
+
+
+class LeaveOpenBookingSerializer(serializers.Serializer):
+    def save(self, **kwargs):
+        booking = self.context["booking"]
+        request = self.context["request"]
+
+        with transaction.atomic():
+            booking = Booking.objects.select_for_update().get(pk=booking.pk)
+
+            if booking.booking_type != Booking.BookingType.OPEN:
+                raise serializers.ValidationError("This is not an open booking.")
+
+            if booking.status != Booking.Status.BOOKED:
+                raise serializers.ValidationError("This booking is not active.")
+
+            if booking.created_by_id == request.user.pk:
+                raise serializers.ValidationError("You cannot leave a game you created; cancel it instead.")
+
+            left, _ = ChatGroupMember.objects.filter(group__booking=booking, user=request.user).delete()
+            if not left:
+                raise serializers.ValidationError("You have not joined this game.")
+
+            booking.current_players = F("current_players") - 1
+            booking.save(update_fields=["current_players", "updated_at"])
             booking.refresh_from_db()
+            # The freed spot goes to the game's waitlist before anyone else can join.
+            transaction.on_commit(partial(promote_open_game, booking.pk))
 
         return booking
 
 
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    ground_name = serializers.CharField(source="ground.name", read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            "id",
+            "ground",
+            "ground_name",
+            "date",
+            "start_time",
+            "end_time",
+            "open_game",
+            "status",
+            "promoted_booking",
+            "created_at",
+        ]
+
+
+class SlotWaitlistSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            "ground",
+            "date",
+            "start_time",
+            "end_time",
+        ]
+
+    def validate(self, attrs):
+        request = self.context["request"]
+        ground = attrs["ground"]
+
+        if ground.status != Ground.Status.APPROVED:
+            raise serializers.ValidationError("Ground is not approved.")
+
+        if not is_bookable_range(ground.slot_grid, attrs["start_time"], attrs["end_time"]):
+            raise serializers.ValidationError(
+                "Invalid slot (must be 1 to %d consecutive slots of the ground's slot timings)."
+                % MAX_SLOTS_PER_BOOKING
+            )
+
+        now = timezone.localtime()
+        if (attrs["date"], attrs["start_time"]) <= (now.date(), now.time()):
+            raise serializers.ValidationError("This slot has already started.")
+
+        if not overlapping_bookings(ground, attrs["date"], attrs["start_time"], attrs["end_time"]).exists():
+            raise serializers.ValidationError("This slot is free; book it instead.")
+
+        if WaitlistEntry.objects.filter(
+            user=request.user,
+            status=WaitlistEntry.Status.WAITING,
+            open_game__isnull=True,
+            **attrs,
+        ).exists():
+            raise serializers.ValidationError("You are already on the waitlist for this slot.")
+
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return WaitlistEntry.objects.create(user=self.context["request"].user, **validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError("You are already on the waitlist for this slot.")
+
+
+class OpenGameWaitlistSerializer(serializers.Serializer):
+    def validate(self, attrs):
+        booking = self.context["booking"]
+        request = self.context["request"]
+        group = getattr(booking, "chat_group", None)
+
+        if booking.booking_type != Booking.BookingType.OPEN:
+            raise serializers.ValidationError("This is not an open booking.")
+
+        if booking.status != Booking.Status.BOOKED:
+            raise serializers.ValidationError("This booking is not active.")
+
+        if booking.created_by_id == request.user.pk:
+            raise serializers.ValidationError("You cannot join a game you created.")
+
+        if group and ChatGroupMember.objects.filter(group=group, user=request.user).exists():
+            raise serializers.ValidationError("You have already joined this game.")
+
+        if booking.current_players < booking.required_players:
+            raise serializers.ValidationError("This game has a spot left; join it instead.")
+
+        if booking.waitlist.filter(user=request.user, status=WaitlistEntry.Status.WAITING).exists():
+            raise serializers.ValidationError("You are already on the waitlist for this game.")
+
+        return attrs
+
+    def save(self, **kwargs):
+        booking = self.context["booking"]
+
+        try:
+            with transaction.atomic():
+                return WaitlistEntry.objects.create(
+                    user=self.context["request"].user,
+                    ground_id=booking.ground_id,
+                    date=booking.date,
+                    start_time=booking.start_time,
+                    end_time=booking.end_time,
+                    open_game=booking,
+                )
+        except IntegrityError:
+            raise serializers.ValidationError("You are already on the waitlist for this game.")
+
+
 class OwnerDirectBookingSerializer(serializers.ModelSerializer):
     notes = serializers.CharField(write_only=True, required=False, allow_blank=True, default="")
 
@@ -296,7 +454,7 @@ class OwnerDirectBookingSerializer(serializers.ModelSerializer):
         if ground.status != Ground.Status.APPROVED:
             raise serializers.ValidationError("Ground is not approved.")
 
-        if not is_fixed_slot(attrs["start_time"], attrs["end_time"]):
+        if not is_bookable_range(ground.slot_grid, attrs["start_time"], attrs["end_time"]):
             raise serializers.ValidationError("Invalid slot.")
 
         return attrs
@@ -306,29 +464,88 @@ class OwnerDirectBookingSerializer(serializers.ModelSerializer):
         notes = validated_data.pop("notes", "")
 
         with transaction.atomic():
-            overlap_exists = Booking.objects.select_for_update().filter(
-                ground=validated_data["ground"],
-                date=validated_data["date"],
-                status=Booking.Status.BOOKED,
-                start_time__lt=validated_data["end_time"],
-                end_time__gt=validated_data["start_time"],
-            ).exists()
-
-            if overlap_exists:
+            try:
+                booking = create_booking(
+                    player=request.user,
+                    created_by=request.user,
+                    source=Booking.Source.OFFLINE,
+                    status=Booking.Status.BOOKED,
+                    booking_type=Booking.BookingType.CLOSED,
+                    payment_mode=Booking.PaymentMode.PAY_DEPOSIT,
+                    current_players=1,
+                    required_players=1,
+                    open_game_note=notes,
+                    paid_amount=0,
+                    **validated_data,
+                )
+            except SlotTaken:
                 raise serializers.ValidationError("This slot is already booked.")
 
-            booking = Booking.objects.create(
-                player=request.user,
-                created_by=request.user,
-                source=Booking.Source.OFFLINE,
-                status=Booking.Status.BOOKED,
-                booking_type=Booking.BookingType.CLOSED,
-                payment_mode=Booking.PaymentMode.PAY_DEPOSIT,
-                current_players=1,
-                required_players=1,
-                open_game_note=notes,
-                paid_amount=0,
-                **validated_data,
+            sync_booking_occupancy(booking)
+            apply_booking_rollup(booking)
+
+        return booking
+
+
+class BookingSeriesCreateSerializer(serializers.Serializer):
+    ground = serializers.PrimaryKeyRelatedField(queryset=Ground.objects.all())
+    start_date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    weeks = serializers.IntegerField(min_value=1, max_value=MAX_SERIES_WEEKS)
+    payment_mode = serializers.ChoiceField(
+        choices=Booking.PaymentMode.choices,
+        required=False,
+        default=Booking.PaymentMode.PAY_DEPOSIT,
+    )
+
+    def validate(self, attrs):
+        ground = attrs["ground"]
+
+        if ground.status != Ground.Status.APPROVED:
+            raise serializers.ValidationError("Ground is not approved.")
+
+        if attrs["start_date"] < timezone.localdate():
+            raise serializers.ValidationError("Start date cannot be in the past.")
+
+        # Series never go through eSewa, so they can only be paid on the field.
+        if attrs["payment_mode"] == Booking.PaymentMode.PAY_FULL_ONLINE:
+            raise serializers.ValidationError("Weekly bookings are paid on the field.")
+
+        if not is_bookable_range(ground.slot_grid, attrs["start_time"], attrs["end_time"]):
+            raise serializers.ValidationError(
+                "Invalid slot (must be 1 to %d consecutive slots of the ground's slot timings)."
+                % MAX_SLOTS_PER_BOOKING
             )
 
-        return booking
\ No newline at end of file
+        return attrs
+
+
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    player = serializers.IntegerField(source="player_id", read_only=True)
+    ground_name = serializers.CharField(source="ground.name", read_only=True)
+    day_of_week = serializers.ReadOnlyField()
+    occurrences = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BookingSeries
+        fields = [
+            "id",
+            "ground",
+            "ground_name",
+            "player",
+            "day_of_week",
+            "start_date",
+            "weeks",
+            "start_time",
+            "end_time",
+            "status",
+            "occurrences",
+            "created_at",
+        ]
+
+    def get_occurrences(self, obj):
+        return [
+            {"id": booking.id, "date": booking.date.isoformat(), "status": booking.status}
+            for booking in sorted(obj.bookings.all(), key=lambda booking: booking.date)
+        ]
@@ -0,0 +1,159 @@
+import datetime as dt
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from grounds.utils import occupy_dates, sync_booking_occupancy
+from .availability import (
+    ACTIVE_STATUSES,
+    SlotTaken,
+    bookings_in_range,
+    conflicting_dates,
+    enforces_overlap,
+    lock_ground,
+)
+from .holds import expire_holds, expired_hold_q
+from .models import Booking, BookingSeries
+from .rollups import apply_booking_rollup, apply_rollup_deltas, rollup_contribution
+
+
+MAX_SERIES_WEEKS = 26
+
+# Same notice a player needs to cancel a single booking.
+CANCELLATION_NOTICE = dt.timedelta(hours=3)
+
+# How long the ground owner has to confirm a new series before its
+# occurrences stop holding their slots.
+CONFIRMATION_TTL = dt.timedelta(hours=48)
+
+
+def series_dates(start_date, weeks):
+    return [start_date + dt.timedelta(weeks=i) for i in range(weeks)]
+
+
+def create_booking_series(ground, player, start_date, start_time, end_time, weeks, payment_mode):
+    """
+    Hold the same slot range every week for `weeks` weeks. Conflicts for
+    all occurrences come from one range query and the free ones are
+    inserted as PENDING holds with one bulk_create in the same
+    transaction; nothing is paid online, so they only become BOOKED when
+    the ground owner confirms the series. Returns (series, created_dates,
+    conflicting_dates); series is None when every date is taken.
+    """
+    dates = series_dates(start_date, weeks)
+    expires_at = timezone.now() + CONFIRMATION_TTL
+
+    try:
+        with transaction.atomic():
+            if not enforces_overlap(Booking.objects.db):
+                lock_ground(ground)
+
+            expire_holds(bookings_in_range(ground, dates, start_time, end_time))
+            taken = conflicting_dates(ground, dates, start_time, end_time)
+            free = [d for d in dates if d not in taken]
+            if not free:
+                return None, [], sorted(taken)
+
+            series = BookingSeries.objects.create(
+                ground=ground,
+                player=player,
+                start_date=start_date,
+                weeks=weeks,
+                start_time=start_time,
+                end_time=end_time,
+            )
+            Booking.objects.bulk_create([
+                Booking(
+                    ground=ground,
+                    date=d,
+                    start_time=start_time,
+                    end_time=end_time,
+                    player=player,
+                    created_by=player,
+                    source=Booking.Source.ONLINE,
+                    payment_mode=payment_mode,
+                    status=Booking.Status.PENDING,
+                    expires_at=expires_at,
+                    booking_type=Booking.BookingType.CLOSED,
+                    series=series,
+                )
+                for d in free
+            ])
+    except IntegrityError as exc:
+        # Another booking won one of the free dates between the conflict
+        # query and the insert; the exclusion constraint rolled it all back.
+        raise SlotTaken from exc
+
+    return series, free, sorted(taken)
+
+
+def confirm_booking_series(series, now=None):
+    """
+    Turn the series' live holds into BOOKED occurrences with one UPDATE,
+    then set their occupancy and rollups in bulk. Returns the confirmed
+    dates.
+    """
+    with transaction.atomic():
+        dates = list(
+            series.bookings
+            .filter(status=Booking.Status.PENDING)
+            .exclude(expired_hold_q(now))
+            .select_for_update()
+            .order_by("date")
+            .values_list("date", flat=True)
+        )
+        if not dates:
+            return []
+
+        series.bookings.filter(date__in=dates, status=Booking.Status.PENDING).update(
+            status=Booking.Status.BOOKED,
+            expires_at=None,
+            updated_at=timezone.now(),
+        )
+
+        ground = series.ground
+        occupy_dates(ground, dates, series.start_time, series.end_time)
+        contribution = rollup_contribution(
+            ground.slot_grid,
+            ground.price_per_hour,
+            Booking.Status.BOOKED,
+            Booking.Source.ONLINE,
+            series.start_time,
+            series.end_time,
+            None,
+        )
+        apply_rollup_deltas({(ground.pk, d): contribution for d in dates})
+    return dates
+
+
+def cancellable_bookings(series, now=None):
+    """Active occurrences that start more than CANCELLATION_NOTICE from now."""
+    cutoff = timezone.localtime(now) + CANCELLATION_NOTICE
+    return series.bookings.filter(status__in=ACTIVE_STATUSES).filter(
+        Q(date__gt=cutoff.date()) | Q(date=cutoff.date(), start_time__gt=cutoff.time())
+    )
+
+
+def cancel_booking_series(series, now=None):
+    """
+    Cancel every occurrence that can still be cancelled with one UPDATE,
+    then bring their days' occupancy and rollups up to date. Returns the
+    cancelled bookings' dates.
+    """
+    with transaction.atomic():
+        bookings = list(
+            cancellable_bookings(series, now).select_for_update().select_related("ground").order_by("date")
+        )
+        Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(
+            status=Booking.Status.CANCELLED,
+            updated_at=timezone.now(),
+        )
+        for booking in bookings:
+            previous_status, booking.status = booking.status, Booking.Status.CANCELLED
+            sync_booking_occupancy(booking, previous_status)
+            apply_booking_rollup(booking, previous_status)
+
+        series.status = BookingSeries.Status.CANCELLED
+        series.save(update_fields=["status", "updated_at"])
+    return [booking.date for booking in bookings]
@@ -1,13 +1,29 @@
-from datetime import date, time
+import csv
+import json
+from datetime import date, time, timedelta
+from importlib import import_module
+from io import StringIO
 
+from django.apps import apps as django_apps
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
 
 from authapp.models import User
-from bookings.models import Booking
+from bookings.availability import SlotTaken, create_booking
+from bookings.holds import HOLD_TTL, expire_holds, hold_expiry
+from bookings.listing import BOOKING_VALUES, BookingRowSerializer
+from bookings.models import Booking, BookingRollup, WaitlistEntry
+from bookings.rollups import apply_booking_rollup
+from bookings.serializers import BookingSerializer
 from chat.models import ChatGroup, ChatGroupMember
-from chat.utils import create_temporary_chat_for_booking
-from grounds.models import Ground
+from chat.utils import add_user_to_booking_chat, create_temporary_chat_for_booking
+from connections.models import ConnectionNotification
+from grounds.models import Ground, SlotOccupancy
+from payments.views import create_booking_from_intent
 
 class BookingTests(APITestCase):
     def setUp(self):
@@ -292,3 +308,1114 @@ class BookingFailureTests(APITestCase):
         second_response = self.client.post(f"/api/bookings/{booking.id}/join/", {}, format="json")
 
         self.assertEqual(second_response.status_code, status.HTTP_400_BAD_REQUEST) 
+
+
+class BookingTestBase(APITestCase):
+    # Usernames and ground names are derived from the subclass prefix.
+    prefix = "booking"
+    price_per_hour = 1000
+
+    def setUp(self):
+        self.owner = self.make_user("owner", user_type="owner")
+        self.player = self.make_user("player")
+        self.ground = self.make_ground(f"{self.prefix.title()} Ground")
+
+    def make_user(self, role, user_type="player"):
+        username = f"{self.prefix}{role}"
+        return User.objects.create_user(
+            username=username,
+            email=f"{username}@test.com",
+            password="test12345",
+            user_type=user_type,
+            phone=f"98{User.objects.count() + 1:08d}",
+        )
+
+    def make_ground(self, name, owner=None, **fields):
+        fields.setdefault("location", "Kathmandu")
+        fields.setdefault("price_per_hour", self.price_per_hour)
+        return Ground.objects.create(
+            owner=owner or self.owner,
+            name=name,
+            status=Ground.Status.APPROVED,
+            **fields,
+        )
+
+
+class BookingPaginationTests(BookingTestBase):
+    prefix = "page"
+
+    def setUp(self):
+        super().setUp()
+
+        # Shared created_at values force the id tiebreaker to do its job.
+        created_at = timezone.now()
+        self.bookings = [
+            Booking.objects.create(
+                ground=self.ground,
+                date=date(2026, 6, 1) + timedelta(days=i),
+                start_time=time(6, 0),
+                end_time=time(7, 0),
+                player=self.player,
+                created_by=self.player,
+                status=Booking.Status.BOOKED,
+                created_at=created_at - timedelta(minutes=i // 3),
+            )
+            for i in range(25)
+        ]
+        self.client.force_authenticate(user=self.player)
+
+    def walk(self, url, key):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data[key]
+        return ids
+
+    # TC-B-05
+    def test_my_bookings_pages_cover_every_row_once(self):
+        expected = [
+            b.id for b in sorted(self.bookings, key=lambda b: (b.created_at, b.id), reverse=True)
+        ]
+
+        first = self.client.get("/api/bookings/my/", {"page_size": 10})
+        self.assertEqual(len(first.data["results"]), 10)
+        self.assertIsNone(first.data["previous"])
+
+        self.assertEqual(self.walk("/api/bookings/my/?page_size=10", "next"), expected)
+
+        last = self.client.get(first.data["next"])
+        last = self.client.get(last.data["next"])
+        self.assertIsNone(last.data["next"])
+        self.assertEqual(len(last.data["results"]), 5)
+
+        back = self.client.get(last.data["previous"])
+        self.assertEqual([row["id"] for row in back.data["results"]], expected[10:20])
+
+    # TC-B-06
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        first = self.client.get("/api/bookings/my/", {"page_size": 5})
+        deep = self.client.get(first.data["next"])
+        deep = self.client.get(deep.data["next"])
+
+        # The ETag aggregate, the user's chat groups, then the page itself.
+        with self.assertNumQueries(3) as first_queries:
+            self.client.get("/api/bookings/my/", {"page_size": 5})
+        with self.assertNumQueries(3) as deep_queries:
+            self.client.get(deep.data["next"])
+
+        self.assertNotIn("OFFSET", deep_queries.captured_queries[-1]["sql"].upper())
+        self.assertEqual(len(first_queries), len(deep_queries))
+
+    # TC-B-07
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/bookings/my/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BookingRollupTests(BookingTestBase):
+    prefix = "rollup"
+    price_per_hour = 1200
+
+    def setUp(self):
+        super().setUp()
+        self.day = timezone.localdate() + timedelta(days=7)
+
+    def rollup_values(self):
+        return list(
+            BookingRollup.objects.order_by("ground_id", "date").values(
+                "ground_id", "date", "booked_slots", "cancelled_slots",
+                "online_bookings", "offline_bookings", "paid_amount", "booked_amount",
+            )
+        )
+
+    def analytics(self, **params):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get("/api/bookings/owner-analytics/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data["results"]
+
+    # TC-B-08
+    def test_status_changes_update_rollups_incrementally(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(
+            "/api/bookings/owner-direct-booking/",
+            {
+                "ground": self.ground.id,
+                "date": self.day.isoformat(),
+                "start_time": "06:00",
+                "end_time": "07:00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        online = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(8, 0),
+            end_time=time(9, 0),
+            player=self.player,
+            created_by=self.player,
+            status=Booking.Status.BOOKED,
+        )
+        apply_booking_rollup(online)
+        # Withdrawing an unpaid hold is not a cancellation in the stats.
+        hold = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            player=self.player,
+            created_by=self.player,
+            status=Booking.Status.PENDING,
+            expires_at=hold_expiry(),
+        )
+        self.client.force_authenticate(user=self.player)
+        for booking in (online, hold):
+            response = self.client.post(f"/api/bookings/{booking.id}/cancel/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rollup = BookingRollup.objects.get(ground=self.ground, date=self.day)
+        self.assertEqual(
+            (rollup.booked_slots, rollup.cancelled_slots, rollup.offline_bookings, rollup.online_bookings),
+            (1, 1, 1, 0),
+        )
+        self.assertEqual(str(rollup.booked_amount), "1200.00")
+
+        incremental = self.rollup_values()
+        BookingRollup.objects.update(booked_slots=99)
+        out = StringIO()
+        call_command("rebuild_booking_rollups", "--all", stdout=out)
+        self.assertIn("1 rows written", out.getvalue())
+        self.assertEqual(self.rollup_values(), incremental)
+
+        for since in ("2026-02-30", "yesterday"):
+            with self.assertRaises(CommandError):
+                call_command("rebuild_booking_rollups", "--since", since, stdout=StringIO())
+
+    # TC-B-09
+    def test_analytics_buckets_read_only_rollups(self):
+        monday = date(2026, 6, 1)
+        for offset, paid in ((0, 500), (1, 0), (9, 1200)):
+            Booking.objects.create(
+                ground=self.ground,
+                date=monday + timedelta(days=offset),
+                start_time=time(6, 0),
+                end_time=time(8, 0),
+                player=self.player,
+                created_by=self.player,
+                status=Booking.Status.BOOKED,
+                paid_amount=paid,
+            )
+        call_command("rebuild_booking_rollups", "--all", stdout=StringIO())
+
+        with self.assertNumQueries(2):
+            weekly = self.analytics(period="weekly", **{"from": "2026-06-01", "to": "2026-06-14"})
+
+        self.assertEqual([row["period_start"] for row in weekly], ["2026-06-01", "2026-06-08"])
+        self.assertEqual([row["booked_slots"] for row in weekly], [4, 2])
+        self.assertEqual(weekly[0]["paid_amount"], "500.00")
+        self.assertEqual(weekly[0]["booked_amount"], "4800.00")
+        self.assertEqual(weekly[0]["capacity_slots"], 7 * len(self.ground.slot_grid))
+        self.assertEqual(weekly[1]["occupancy"], round(2 / (7 * 13), 4))
+
+        daily = self.analytics(period="daily", **{"from": "2026-06-01", "to": "2026-06-03"})
+        self.assertEqual([row["booked_slots"] for row in daily], [2, 2, 0])
+
+        monthly = self.analytics(period="monthly", **{"from": "2026-05-20", "to": "2026-06-30"})
+        self.assertEqual([row["period_start"] for row in monthly], ["2026-05-01", "2026-06-01"])
+        self.assertEqual(monthly[0]["capacity_slots"], 12 * 13)
+        self.assertEqual(monthly[1]["booked_slots"], 6)
+
+    # TC-B-10
+    def test_analytics_rejects_players_and_bad_params(self):
+        self.client.force_authenticate(user=self.player)
+        response = self.client.get("/api/bookings/owner-analytics/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.owner)
+        for params in (
+            {"period": "hourly"},
+            {"from": "2026-06-10", "to": "2026-06-01"},
+            {"period": "daily", "from": "2025-01-01", "to": "2026-06-01"},
+            {"ground": "abc"},
+        ):
+            response = self.client.get("/api/bookings/owner-analytics/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    # TC-B-29
+    def test_impossible_dates_are_bad_requests(self):
+        self.client.force_authenticate(user=self.owner)
+        for url in (
+            "/api/bookings/owner-analytics/",
+            "/api/bookings/owner-bookings/export/",
+            "/api/bookings/open-games/",
+        ):
+            for params in ({"to": "2026-02-30"}, {"from": "2026-13-01", "to": "2026-06-01"}):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (url, params))
+
+
+class BookingConditionalGetTests(BookingTestBase):
+    prefix = "etag"
+
+    def setUp(self):
+        super().setUp()
+        self.booking = Booking.objects.create(
+            ground=self.ground,
+            date=timezone.localdate() + timedelta(days=5),
+            start_time=time(6, 0),
+            end_time=time(7, 0),
+            player=self.player,
+            created_by=self.player,
+            status=Booking.Status.BOOKED,
+        )
+        self.client.force_authenticate(user=self.player)
+
+    def poll(self, etag):
+        return self.client.get("/api/bookings/my/", HTTP_IF_NONE_MATCH=etag)
+
+    # TC-B-11
+    def test_my_bookings_revalidate_without_serializing(self):
+        first = self.client.get("/api/bookings/my/")
+        self.assertNotIn("Last-Modified", first)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.poll(etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.ground.name = "Renamed Ground"
+        self.ground.save()
+        response = self.poll(etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["ground_name"], "Renamed Ground")
+        etag = response["ETag"]
+
+        response = self.client.post(f"/api/bookings/{self.booking.id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.poll(etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["status"], Booking.Status.CANCELLED)
+
+
+class MultiSlotBookingTests(BookingTestBase):
+    prefix = "multi"
+
+    def setUp(self):
+        super().setUp()
+        self.day = timezone.localdate() + timedelta(days=3)
+
+    def book(self, start, end, url="/api/bookings/", user=None):
+        self.client.force_authenticate(user=user or self.player)
+        return self.client.post(
+            url,
+            {
+                "ground": self.ground.id,
+                "date": self.day.isoformat(),
+                "start_time": start,
+                "end_time": end,
+            },
+            format="json",
+        )
+
+    # TC-B-12
+    def test_consecutive_slots_book_as_one_range(self):
+        response = self.book("16:00", "19:00")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["end_time"], "19:00:00")
+
+        for start, end in [("06:00", "12:00"), ("06:30", "07:30"), ("09:00", "08:00")]:
+            response = self.book(start, end)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (start, end))
+
+    # TC-B-13
+    def test_overlapping_ranges_conflict(self):
+        self.assertEqual(self.book("17:00", "19:00").status_code, status.HTTP_201_CREATED)
+
+        for start, end in [("18:00", "19:00"), ("16:00", "18:00"), ("17:00", "19:00")]:
+            response = self.book(start, end)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (start, end))
+            self.assertIn("already booked", str(response.data))
+
+        self.assertEqual(self.book("15:00", "17:00").status_code, status.HTTP_201_CREATED)
+
+    # TC-B-14
+    def test_slot_view_expands_every_booked_slot(self):
+        response = self.book(
+            "08:00", "11:00",
+            url="/api/bookings/owner-direct-booking/",
+            user=self.owner,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(
+            f"/api/grounds/{self.ground.id}/slots/", {"date": self.day.isoformat()}
+        )
+        booked = [slot["start_time"] for slot in response.data["slots"] if slot["booked"]]
+        self.assertEqual(booked, ["08:00", "09:00", "10:00"])
+
+        rollup = BookingRollup.objects.get(ground=self.ground, date=self.day)
+        self.assertEqual(rollup.booked_slots, 3)
+
+    # TC-B-15
+    def test_every_creation_path_reports_slot_taken(self):
+        self.assertEqual(self.book("17:00", "19:00").status_code, status.HTTP_201_CREATED)
+
+        response = self.book(
+            "18:00", "19:00",
+            url="/api/bookings/owner-direct-booking/",
+            user=self.owner,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already booked", str(response.data))
+
+        fields = {
+            "ground": self.ground,
+            "date": self.day,
+            "start_time": time(16, 0),
+            "end_time": time(18, 0),
+            "player": self.player,
+            "status": Booking.Status.BOOKED,
+        }
+        with self.assertRaises(SlotTaken):
+            create_booking(**fields)
+
+        fields["start_time"], fields["end_time"] = time(15, 0), time(17, 0)
+        self.assertEqual(create_booking(**fields).end_time, time(17, 0))
+        self.assertEqual(Booking.objects.filter(ground=self.ground).count(), 2)
+
+
+class BookingSeriesTests(BookingTestBase):
+    prefix = "series"
+
+    def setUp(self):
+        super().setUp()
+        self.start = timezone.localdate() + timedelta(days=7)
+
+    def occupy(self, d, start=time(18, 0), end=time(19, 0)):
+        return Booking.objects.create(
+            ground=self.ground,
+            date=d,
+            start_time=start,
+            end_time=end,
+            player=self.owner,
+            status=Booking.Status.BOOKED,
+        )
+
+    def create_series(self, weeks=12, start="18:00", end="19:00", **extra):
+        self.client.force_authenticate(user=self.player)
+        return self.client.post(
+            "/api/bookings/recurring/",
+            {
+                "ground": self.ground.id,
+                "start_date": self.start.isoformat(),
+                "start_time": start,
+                "end_time": end,
+                "weeks": weeks,
+                **extra,
+            },
+            format="json",
+        )
+
+    def confirm_series(self, series_id, user=None):
+        self.client.force_authenticate(user=user or self.owner)
+        return self.client.post(f"/api/bookings/series/{series_id}/confirm/")
+
+    # TC-B-16
+    def test_series_books_free_weeks_and_reports_conflicts(self):
+        taken = [self.start + timedelta(weeks=2), self.start + timedelta(weeks=5)]
+        self.occupy(taken[0])
+        self.occupy(taken[1], time(17, 0), time(19, 0))
+        self.occupy(self.start + timedelta(weeks=3, days=1))
+
+        response = self.create_series()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data["conflicts"], [d.isoformat() for d in taken])
+        self.assertEqual(len(response.data["created"]), 10)
+
+        series = response.data["series"]
+        self.assertEqual(series["day_of_week"], self.start.weekday())
+        self.assertEqual([row["date"] for row in series["occurrences"]], response.data["created"])
+
+        bookings = Booking.objects.filter(series_id=series["id"])
+        self.assertEqual(bookings.count(), 10)
+        self.assertEqual(set(bookings.values_list("status", flat=True)), {Booking.Status.PENDING})
+        self.assertFalse(bookings.filter(expires_at__isnull=True).exists())
+
+        response = self.create_series(weeks=3, start="17:00", end="19:00")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data["conflicts"]), 3)
+
+        self.assertEqual(self.create_series(weeks=27).status_code, status.HTTP_400_BAD_REQUEST)
+
+    # TC-B-17
+    def test_owner_sees_and_cancels_series_in_one_call(self):
+        series_id = self.create_series(weeks=4).data["series"]["id"]
+        booked = Booking.objects.get(series_id=series_id, date=self.start + timedelta(weeks=1))
+        self.assertEqual(self.confirm_series(series_id).status_code, status.HTTP_200_OK)
+
+        response = self.client.get("/api/bookings/series/")
+        self.assertEqual([row["id"] for row in response.data["results"]], [series_id])
+        self.assertEqual(len(response.data["results"][0]["occurrences"]), 4)
+
+        response = self.client.post(f"/api/bookings/series/{series_id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["cancelled"]), 4)
+        self.assertEqual(
+            set(Booking.objects.filter(series_id=series_id).values_list("status", flat=True)),
+            {Booking.Status.CANCELLED},
+        )
+        self.assertEqual(
+            SlotOccupancy.objects.get(ground=self.ground, date=booked.date).booked_mask, 0
+        )
+        self.assertEqual(
+            BookingRollup.objects.get(ground=self.ground, date=booked.date).cancelled_slots, 1
+        )
+
+        response = self.client.post(f"/api/bookings/series/{series_id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = User.objects.create_user(
+            username="stranger",
+            email="stranger@test.com",
+            password="test12345",
+            phone="9800000603",
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.post(f"/api/bookings/series/{series_id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # TC-B-30
+    def test_series_is_booked_only_once_the_owner_confirms(self):
+        response = self.create_series(weeks=2, payment_mode=Booking.PaymentMode.PAY_FULL_ONLINE)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.occupy(self.start + timedelta(weeks=1))
+        response = self.create_series(weeks=3, start="17:00", end="19:00")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        series_id, created_dates = response.data["series"]["id"], response.data["created"]
+
+        def booked_on(d):
+            slots = self.client.get(f"/api/grounds/{self.ground.id}/slots/", {"date": d}).data["slots"]
+            booked = {row["start_time"]: row["booked"] for row in slots}
+            return booked["16:00"], booked["17:00"], booked["18:00"]
+
+        # Unconfirmed occurrences hold their slots without being booked.
+        self.assertFalse(Booking.objects.filter(series_id=series_id, status=Booking.Status.BOOKED).exists())
+        for created in created_dates:
+            self.assertEqual(booked_on(created), (False, False, False))
+        late = self.client.post(
+            "/api/bookings/",
+            {"ground": self.ground.id, "date": self.start.isoformat(), "start_time": "18:00", "end_time": "19:00"},
+            format="json",
+        )
+        self.assertEqual(late.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.confirm_series(series_id, user=self.player).status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.confirm_series(series_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data["confirmed"], created_dates)
+        for created in created_dates:
+            self.assertEqual(booked_on(created), (False, True, True))
+            rollup = BookingRollup.objects.get(ground=self.ground, date=created)
+            self.assertEqual((rollup.booked_slots, rollup.booked_amount), (2, 2000))
+
+        bookings = Booking.objects.filter(series_id=series_id)
+        self.assertEqual(
+            set(bookings.values_list("status", "payment_mode", "expires_at")),
+            {(Booking.Status.BOOKED, Booking.PaymentMode.PAY_DEPOSIT, None)},
+        )
+        self.assertEqual(self.confirm_series(series_id).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class JoinedFlagQueryTests(BookingTestBase):
+    prefix = "joined"
+
+    def setUp(self):
+        super().setUp()
+        self.host = self.make_user("host")
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.hour = 6
+
+    def open_game(self, joined):
+        booking = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(self.hour, 0),
+            end_time=time(self.hour + 1, 0),
+            player=self.host,
+            created_by=self.host,
+            status=Booking.Status.BOOKED,
+            booking_type=Booking.BookingType.OPEN,
+            required_players=10,
+        )
+        self.hour += 1
+        group = create_temporary_chat_for_booking(booking)
+        if joined:
+            ChatGroupMember.objects.create(group=group, user=self.player)
+        return booking
+
+    def open_games(self):
+        response = self.client.get("/api/bookings/open-games/")
+        return {row["id"]: row["is_joined"] for row in response.data["results"]}
+
+    # TC-B-18
+    def test_is_joined_costs_one_query_per_list(self):
+        expected = {}
+        for joined in (True, False):
+            expected[self.open_game(joined).id] = joined
+
+        self.client.force_authenticate(user=self.player)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.open_games(), expected)
+
+        for joined in (True, False, True, False):
+            expected[self.open_game(joined).id] = joined
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.open_games(), expected)
+
+        self.client.force_authenticate(user=None)
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.open_games().values()), {False})
+
+    # TC-B-19
+    def test_single_booking_serializer_loads_groups_once(self):
+        bookings = [self.open_game(joined) for joined in (True, False, True)]
+        request = APIRequestFactory().get("/")
+        request.user = self.player
+
+        rows = Booking.objects.select_related("ground", "chat_group").filter(
+            pk__in=[booking.pk for booking in bookings]
+        ).order_by("start_time")
+        rows = list(rows)
+        with self.assertNumQueries(1):
+            data = BookingSerializer(rows, many=True, context={"request": request}).data
+        self.assertEqual([row["is_joined"] for row in data], [True, False, True])
+
+
+class BookingRowSerializerTests(BookingTestBase):
+    prefix = "rows"
+
+    # TC-B-20
+    def test_rows_render_identically_to_booking_serializer(self):
+        plain = self.ground
+        pictured = self.make_ground(
+            "Rows Pictured",
+            location="Lalitpur",
+            phone="9801234567",
+            price_per_hour=1250,
+            slot_minutes=90,
+            opens_at=time(7, 0),
+            closes_at=time(13, 0),
+            image="grounds/rows.jpg",
+            image_variants={"card": {"jpeg": "grounds/variants/ab/card.jpeg"}},
+        )
+        free = self.make_ground("Rows Free", location="Bhaktapur", price_per_hour=0)
+
+        day = timezone.localdate() + timedelta(days=4)
+        Booking.objects.create(
+            ground=plain, date=day, start_time=time(6, 0), end_time=time(8, 0),
+            player=self.player, created_by=self.player, paid_amount="500.00",
+            payment_mode=Booking.PaymentMode.PAY_FULL_ONLINE,
+        )
+        Booking.objects.create(
+            ground=plain, date=day, start_time=time(9, 0), end_time=time(10, 0),
+            player=self.owner, created_by=self.owner, source=Booking.Source.OFFLINE,
+            status=Booking.Status.BOOKED, paid_amount="5000.00",
+        )
+        open_game = Booking.objects.create(
+            ground=pictured, date=day, start_time=time(8, 30), end_time=time(11, 30),
+            player=self.owner, created_by=self.owner, status=Booking.Status.BOOKED,
+            booking_type=Booking.BookingType.OPEN, required_players=4, current_players=2,
+            open_game_note="Bring bibs",
+        )
+        group = create_temporary_chat_for_booking(open_game)
+        ChatGroupMember.objects.create(group=group, user=self.player)
+        Booking.objects.create(
+            ground=free, date=day, start_time=time(6, 0), end_time=time(7, 0),
+            player=self.player, created_by=self.player, status=Booking.Status.CANCELLED,
+        )
+
+        request = APIRequestFactory().get("/api/bookings/my/")
+        request.user = self.player
+        bookings = Booking.objects.select_related("ground", "created_by", "chat_group").order_by("pk")
+
+        expected = BookingSerializer(bookings, many=True, context={"request": request}).data
+        rows = BookingRowSerializer(
+            bookings.values(*BOOKING_VALUES), many=True, context={"request": request}
+        ).data
+
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(JSONRenderer().render(rows), JSONRenderer().render(expected))
+
+
+class OpenGameDiscoveryTests(BookingTestBase):
+    prefix = "discover"
+
+    def setUp(self):
+        super().setUp()
+        self.city = self.make_ground("City Five")
+        self.valley = self.make_ground(
+            "Valley Seven",
+            location="Lalitpur",
+            price_per_hour=1500,
+            ground_size=Ground.Size.SEVEN,
+        )
+        self.today = timezone.localdate()
+
+    def game(self, ground, days, hour=6, current=1, required=4, **fields):
+        return Booking.objects.create(
+            ground=ground,
+            date=self.today + timedelta(days=days),
+            start_time=time(hour, 0),
+            end_time=time(hour + 1, 0),
+            player=self.owner,
+            created_by=self.owner,
+            status=fields.pop("status", Booking.Status.BOOKED),
+            booking_type=fields.pop("booking_type", Booking.BookingType.OPEN),
+            current_players=current,
+            required_players=required,
+        )
+
+    def listed(self, **params):
+        response = self.client.get("/api/bookings/open-games/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [row["id"] for row in response.data["results"]]
+
+    # TC-B-21
+    def test_only_upcoming_joinable_games_are_listed(self):
+        upcoming = self.game(self.city, 1)
+        later = self.game(self.valley, 3, hour=8)
+        self.game(self.city, -1)
+        self.game(self.city, 2, current=4)
+        self.game(self.city, 2, hour=7, status=Booking.Status.CANCELLED)
+        self.game(self.city, 2, hour=8, booking_type=Booking.BookingType.CLOSED)
+
+        self.assertEqual(self.listed(), [upcoming.id, later.id])
+        self.assertEqual(self.listed(location="lalit"), [later.id])
+        self.assertEqual(self.listed(ground_size=Ground.Size.FIVE), [upcoming.id])
+        self.assertEqual(
+            self.listed(**{"from": (self.today + timedelta(days=2)).isoformat()}),
+            [later.id],
+        )
+        self.assertEqual(self.listed(to=(self.today + timedelta(days=1)).isoformat()), [upcoming.id])
+
+        for params in ({"from": "tomorrow"}, {"ground_size": "ELEVEN"}, {"from": "2026-05-02", "to": "2026-05-01"}):
+            response = self.client.get("/api/bookings/open-games/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    # TC-B-22
+    def test_pages_cost_the_same_regardless_of_history(self):
+        for days in range(1, 8):
+            self.game(self.city, days)
+            self.game(self.valley, days, hour=9)
+        for days in range(1, 30):
+            self.game(self.city, -days)
+            self.game(self.city, days, hour=12, current=4)
+
+        with self.assertNumQueries(1):
+            first = self.client.get("/api/bookings/open-games/", {"page_size": 5})
+        self.assertEqual(len(first.data["results"]), 5)
+
+        seen = [row["id"] for row in first.data["results"]]
+        url = first.data["next"]
+        while url:
+            with self.assertNumQueries(1):
+                page = self.client.get(url)
+            seen += [row["id"] for row in page.data["results"]]
+            url = page.data["next"]
+
+        self.assertEqual(len(seen), 14)
+        self.assertEqual(len(set(seen)), 14)
+
+
+class PendingHoldExpiryTests(BookingTestBase):
+    prefix = "hold"
+
+    def setUp(self):
+        super().setUp()
+        self.rival = self.make_user("rival")
+        self.day = timezone.localdate() + timedelta(days=2)
+
+    def book(self, user, start="18:00", end="19:00"):
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            "/api/bookings/",
+            {
+                "ground": self.ground.id,
+                "date": self.day.isoformat(),
+                "start_time": start,
+                "end_time": end,
+            },
+            format="json",
+        )
+
+    def hold(self, hour, expires_in):
+        return Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(hour, 0),
+            end_time=time(hour + 1, 0),
+            player=self.player,
+            created_by=self.player,
+            status=Booking.Status.PENDING,
+            expires_at=None if expires_in is None else timezone.now() + expires_in,
+        )
+
+    # TC-B-23
+    def test_expired_hold_frees_its_slot(self):
+        response = self.book(self.player)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        held = Booking.objects.get(pk=response.data["id"])
+        self.assertIsNotNone(held.expires_at)
+        self.assertGreater(held.expires_at, timezone.now())
+
+        self.assertEqual(self.book(self.rival).status_code, status.HTTP_400_BAD_REQUEST)
+
+        Booking.objects.filter(pk=held.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.book(self.rival)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        held.refresh_from_db()
+        self.assertEqual(held.status, Booking.Status.CANCELLED)
+        # A lapsed hold was never booked, so it is not a cancellation.
+        self.assertFalse(BookingRollup.objects.filter(cancelled_slots__gt=0).exists())
+
+    # TC-B-24
+    def test_reaper_cancels_expired_holds_in_batches(self):
+        expired = [self.hold(hour, timedelta(minutes=-hour)) for hour in (6, 7, 8, 9, 10)]
+        live = self.hold(11, timedelta(minutes=10))
+        standing = self.hold(12, None)
+        version = self.ground.slots_version
+
+        out = StringIO()
+        call_command("expire_pending_bookings", "--batch-size", "2", stdout=out)
+        self.assertIn("Expired 5 pending bookings.", out.getvalue())
+
+        self.assertEqual(
+            set(Booking.objects.filter(status=Booking.Status.CANCELLED).values_list("pk", flat=True)),
+            {booking.pk for booking in expired},
+        )
+        for booking in (live, standing):
+            booking.refresh_from_db()
+            self.assertEqual(booking.status, Booking.Status.PENDING)
+
+        self.ground.refresh_from_db()
+        self.assertGreater(self.ground.slots_version, version)
+        self.assertFalse(BookingRollup.objects.exists())
+        call_command("rebuild_booking_rollups", "--all", stdout=StringIO())
+        self.assertFalse(BookingRollup.objects.exists())
+
+        out = StringIO()
+        call_command("expire_pending_bookings", stdout=out)
+        self.assertIn("Expired 0 pending bookings.", out.getvalue())
+
+    # TC-B-32
+    def test_pending_rows_from_before_hold_expiry_are_backfilled(self):
+        stale = self.hold(6, None)
+        recent = self.hold(7, None)
+        Booking.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(hours=1))
+
+        backfill = import_module("bookings.migrations.0014_backfill_hold_expiry").backfill_hold_expiry
+        backfill(django_apps, None)
+
+        self.assertEqual(expire_holds(), 1)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(stale.status, Booking.Status.CANCELLED)
+        self.assertEqual(recent.status, Booking.Status.PENDING)
+        self.assertEqual(recent.expires_at, recent.created_at + HOLD_TTL)
+
+
+class WaitlistTests(BookingTestBase):
+    prefix = "wait"
+
+    def setUp(self):
+        super().setUp()
+        self.players = [self.make_user(f"player{i}") for i in range(4)]
+        self.day = timezone.localdate() + timedelta(days=2)
+
+    def post(self, user, url, data=None):
+        self.client.force_authenticate(user=user)
+        return self.client.post(url, data or {}, format="json")
+
+    def wait_for_slot(self, user, start="18:00", end="19:00"):
+        return self.post(
+            user,
+            "/api/bookings/waitlist/",
+            {
+                "ground": self.ground.id,
+                "date": self.day.isoformat(),
+                "start_time": start,
+                "end_time": end,
+            },
+        )
+
+    def promote(self):
+        out = StringIO()
+        call_command("promote_waitlist", stdout=out)
+        return out.getvalue()
+
+    # TC-B-25
+    def test_freed_slot_goes_to_the_oldest_waiter(self):
+        holder, first, second, _ = self.players
+        booking = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(18, 0),
+            end_time=time(19, 0),
+            player=holder,
+            created_by=holder,
+            status=Booking.Status.BOOKED,
+        )
+
+        self.assertEqual(self.wait_for_slot(first).data["position"], 1)
+        self.assertEqual(self.wait_for_slot(second).data["position"], 2)
+        self.assertEqual(self.wait_for_slot(first).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.wait_for_slot(second, "19:00", "20:00").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+        self.assertIn("Promoted 0 waitlist entries.", self.promote())
+
+        response = self.post(holder, f"/api/bookings/{booking.id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertIn("Promoted 1 waitlist entries.", self.promote())
+
+        entries = {entry.user_id: entry for entry in WaitlistEntry.objects.all()}
+        self.assertEqual(entries[first.pk].status, WaitlistEntry.Status.PROMOTED)
+        self.assertEqual(entries[second.pk].status, WaitlistEntry.Status.WAITING)
+
+        hold = entries[first.pk].promoted_booking
+        self.assertEqual((hold.player_id, hold.status), (first.pk, Booking.Status.PENDING))
+        self.assertIsNotNone(hold.expires_at)
+        self.assertTrue(
+            ConnectionNotification.objects.filter(
+                user=first,
+                notification_type=ConnectionNotification.Type.WAITLIST_PROMOTED,
+            ).exists()
+        )
+
+        # The promoted hold lapses, so the slot moves on to the next waiter.
+        Booking.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIn("Promoted 1 waitlist entries.", self.promote())
+        entries[second.pk].refresh_from_db()
+        self.assertEqual(entries[second.pk].status, WaitlistEntry.Status.PROMOTED)
+        self.assertEqual(entries[second.pk].promoted_booking.player_id, second.pk)
+
+        self.client.force_authenticate(user=second)
+        response = self.client.get("/api/bookings/waitlist/", {"status": "promoted"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [entries[second.pk].id])
+
+    # TC-B-31
+    @override_settings(
+        ESEWA_PRODUCT_CODE="EPAYTEST",
+        ESEWA_SECRET_KEY="test_secret",
+        ESEWA_FORM_URL="https://rc-epay.esewa.com.np/api/epay/main/v2/form",
+        ESEWA_SUCCESS_URL="http://127.0.0.1:8000/api/payments/esewa/success/",
+        ESEWA_FAILURE_URL="http://127.0.0.1:8000/api/payments/esewa/failure/",
+    )
+    def test_promoted_player_completes_the_held_booking(self):
+        holder, first, other, _ = self.players
+        booking = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(18, 0),
+            end_time=time(19, 0),
+            player=holder,
+            created_by=holder,
+            status=Booking.Status.BOOKED,
+        )
+        self.wait_for_slot(first)
+        self.post(holder, f"/api/bookings/{booking.id}/cancel/")
+        self.promote()
+        hold = WaitlistEntry.objects.get(user=first).promoted_booking
+
+        slot = {
+            "ground": self.ground.id,
+            "date": self.day.isoformat(),
+            "start_time": "18:00",
+            "end_time": "19:00",
+        }
+        response = self.post(other, "/api/bookings/", slot)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post(other, "/api/payments/esewa/initiate/", {**slot, "total_amount": "1000"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.post(first, "/api/bookings/", slot)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Booking.objects.filter(status=Booking.Status.PENDING).get().pk, hold.pk)
+
+        response = self.post(first, "/api/payments/esewa/initiate/", {**slot, "total_amount": "1000"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        rollup = BookingRollup.objects.get(ground=self.ground, date=self.day)
+        booking, result = create_booking_from_intent(response.data["fields"]["transaction_uuid"], "TEST123")
+
+        self.assertEqual((booking.pk, result), (hold.pk, "created"))
+        booking.refresh_from_db()
+        self.assertEqual((booking.status, booking.expires_at), (Booking.Status.BOOKED, None))
+        self.assertEqual(booking.paid_amount, 1000)
+        self.assertEqual(SlotOccupancy.objects.get(ground=self.ground, date=self.day).booked_mask.bit_count(), 1)
+        booked_slots = rollup.booked_slots
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.booked_slots, booked_slots + 1)
+
+    # TC-B-33
+    def test_freed_capacity_promotes_the_head_entry_at_once(self):
+        holder, first, second, _ = self.players
+        booking = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(18, 0),
+            end_time=time(19, 0),
+            player=holder,
+            created_by=holder,
+            status=Booking.Status.BOOKED,
+        )
+        self.wait_for_slot(first)
+        self.wait_for_slot(second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(holder, f"/api/bookings/{booking.id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+        entries = {entry.user_id: entry for entry in WaitlistEntry.objects.all()}
+        self.assertEqual(entries[first.pk].status, WaitlistEntry.Status.PROMOTED)
+        self.assertEqual(entries[second.pk].status, WaitlistEntry.Status.WAITING)
+
+        # When the promoted hold is reaped, the next waiter gets the slot.
+        hold = entries[first.pk].promoted_booking
+        Booking.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expire_holds(), 1)
+
+        entries[second.pk].refresh_from_db()
+        self.assertEqual(entries[second.pk].status, WaitlistEntry.Status.PROMOTED)
+        self.assertEqual(entries[second.pk].promoted_booking.player_id, second.pk)
+
+    # TC-B-26
+    def test_spot_left_in_open_game_goes_to_the_waitlist(self):
+        creator, member, waiter, _ = self.players
+        game = Booking.objects.create(
+            ground=self.ground,
+            date=self.day,
+            start_time=time(6, 0),
+            end_time=time(7, 0),
+            player=creator,
+            created_by=creator,
+            status=Booking.Status.BOOKED,
+            booking_type=Booking.BookingType.OPEN,
+            current_players=2,
+            required_players=2,
+        )
+        group = create_temporary_chat_for_booking(game)
+        add_user_to_booking_chat(game, member)
+
+        response = self.post(waiter, f"/api/bookings/{game.id}/waitlist/")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data["position"], 1)
+        entry = WaitlistEntry.objects.get(pk=response.data["id"])
+
+        self.assertEqual(self.post(waiter, f"/api/bookings/{game.id}/join/").status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Leaving hands the spot to the waitlist as soon as it commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(member, f"/api/bookings/{game.id}/leave/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data["current_players"], 1)
+        self.assertIn("Promoted 0 waitlist entries.", self.promote())
+        game.refresh_from_db()
+        entry.refresh_from_db()
+        self.assertEqual(game.current_players, 2)
+        self.assertEqual(entry.status, WaitlistEntry.Status.PROMOTED)
+        self.assertTrue(ChatGroupMember.objects.filter(group=group, user=waiter).exists())
+        self.assertFalse(ChatGroupMember.objects.filter(group=group, user=member).exists())
+        self.assertTrue(
+            ConnectionNotification.objects.filter(
+                user=waiter,
+                notification_type=ConnectionNotification.Type.WAITLIST_PROMOTED,
+            ).exists()
+        )
+
+        response = self.post(waiter, f"/api/bookings/waitlist/{entry.id}/cancel/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OwnerBookingExportTests(BookingTestBase):
+    prefix = "export"
+
+    def setUp(self):
+        super().setUp()
+        self.other_owner = self.make_user("other", user_type="owner")
+        self.north, self.south = self.make_ground("North"), self.make_ground("South")
+        self.elsewhere = self.make_ground("Elsewhere", owner=self.other_owner)
+        self.start = date(2025, 1, 1)
+        self.bookings = {
+            (ground.name, days): Booking.objects.create(
+                ground=ground,
+                date=self.start + timedelta(days=days),
+                start_time=time(6, 0),
+                end_time=time(8, 0),
+                player=self.player,
+                created_by=self.player,
+                status=Booking.Status.BOOKED,
+                paid_amount=500,
+            )
+            for ground in (self.north, self.south, self.elsewhere)
+            for days in range(5)
+        }
+
+    def export(self, user=None, **params):
+        self.client.force_authenticate(user=user or self.owner)
+        return self.client.get("/api/bookings/owner-bookings/export/", params)
+
+    # TC-B-27
+    def test_export_streams_filtered_csv_and_ndjson(self):
+        response = self.export(**{"from": "2025-01-02", "to": "2025-01-04"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="bookings.csv"', response["Content-Disposition"])
+
+        rows = list(csv.DictReader(StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(
+            [(row["ground_name"], row["date"]) for row in rows],
+            [
+                (name, (self.start + timedelta(days=days)).isoformat())
+                for days in (1, 2, 3)
+                for name in ("North", "South")
+            ],
+        )
+        self.assertEqual(rows[0]["total_amount"], "2000.00")
+        self.assertEqual(rows[0]["remaining_amount"], "1500.00")
+        self.assertEqual(rows[0]["transaction_uuid"], "")
+
+        response = self.export(output="ndjson", ground=self.south.id)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [record["id"] for record in records],
+            [self.bookings[("South", days)].id for days in range(5)],
+        )
+        self.assertEqual(records[0]["paid_amount"], "500.00")
+
+    # TC-B-28
+    def test_export_rejects_bad_parameters(self):
+        for params in (
+            {"output": "xml"},
+            {"from": "yesterday"},
+            {"from": "2025-01-03", "to": "2025-01-01"},
+            {"ground": "north"},
+        ):
+            self.assertEqual(self.export(**params).status_code, status.HTTP_400_BAD_REQUEST, params)
+
+        self.assertEqual(self.export(user=self.player).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.export(ground=self.elsewhere.id)
+        self.assertEqual(b"".join(response.streaming_content).decode().count("\n"), 1)
@@ -1,24 +1,54 @@
 from datetime import datetime, timedelta
+from functools import partial
 
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import Booking
+from backend.conditional import conditional_response
+from backend.params import parse_date_param
+from backend.pagination import paginated_response
+from .availability import SlotTaken
+from .export import EXPORT_FORMATS, export_lines
+from .listing import BOOKING_VALUES, BookingRowSerializer
+from .models import JOINABLE_OPEN_GAME, Booking, BookingSeries, WaitlistEntry
+from .rollups import apply_booking_rollup, owner_analytics
 from .serializers import (
     BookingCreateSerializer,
     BookingSerializer,
+    BookingSeriesCreateSerializer,
+    BookingSeriesSerializer,
     JoinOpenBookingSerializer,
+    LeaveOpenBookingSerializer,
+    OpenGameWaitlistSerializer,
     OwnerDirectBookingSerializer,
+    SlotWaitlistSerializer,
+    WaitlistEntrySerializer,
 )
+from .series import cancel_booking_series, confirm_booking_series, create_booking_series
+from .waitlist import promote_freed_ranges, waitlist_position
 from chat.utils import (
     add_user_to_booking_chat,
     create_temporary_chat_for_booking,
     deactivate_booking_chat,
+    joined_group_ids,
 )
 from connections.models import ConnectionNotification
 from connections.utils import create_notification
+from grounds.models import Ground
+from grounds.utils import sync_booking_occupancy
+
+
+# period -> (default days, max days) for owner analytics
+ANALYTICS_PERIODS = {
+    "daily": (30, 366),
+    "weekly": (84, 731),
+    "monthly": (365, 1096),
+}
 
 
 class BookingViewSet(viewsets.ModelViewSet):
@@ -35,6 +65,8 @@ class BookingViewSet(viewsets.ModelViewSet):
             "open_games",
             "retrieve",
             "join",
+            "leave",
+            "join_waitlist",
             "deactivate_chat",
             "owner_bookings",
             "owner_ground_bookings",
@@ -55,16 +87,36 @@ class BookingViewSet(viewsets.ModelViewSet):
             return OwnerDirectBookingSerializer
         return BookingSerializer
 
+    def list_context(self, request):
+        return {"request": request, "joined_group_ids": joined_group_ids(request.user)}
+
+    def conditional_list(self, request, bookings):
+        # Rows embed ground fields and the chat group id, so those count as changes too.
+        # Validated by ETag only; see GroundViewSet.list.
+        stats = bookings.select_related(None).order_by().aggregate(
+            last_modified=Max("updated_at"),
+            ground_modified=Max("ground__updated_at"),
+            chats=Count("chat_group"),
+            count=Count("pk"),
+        )
+        return conditional_response(
+            request,
+            lambda: paginated_response(
+                request,
+                bookings.values(*BOOKING_VALUES),
+                BookingRowSerializer,
+                view=self,
+                context=self.list_context(request),
+            ),
+            (request.user.pk, stats["count"], stats["chats"], stats["last_modified"], stats["ground_modified"]),
+        )
+
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        serializer = BookingSerializer(qs, many=True, context={"request": request})
-        return Response(serializer.data)
+        return self.conditional_list(request, self.get_queryset())
 
     @action(detail=False, methods=["get"], url_path="my")
     def my(self, request):
-        qs = self.get_queryset()
-        serializer = BookingSerializer(qs, many=True, context={"request": request})
-        return Response(serializer.data)
+        return self.conditional_list(request, self.get_queryset())
 
     @action(detail=False, methods=["get"], url_path="owner-bookings")
     def owner_bookings(self, request):
@@ -83,8 +135,128 @@ class BookingViewSet(viewsets.ModelViewSet):
             .order_by("-date", "-start_time", "-created_at")
         )
 
-        serializer = BookingSerializer(bookings, many=True, context={"request": request})
-        return Response(serializer.data)
+        return paginated_response(
+            request,
+            bookings.values(*BOOKING_VALUES),
+            BookingRowSerializer,
+            view=self,
+            context=self.list_context(request),
+        )
+
+    @action(detail=False, methods=["get"], url_path="owner-bookings/export")
+    def owner_bookings_export(self, request):
+        user_role = getattr(request.user, "role", None) or getattr(request.user, "user_type", None)
+
+        if str(user_role).upper() != "OWNER":
+            return Response(
+                {"detail": "Only owners can export owner bookings."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        params = request.query_params
+        output = (params.get("output") or "csv").lower()
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"output must be one of {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            start = parse_date_param(params.get("from"))
+            end = parse_date_param(params.get("to"))
+        except ValueError:
+            return Response(
+                {"detail": "from and to must be YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start and end and end < start:
+            return Response(
+                {"detail": "to must not be before from."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bookings = Booking.objects.filter(ground__owner=request.user).order_by("date", "start_time", "id")
+        if start:
+            bookings = bookings.filter(date__gte=start)
+        if end:
+            bookings = bookings.filter(date__lte=end)
+
+        ground_ids = params.getlist("ground")
+        if ground_ids:
+            if not all(ground_id.isdigit() for ground_id in ground_ids):
+                return Response(
+                    {"detail": "ground must be a ground id."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            bookings = bookings.filter(ground_id__in=ground_ids)
+
+        # is_joined is not exported, so skip loading the owner's chat groups.
+        context = {"request": request, "joined_group_ids": frozenset()}
+        response = StreamingHttpResponse(
+            export_lines(bookings, output, context),
+            content_type=EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="bookings.{output}"'
+        return response
+
+    @action(detail=False, methods=["get"], url_path="owner-analytics")
+    def owner_analytics(self, request):
+        user_role = getattr(request.user, "role", None) or getattr(request.user, "user_type", None)
+
+        if str(user_role).upper() != "OWNER":
+            return Response(
+                {"detail": "Only owners can view analytics."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        params = request.query_params
+        period = params.get("period", "daily")
+        if period not in ANALYTICS_PERIODS:
+            return Response(
+                {"detail": f"period must be one of: {', '.join(ANALYTICS_PERIODS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        default_days, max_days = ANALYTICS_PERIODS[period]
+
+        try:
+            end = parse_date_param(params.get("to")) or timezone.localdate()
+            start = parse_date_param(params.get("from"))
+        except ValueError:
+            start = end = None
+        if end and not params.get("from"):
+            start = end - timedelta(days=default_days - 1)
+
+        if not (start and end):
+            return Response(
+                {"detail": "from and to must be YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if end < start:
+            return Response(
+                {"detail": "to must not be before from."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if (end - start).days >= max_days:
+            return Response(
+                {"detail": f"Date range cannot exceed {max_days} days for {period} analytics."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ground_id = params.get("ground")
+        if ground_id is not None and not ground_id.isdigit():
+            return Response(
+                {"detail": "ground must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({
+            "period": period,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "results": owner_analytics(request.user, period, start, end, ground_id=ground_id),
+        })
 
     def retrieve(self, request, *args, **kwargs):
         booking = self.get_object()
@@ -146,24 +318,57 @@ class BookingViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.AllowAny],
     )
     def open_games(self, request):
+        params = request.query_params
+        now = timezone.localtime()
+
         qs = (
             Booking.objects
-            .select_related("ground", "created_by", "chat_group")
-            .filter(
-                booking_type=Booking.BookingType.OPEN,
-                status=Booking.Status.BOOKED,
-            )
+            .filter(JOINABLE_OPEN_GAME)
+            .filter(Q(date__gt=now.date()) | Q(date=now.date(), start_time__gt=now.time()))
             .order_by("date", "start_time")
         )
 
-        today_only = request.query_params.get("today")
-        if today_only == "1":
-            qs = qs.filter(date=timezone.localdate())
-
-        qs = [booking for booking in qs if booking.current_players < booking.required_players]
+        if params.get("today") == "1":
+            qs = qs.filter(date=now.date())
 
-        serializer = BookingSerializer(qs, many=True, context={"request": request})
-        return Response(serializer.data)
+        try:
+            start = parse_date_param(params.get("from"))
+            end = parse_date_param(params.get("to"))
+        except ValueError:
+            return Response(
+                {"detail": "from and to must be YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start and end and end < start:
+            return Response(
+                {"detail": "to must not be before from."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start:
+            qs = qs.filter(date__gte=start)
+        if end:
+            qs = qs.filter(date__lte=end)
+
+        location = (params.get("location") or "").strip()
+        if location:
+            qs = qs.filter(ground__location__icontains=location)
+
+        ground_size = (params.get("ground_size") or "").strip()
+        if ground_size:
+            if ground_size not in Ground.Size.values:
+                return Response(
+                    {"detail": f"ground_size must be one of {', '.join(Ground.Size.values)}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(ground__ground_size=ground_size)
+
+        return paginated_response(
+            request,
+            qs.values(*BOOKING_VALUES),
+            BookingRowSerializer,
+            view=self,
+            context=self.list_context(request),
+        )
 
     @action(detail=True, methods=["post"], url_path="join")
     def join(self, request, pk=None):
@@ -184,6 +389,37 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         return Response(data, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["post"], url_path="leave")
+    def leave(self, request, pk=None):
+        booking = self.get_object()
+
+        serializer = LeaveOpenBookingSerializer(
+            data={},
+            context={"booking": booking, "request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        booking = serializer.save()
+
+        return Response(
+            BookingSerializer(booking, context={"request": request}).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"], url_path="waitlist")
+    def join_waitlist(self, request, pk=None):
+        booking = self.get_object()
+
+        serializer = OpenGameWaitlistSerializer(
+            data={},
+            context={"booking": booking, "request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        entry = serializer.save()
+
+        data = WaitlistEntrySerializer(entry, context={"request": request}).data
+        data["position"] = waitlist_position(entry)
+        return Response(data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=["post"], url_path="cancel")
     def cancel_booking(self, request, pk=None):
         booking = self.get_object()
@@ -223,8 +459,15 @@ class BookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        previous_status = booking.status
         booking.status = Booking.Status.CANCELLED
-        booking.save(update_fields=["status"])
+        booking.save(update_fields=["status", "updated_at"])
+        sync_booking_occupancy(booking, previous_status)
+        apply_booking_rollup(booking, previous_status)
+        transaction.on_commit(partial(
+            promote_freed_ranges,
+            [(booking.ground_id, booking.date, booking.start_time, booking.end_time)],
+        ))
 
         if booking.booking_type == Booking.BookingType.OPEN and booking.chat_group_id:
             deactivate_booking_chat(booking)
@@ -306,5 +549,195 @@ class BookingViewSet(viewsets.ModelViewSet):
             .order_by("-date", "-start_time", "-created_at")
         )
 
-        serializer = BookingSerializer(bookings, many=True, context={"request": request})
-        return Response(serializer.data)
\ No newline at end of file
+        return paginated_response(
+            request,
+            bookings.values(*BOOKING_VALUES),
+            BookingRowSerializer,
+            view=self,
+            context=self.list_context(request),
+        )
+
+    def series_queryset(self, request):
+        series = BookingSeries.objects.select_related("ground__owner").prefetch_related("bookings")
+        return series.filter(Q(player=request.user) | Q(ground__owner=request.user))
+
+    @action(detail=False, methods=["post"], url_path="recurring")
+    def recurring(self, request):
+        serializer = BookingSeriesCreateSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            series, created, conflicts = create_booking_series(player=request.user, **serializer.validated_data)
+        except SlotTaken:
+            return Response(
+                {"detail": "This slot is already booked."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if series is None:
+            return Response(
+                {
+                    "detail": "Every date in the series is already booked.",
+                    "conflicts": [d.isoformat() for d in conflicts],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        owner = series.ground.owner
+        if owner.pk != request.user.pk:
+            create_notification(
+                user=owner,
+                actor=request.user,
+                notification_type=ConnectionNotification.Type.BOOKING_REQUEST,
+                message=(
+                    f"{request.user.username} requested {series.ground.name} every "
+                    f"{series.start_date.strftime('%A')} from "
+                    f"{series.start_time.strftime('%H:%M')} to "
+                    f"{series.end_time.strftime('%H:%M')} for {len(created)} weeks. "
+                    f"Confirm the series to book it."
+                ),
+            )
+
+        series = self.series_queryset(request).get(pk=series.pk)
+        return Response(
+            {
+                "series": BookingSeriesSerializer(series, context={"request": request}).data,
+                "created": [d.isoformat() for d in created],
+                "conflicts": [d.isoformat() for d in conflicts],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["get"], url_path="series")
+    def series(self, request):
+        series = self.series_queryset(request)
+
+        ground_id = request.query_params.get("ground")
+        if ground_id:
+            series = series.filter(ground_id=ground_id)
+
+        return paginated_response(request, series, BookingSeriesSerializer, view=self)
+
+    @action(detail=False, methods=["post"], url_path=r"series/(?P<series_id>\d+)/confirm")
+    def confirm_series(self, request, series_id=None):
+        series = (
+            BookingSeries.objects
+            .select_related("ground", "player")
+            .filter(pk=series_id, ground__owner=request.user, status=BookingSeries.Status.ACTIVE)
+            .first()
+        )
+        if series is None:
+            return Response({"detail": "Series not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        confirmed = confirm_booking_series(series)
+        if not confirmed:
+            return Response(
+                {"detail": "This series has nothing left to confirm."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if series.player and series.player.pk != request.user.pk:
+            create_notification(
+                user=series.player,
+                actor=request.user,
+                notification_type=ConnectionNotification.Type.BOOKING_CONFIRMED,
+                message=(
+                    f"Your weekly booking for {series.ground.name} on "
+                    f"{series.start_date.strftime('%A')}s from "
+                    f"{series.start_time.strftime('%H:%M')} to "
+                    f"{series.end_time.strftime('%H:%M')} has been confirmed."
+                ),
+            )
+
+        return Response(
+            {
+                "detail": "Series confirmed successfully.",
+                "series_id": series.id,
+                "confirmed": [d.isoformat() for d in confirmed],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path=r"series/(?P<series_id>\d+)/cancel")
+    def cancel_series(self, request, series_id=None):
+        series = self.series_queryset(request).filter(pk=series_id).first()
+        if series is None:
+            return Response({"detail": "Series not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if series.status == BookingSeries.Status.CANCELLED:
+            return Response(
+                {"detail": "Series is already cancelled."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cancelled = cancel_booking_series(series)
+
+        owner = series.ground.owner
+        recipient = series.player if request.user.pk == owner.pk else owner
+        if recipient and recipient.pk != request.user.pk:
+            create_notification(
+                user=recipient,
+                actor=request.user,
+                notification_type=ConnectionNotification.Type.BOOKING_CANCELLED,
+                message=(
+                    f"{request.user.username} cancelled the weekly booking for "
+                    f"{series.ground.name} on {series.start_date.strftime('%A')}s "
+                    f"from {series.start_time.strftime('%H:%M')} to {series.end_time.strftime('%H:%M')}."
+                ),
+            )
+
+        return Response(
+            {
+                "detail": "Series cancelled successfully.",
+                "series_id": series.id,
+                "status": series.status,
+                "cancelled": [d.isoformat() for d in cancelled],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get", "post"], url_path="waitlist")
+    def waitlist(self, request):
+        if request.method == "GET":
+            entries = WaitlistEntry.objects.select_related("ground").filter(user=request.user)
+            entry_status = request.query_params.get("status")
+            if entry_status:
+                entries = entries.filter(status=entry_status.upper())
+
+            return paginated_response(
+                request,
+                entries.order_by("-created_at", "-id"),
+                WaitlistEntrySerializer,
+                view=self,
+            )
+
+        serializer = SlotWaitlistSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        entry = serializer.save()
+
+        data = WaitlistEntrySerializer(entry, context={"request": request}).data
+        data["position"] = waitlist_position(entry)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path=r"waitlist/(?P<entry_id>\d+)/cancel")
+    def cancel_waitlist_entry(self, request, entry_id=None):
+        cancelled = WaitlistEntry.objects.filter(
+            pk=entry_id,
+            user=request.user,
+            status=WaitlistEntry.Status.WAITING,
+        ).update(status=WaitlistEntry.Status.CANCELLED, updated_at=timezone.now())
+
+        if not cancelled:
+            return Response(
+                {"detail": "Waitlist entry not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {
+                "detail": "Left the waitlist.",
+                "entry_id": int(entry_id),
+                "status": WaitlistEntry.Status.CANCELLED,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,203 @@
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from chat.models import ChatGroupMember
+from chat.utils import add_user_to_booking_chat
+from connections.models import ConnectionNotification
+from connections.utils import create_notification
+from .availability import ACTIVE_STATUSES, SlotTaken, create_booking
+from .holds import expired_hold_q, hold_expiry
+from .models import JOINABLE_OPEN_GAME, Booking, WaitlistEntry
+
+
+PROMOTE_BATCH_SIZE = 200
+
+
+def waitlist_position(entry):
+    """1-based place of a waiting entry in its queue."""
+    queue = WaitlistEntry.objects.filter(status=WaitlistEntry.Status.WAITING)
+    if entry.open_game_id:
+        queue = queue.filter(open_game_id=entry.open_game_id)
+    else:
+        queue = queue.filter(
+            open_game__isnull=True,
+            ground_id=entry.ground_id,
+            date=entry.date,
+            start_time=entry.start_time,
+            end_time=entry.end_time,
+        )
+    ahead = queue.filter(
+        Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, id__lt=entry.id)
+    )
+    return ahead.count() + 1
+
+
+def expire_stale_entries(now=None):
+    """Close entries for slots that have started or games that are no longer on."""
+    now = timezone.localtime(now)
+    return WaitlistEntry.objects.filter(status=WaitlistEntry.Status.WAITING).filter(
+        Q(date__lt=now.date())
+        | Q(date=now.date(), start_time__lte=now.time())
+        | Q(open_game__isnull=False) & ~Q(open_game__status=Booking.Status.BOOKED)
+    ).update(status=WaitlistEntry.Status.EXPIRED, updated_at=timezone.now())
+
+
+def promotable_entries(now=None):
+    """
+    Waiting entries whose target has capacity right now, oldest first: slot
+    entries with no live booking over their range, and entries of open
+    games that have a spot left.
+    """
+    now = now or timezone.now()
+    live = (
+        Booking.objects
+        .filter(
+            ground=OuterRef("ground"),
+            date=OuterRef("date"),
+            status__in=ACTIVE_STATUSES,
+            start_time__lt=OuterRef("end_time"),
+            end_time__gt=OuterRef("start_time"),
+        )
+        .exclude(expired_hold_q(now))
+    )
+    joinable = Booking.objects.filter(JOINABLE_OPEN_GAME, pk=OuterRef("open_game"))
+
+    waiting = WaitlistEntry.objects.filter(status=WaitlistEntry.Status.WAITING)
+    return (
+        waiting.filter(open_game__isnull=True).exclude(Exists(live)),
+        waiting.filter(Exists(joinable)),
+    )
+
+
+def promote_slot_entry(entry):
+    """Hold the freed range for the entry's player. False if someone else got it first."""
+    try:
+        hold = create_booking(
+            ground=entry.ground,
+            date=entry.date,
+            start_time=entry.start_time,
+            end_time=entry.end_time,
+            player=entry.user,
+            created_by=entry.user,
+            source=Booking.Source.ONLINE,
+            payment_mode=Booking.PaymentMode.PAY_DEPOSIT,
+            status=Booking.Status.PENDING,
+            expires_at=hold_expiry(),
+            booking_type=Booking.BookingType.CLOSED,
+        )
+    except SlotTaken:
+        return False
+
+    entry.status = WaitlistEntry.Status.PROMOTED
+    entry.promoted_booking = hold
+    entry.save(update_fields=["status", "promoted_booking", "updated_at"])
+
+    create_notification(
+        user=entry.user,
+        actor=entry.ground.owner,
+        notification_type=ConnectionNotification.Type.WAITLIST_PROMOTED,
+        message=(
+            f"{entry.ground.name} on {entry.date} from "
+            f"{entry.start_time.strftime('%H:%M')} to {entry.end_time.strftime('%H:%M')} "
+            f"is now held for you. Complete the booking before "
+            f"{timezone.localtime(hold.expires_at).strftime('%H:%M')}."
+        ),
+    )
+    return True
+
+
+def promote_open_game_entry(entry):
+    """Add the entry's player to its open game. False if the game filled up again."""
+    booking = (
+        Booking.objects
+        .select_for_update()
+        .filter(JOINABLE_OPEN_GAME, pk=entry.open_game_id)
+        .select_related("ground")
+        .first()
+    )
+    if booking is None:
+        return False
+
+    already_joined = booking.created_by_id == entry.user_id or ChatGroupMember.objects.filter(
+        group__booking=booking,
+        user_id=entry.user_id,
+    ).exists()
+    if already_joined:
+        entry.status = WaitlistEntry.Status.CANCELLED
+        entry.save(update_fields=["status", "updated_at"])
+        return False
+
+    Booking.objects.filter(pk=booking.pk).update(
+        current_players=F("current_players") + 1,
+        updated_at=timezone.now(),
+    )
+    add_user_to_booking_chat(booking, entry.user)
+
+    entry.status = WaitlistEntry.Status.PROMOTED
+    entry.promoted_booking = booking
+    entry.save(update_fields=["status", "promoted_booking", "updated_at"])
+
+    create_notification(
+        user=entry.user,
+        actor=booking.created_by or entry.user,
+        notification_type=ConnectionNotification.Type.WAITLIST_PROMOTED,
+        message=(
+            f"A spot opened up and you have joined the game at {booking.ground.name} "
+            f"on {booking.date} from {booking.start_time.strftime('%H:%M')} to "
+            f"{booking.end_time.strftime('%H:%M')}."
+        ),
+    )
+    return True
+
+
+def promote_entries(slot_entries, open_game_entries, batch_size=PROMOTE_BATCH_SIZE):
+    """
+    Promote the oldest entries of both queues. Each entry is promoted in its
+    own transaction; entries another worker has locked are skipped. Returns
+    the number promoted.
+    """
+    promoted = 0
+    for queue, promote in ((slot_entries, promote_slot_entry), (open_game_entries, promote_open_game_entry)):
+        for pk in list(queue.order_by("created_at", "id").values_list("pk", flat=True)[:batch_size]):
+            with transaction.atomic():
+                entry = (
+                    WaitlistEntry.objects
+                    .select_for_update(skip_locked=True, of=("self",))
+                    .select_related("ground__owner", "user")
+                    .filter(pk=pk, status=WaitlistEntry.Status.WAITING)
+                    .first()
+                )
+                if entry is not None and promote(entry):
+                    promoted += 1
+    return promoted
+
+
+def promote_waitlist(now=None, batch_size=PROMOTE_BATCH_SIZE):
+    """Promote waiting players into freed capacity, first come first served."""
+    expire_stale_entries(now)
+    return promote_entries(*promotable_entries(now), batch_size=batch_size)
+
+
+def promote_freed_ranges(ranges, now=None):
+    """
+    Promote straight away into slot ranges that were just freed, given as
+    [(ground_id, date, start_time, end_time), ...], so nobody polling the
+    grid gets there before the waitlist. Run it from transaction.on_commit.
+    """
+    freed = Q()
+    for ground_id, d, start_time, end_time in ranges:
+        freed |= Q(ground_id=ground_id, date=d, start_time__lt=end_time, end_time__gt=start_time)
+    if not freed:
+        return 0
+
+    expire_stale_entries(now)
+    slot_entries, _ = promotable_entries(now)
+    return promote_entries(slot_entries.filter(freed), WaitlistEntry.objects.none())
+
+
+def promote_open_game(booking_id, now=None):
+    """Give a spot that just opened in an open game to its waitlist."""
+    expire_stale_entries(now)
+    _, open_game_entries = promotable_entries(now)
+    return promote_entries(WaitlistEntry.objects.none(), open_game_entries.filter(open_game_id=booking_id))
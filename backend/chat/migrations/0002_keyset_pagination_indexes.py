@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["group", "created_at", "id"],
+                name="chat_chatme_group_i_d200e7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="directmessage",
+            index=models.Index(
+                fields=["chat", "created_at", "id"],
+                name="chat_direct_chat_id_bf37e6_idx",
+            ),
+        ),
+    ]
@@ -63,6 +63,11 @@ class ChatMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["group", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.sender} -> {self.group}"
 
@@ -107,5 +112,10 @@ class DirectMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["chat", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.sender} -> DirectChat({self.chat_id})"
\ No newline at end of file
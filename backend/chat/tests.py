@@ -49,6 +49,32 @@ class ChatTests(APITestCase):
             status=Ground.Status.APPROVED,
         )
 
+    # TC-CH-01
+    def test_group_messages_page_newest_first(self):
+        booking = Booking.objects.create(
+            player=self.player1,
+            created_by=self.player1,
+            ground=self.ground,
+            date=timezone.localdate() + timedelta(days=2),
+            start_time=time(6, 0),
+            end_time=time(7, 0),
+            status=Booking.Status.BOOKED,
+            booking_type=Booking.BookingType.OPEN,
+            required_players=5,
+        )
+        group = create_temporary_chat_for_booking(booking)
+        ChatMessage.objects.bulk_create(
+            ChatMessage(group=group, sender=self.player1, message=f"message {i}") for i in range(5)
+        )
+
+        self.client.force_authenticate(user=self.player1)
+        response = self.client.get(f"/api/chat-groups/{group.id}/messages/", {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual([row["message"] for row in response.data["results"]], ["message 4", "message 3"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["message"] for row in response.data["results"]], ["message 2", "message 1"])
+
     # def test_open_booking_creates_temporary_group_chat(self):
     #     booking = Booking.objects.create(
     #         player=self.player1,
@@ -61,6 +61,15 @@ def add_user_to_booking_chat(booking, user):
     return group
 
 
+def joined_group_ids(user):
+    """IDs of every booking chat group `user` belongs to, in one query."""
+    if not getattr(user, "is_authenticated", False):
+        return frozenset()
+    return frozenset(
+        ChatGroupMember.objects.filter(user=user).values_list("group_id", flat=True)
+    )
+
+
 def deactivate_booking_chat(booking):
     group = getattr(booking, "chat_group", None)
     if not group:
@@ -5,6 +5,7 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.pagination import paginated_response
 from bookings.models import Booking
 from authapp.models import User
 
@@ -86,9 +87,9 @@ class ChatMessageListCreateView(APIView):
         if not is_group_active(group):
             return Response({"detail": "This group chat has expired."}, status=status.HTTP_400_BAD_REQUEST)
 
-        messages = group.messages.select_related("sender").order_by("created_at")
-        serializer = ChatMessageSerializer(messages, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Newest first, so the first page is the recent chat; clients reverse it for display.
+        messages = group.messages.select_related("sender").order_by("-created_at", "-id")
+        return paginated_response(request, messages, ChatMessageSerializer, view=self)
 
     def post(self, request, group_id):
         group = get_object_or_404(ChatGroup, pk=group_id)
@@ -172,9 +173,8 @@ class DirectMessageListCreateView(APIView):
         if not is_direct_chat_member(chat, request.user):
             return Response({"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
 
-        messages = chat.messages.select_related("sender").order_by("created_at")
-        serializer = DirectMessageSerializer(messages, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        messages = chat.messages.select_related("sender").order_by("-created_at", "-id")
+        return paginated_response(request, messages, DirectMessageSerializer, view=self)
 
     def post(self, request, chat_id):
         chat = get_object_or_404(DirectChat, pk=chat_id, is_active=True)
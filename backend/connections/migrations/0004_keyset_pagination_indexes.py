@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("connections", "0003_alter_connectionnotification_notification_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="connectionnotification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="connections_user_id_013436_idx",
+            ),
+        ),
+    ]
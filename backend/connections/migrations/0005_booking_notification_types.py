@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("connections", "0004_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="connectionnotification",
+            name="notification_type",
+            field=models.CharField(
+                choices=[
+                    ("REQUEST_SENT", "Request Sent"),
+                    ("REQUEST_ACCEPTED", "Request Accepted"),
+                    ("REQUEST_REJECTED", "Request Rejected"),
+                    ("BOOKING_REQUEST", "Booking Request"),
+                    ("BOOKING_CANCELLED", "Booking Cancelled"),
+                    ("BOOKING_CONFIRMED", "Booking Confirmed"),
+                    ("WAITLIST_PROMOTED", "Waitlist Promoted"),
+                ],
+                max_length=30,
+            ),
+        ),
+    ]
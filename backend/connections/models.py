@@ -46,6 +46,8 @@ class ConnectionNotification(models.Model):
         REQUEST_REJECTED = "REQUEST_REJECTED", "Request Rejected"
         BOOKING_REQUEST = "BOOKING_REQUEST", "Booking Request"
         BOOKING_CANCELLED = "BOOKING_CANCELLED", "Booking Cancelled"
+        BOOKING_CONFIRMED = "BOOKING_CONFIRMED", "Booking Confirmed"
+        WAITLIST_PROMOTED = "WAITLIST_PROMOTED", "Waitlist Promoted"
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -71,6 +73,9 @@ class ConnectionNotification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.notification_type}"
\ No newline at end of file
@@ -5,6 +5,7 @@ from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from backend.pagination import paginated_response
 from chat.utils import get_or_create_direct_chat
 from .models import ConnectionNotification, ConnectionRequest
 from .serializers import (
@@ -188,9 +189,9 @@ class ConnectionViewSet(viewsets.ViewSet):
             "connection_request",
             "connection_request__sender",
             "connection_request__receiver",
-        )
+        ).order_by("-created_at")
 
-        return Response(ConnectionNotificationSerializer(notifications, many=True).data)
+        return paginated_response(request, notifications, ConnectionNotificationSerializer, view=self)
 
     @action(detail=True, methods=["post"], url_path="notifications/read")
     def mark_notification_read(self, request, pk=None):
@@ -0,0 +1,150 @@
+import math
+import operator
+from functools import reduce
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+BASE32_INDEX = {c: i for i, c in enumerate(BASE32)}
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON = 111.320
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def decode_geohash_bounds(geohash):
+    """Return (lat_min, lat_max, lon_min, lon_max) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = BASE32_INDEX[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def cell_size_km(precision, latitude):
+    """Approximate (height, width) in km of a geohash cell at a latitude."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    height = 180.0 / 2 ** lat_bits * KM_PER_DEGREE_LAT
+    width = 360.0 / 2 ** lon_bits * KM_PER_DEGREE_LON * math.cos(math.radians(latitude))
+    return height, width
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes whose cells cover a circle: the centre cell and its
+    eight neighbours at the finest precision where a cell is at least
+    radius_km across. Returns None when the radius is too large to prune.
+    """
+    precision = 0
+    for p in range(1, GEOHASH_PRECISION + 1):
+        if min(cell_size_km(p, latitude)) < radius_km:
+            break
+        precision = p
+
+    if precision == 0:
+        return None
+
+    centre = encode_geohash(latitude, longitude, precision)
+    lat_min, lat_max, lon_min, lon_max = decode_geohash_bounds(centre)
+    lat_step = lat_max - lat_min
+    lon_step = lon_max - lon_min
+    lat_mid = (lat_min + lat_max) / 2
+    lon_mid = (lon_min + lon_max) / 2
+
+    cells = set()
+    for dlat in (-1, 0, 1):
+        lat = lat_mid + dlat * lat_step
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for dlon in (-1, 0, 1):
+            lon = (lon_mid + dlon * lon_step + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return cells
+
+
+def haversine_km_expression(latitude, longitude):
+    lat1 = math.radians(latitude)
+    lat2 = Radians(F("latitude"))
+    dlat = lat2 - Value(lat1)
+    dlon = Radians(F("longitude")) - Value(math.radians(longitude))
+
+    a = (
+        Power(Sin(dlat / 2), 2)
+        + Value(math.cos(lat1)) * Cos(lat2) * Power(Sin(dlon / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+
+
+def filter_near(qs, latitude, longitude, radius_km):
+    """
+    Keep grounds within radius_km, nearest first. Candidates are pruned by
+    geohash prefix (B-tree range scans) before the exact haversine distance
+    is computed for the survivors.
+    """
+    cells = covering_cells(latitude, longitude, radius_km)
+    qs = qs.filter(latitude__isnull=False, longitude__isnull=False)
+
+    if cells:
+        qs = qs.filter(reduce(operator.or_, (Q(geohash__startswith=cell) for cell in cells)))
+
+    return (
+        qs
+        .annotate(distance_km=haversine_km_expression(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+        .order_by("distance_km", "pk")
+    )
+
+
+def parse_near(value):
+    try:
+        lat_str, lon_str = value.split(",")
+        latitude, longitude = float(lat_str), float(lon_str)
+    except ValueError:
+        return None
+
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        return None
+    return latitude, longitude
@@ -0,0 +1,119 @@
+import math
+from collections import Counter
+from functools import reduce
+
+import numpy as np
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from .models import SlotOccupancy
+from .slot_grid import get_slot_grid, minute_of_day, time_from_minute
+
+
+def heatmap_columns(layouts):
+    """
+    (origin, step, coverage) of the coarsest time grid every layout aligns
+    to. coverage[i] is how many of the grounds have column i on their grid.
+    """
+    spans = Counter()
+    for (opens_at, closes_at, slot_minutes), count in layouts.items():
+        grid = get_slot_grid(opens_at, closes_at, slot_minutes)
+        if len(grid):
+            first = minute_of_day(opens_at)
+            spans[(first, first + len(grid) * slot_minutes, slot_minutes)] += count
+
+    if not spans:
+        return 0, 0, np.zeros(0, dtype=np.int64)
+
+    origin = min(first for first, _, _ in spans)
+    step = reduce(math.gcd, (m for key in spans for m in (key[0] - origin, key[2])))
+
+    keys = np.array(list(spans), dtype=np.int64)
+    counts = np.fromiter(spans.values(), dtype=np.int64, count=len(spans))
+    width = (keys[:, 1].max() - origin) // step
+
+    # Difference array: +count where a layout's span starts, -count past its end.
+    edges = np.zeros(width + 1, dtype=np.int64)
+    np.add.at(edges, (keys[:, 0] - origin) // step, counts)
+    np.add.at(edges, (keys[:, 1] - origin) // step, -counts)
+    return origin, step, np.cumsum(edges)[:width]
+
+
+def occupancy_heatmap(grounds, start, end):
+    """
+    Day-of-week x time-slot occupancy of `grounds` between start and end
+    inclusive. Each (ground, date) booked mask is loaded as a compact
+    (layout, weekday, mask) integer row and the bits are counted with
+    vectorised NumPy, one pass per distinct slot layout.
+    """
+    layouts = {
+        pk: tuple(layout)
+        for pk, *layout in grounds.values_list("pk", "opens_at", "closes_at", "slot_minutes")
+    }
+    origin, step, coverage = heatmap_columns(Counter(layouts.values()))
+    width = len(coverage)
+
+    # Dates come back as ISO text so NumPy parses them in bulk instead of
+    # the driver building a date object per row.
+    rows = list(
+        SlotOccupancy.objects
+        .filter(ground__in=grounds, date__gte=start, date__lte=end, booked_mask__gt=0)
+        .annotate(day=Cast("date", CharField()))
+        .values_list("ground_id", "day", "booked_mask")
+    )
+    ground_ids, days, masks = zip(*rows) if rows else ((), (), ())
+
+    distinct = sorted(set(layouts.values()))
+    pks = np.array(sorted(layouts), dtype=np.int64)
+    pk_layouts = np.array([distinct.index(layouts[pk]) for pk in pks.tolist()], dtype=np.int64)
+    layout_index = pk_layouts[np.searchsorted(pks, np.array(ground_ids, dtype=np.int64))]
+
+    # 1970-01-01 was a Thursday (weekday 3).
+    weekday = (np.array(days, dtype="datetime64[D]").astype(np.int64) + 3) % 7
+    masks = np.array(masks, dtype=np.int64)
+
+    booked = np.zeros((7, width), dtype=np.int64)
+    for k, (opens_at, closes_at, slot_minutes) in enumerate(distinct):
+        selected = layout_index == k
+        count = len(get_slot_grid(opens_at, closes_at, slot_minutes))
+        if not (count and selected.any()):
+            continue
+
+        bits = masks[selected, None] >> np.arange(count) & 1
+        cells = weekday[selected, None] * count + np.arange(count)
+        per_slot = np.bincount(
+            cells.ravel(),
+            weights=bits.ravel(),
+            minlength=7 * count,
+        ).reshape(7, count).astype(np.int64)
+
+        # A slot covers slot_minutes // step heatmap columns.
+        span = slot_minutes // step
+        first = (minute_of_day(opens_at) - origin) // step
+        booked[:, first:first + count * span] += np.repeat(per_slot, span, axis=1)
+
+    days = (end - start).days + 1
+    day_counts = np.bincount((start.weekday() + np.arange(days)) % 7, minlength=7)
+    capacity = np.outer(day_counts, coverage)
+
+    occupancy = np.divide(
+        booked,
+        capacity,
+        out=np.zeros(booked.shape),
+        where=capacity > 0,
+    )
+
+    slots = [
+        (
+            time_from_minute(origin + i * step).strftime("%H:%M"),
+            time_from_minute(origin + (i + 1) * step).strftime("%H:%M"),
+        )
+        for i in range(width)
+    ]
+    return {
+        "slot_minutes": step,
+        "slots": slots,
+        "booked": booked.tolist(),
+        "capacity": capacity.tolist(),
+        "occupancy": np.round(np.minimum(occupancy, 1.0), 4).tolist(),
+    }
@@ -0,0 +1,132 @@
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Ground
+
+
+VARIANT_ROOT = "grounds/variants"
+
+# name -> (width, height, crop). Cropped variants are filled to the exact
+# size; the others are only shrunk to fit inside it.
+VARIANTS = {
+    "thumb": (160, 160, True),
+    "card": (640, 360, True),
+    "full": (1600, 1600, False),
+}
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# Variant paths are derived from their content, so a URL never changes meaning.
+VARIANT_CACHE_CONTROL = {"public": True, "max_age": 60 * 60 * 24 * 365, "immutable": True}
+
+
+def file_digest(f):
+    digest = hashlib.sha256()
+    f.seek(0)
+    for chunk in iter(lambda: f.read(1 << 16), b""):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def variant_path(data, extension):
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{VARIANT_ROOT}/{digest[:2]}/{digest}.{extension}"
+
+
+def render_variants(source):
+    """
+    Encode every variant of the image in `source` (a file object) and store
+    them under content-hash paths. Returns {variant: {format: path}}.
+    """
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    variants = {}
+    for name, (width, height, crop) in VARIANTS.items():
+        if crop:
+            resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+        variants[name] = {}
+        for extension, (fmt, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, fmt, **options)
+            data = buffer.getvalue()
+
+            path = variant_path(data, extension)
+            if not default_storage.exists(path):
+                default_storage.save(path, ContentFile(data))
+            variants[name][extension] = path
+    return variants
+
+
+def build_image_variants(image_name, known_hash=""):
+    """
+    Return (source_hash, variants) for a stored upload, or None when the
+    variants recorded for `known_hash` are still current. Unreadable files
+    get no variants, so URLs fall back to the original.
+    """
+    try:
+        with default_storage.open(image_name, "rb") as source:
+            source_hash = file_digest(source)
+            if source_hash == known_hash:
+                return None
+            try:
+                return source_hash, render_variants(source)
+            except (OSError, Image.DecompressionBombError):
+                return source_hash, {}
+    except OSError:
+        return "", {}
+
+
+def refresh_image_variants(ground):
+    """Regenerate variants after ground.image changed; clears them when it was removed."""
+    if not ground.image:
+        source_hash, variants = "", {}
+    else:
+        built = build_image_variants(ground.image.name, ground.image_hash)
+        if built is None:
+            return
+        source_hash, variants = built
+
+    ground.image_hash = source_hash
+    ground.image_variants = variants
+    Ground.objects.filter(pk=ground.pk).update(
+        image_hash=source_hash,
+        image_variants=variants,
+        updated_at=timezone.now(),
+    )
+
+
+def variant_urls(ground, request=None):
+    def absolute(path):
+        url = default_storage.url(path)
+        return request.build_absolute_uri(url) if request else url
+
+    return {
+        name: {extension: absolute(path) for extension, path in formats.items()}
+        for name, formats in (ground.image_variants or {}).items()
+    }
+
+
+def image_url(ground, request=None, variant="card"):
+    """URL of a JPEG variant of the ground's image, falling back to the original upload."""
+    path = (ground.image_variants or {}).get(variant, {}).get("jpeg")
+    if path:
+        url = default_storage.url(path)
+    elif ground.image:
+        url = ground.image.url
+    else:
+        return None
+    return request.build_absolute_uri(url) if request else url
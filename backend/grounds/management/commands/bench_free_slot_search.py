@@ -0,0 +1,117 @@
+import datetime as dt
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory
+
+from grounds.models import Ground, SlotOccupancy, WeeklySlotMask
+from grounds.slot_grid import DEFAULT_GRID
+from grounds.views import GroundFreeSlotSearchView
+
+
+QUERIES = [
+    {"start_time": "17:00", "end_time": "19:00", "max_price": "2000"},
+    {"start_time": "06:00", "end_time": "09:00", "ground_size": "SEVEN"},
+    {"start_time": "17:00", "end_time": "19:00", "max_price": "2000", "sort": "start"},
+    {"max_price": "1200", "sort": "start"},
+]
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Seed throwaway grounds and measure free-slot search latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grounds", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--days", type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                start = self.seed(options["grounds"])
+                self.run(start, options["days"], options["repeat"])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def seed(self, count):
+        rng = random.Random(42)
+        start = dt.date.today() + dt.timedelta(days=1)
+        owner = get_user_model().objects.create_user(
+            username="bench-slots-owner",
+            email="bench-slots-owner@example.com",
+            password=None,
+            phone="bench-slots",
+        )
+
+        grounds = Ground.objects.bulk_create([
+            Ground(
+                owner=owner,
+                name=f"Bench Ground {i}",
+                location="Kathmandu",
+                price_per_hour=rng.randrange(800, 3000, 100),
+                ground_size=rng.choice(Ground.Size.values),
+                status=Ground.Status.APPROVED,
+            )
+            for i in range(count)
+        ], batch_size=2000)
+
+        weekly = []
+        occupancy = []
+        for ground in grounds:
+            for dow in range(7):
+                if rng.random() < 0.5:
+                    weekly.append(WeeklySlotMask(
+                        ground=ground, day_of_week=dow, open_mask=rng.getrandbits(13) | 1,
+                    ))
+            for offset in range(7):
+                if rng.random() < 0.6:
+                    occupancy.append(SlotOccupancy(
+                        ground=ground,
+                        date=start + dt.timedelta(days=offset),
+                        open_mask=DEFAULT_GRID.full_mask,
+                        booked_mask=rng.getrandbits(len(DEFAULT_GRID)),
+                    ))
+
+        WeeklySlotMask.objects.bulk_create(weekly, batch_size=5000)
+        SlotOccupancy.objects.bulk_create(occupancy, batch_size=5000)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE grounds_ground")
+                cursor.execute("ANALYZE grounds_weeklyslotmask")
+                cursor.execute("ANALYZE grounds_slotoccupancy")
+
+        self.stdout.write(f"Seeded {count} grounds on {connection.vendor}.")
+        return start
+
+    def run(self, start, days, repeat):
+        factory = APIRequestFactory()
+        view = GroundFreeSlotSearchView.as_view()
+        dates = {
+            "from": start.isoformat(),
+            "to": (start + dt.timedelta(days=days - 1)).isoformat(),
+        }
+
+        for params in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                request = factory.get("/api/grounds/free-slots/", {**dates, **params})
+                started = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            self.stdout.write(
+                f"{params} rows={len(response.data['results']):3} "
+                f"p50={statistics.median(timings):8.2f}ms p99={p99:8.2f}ms"
+            )
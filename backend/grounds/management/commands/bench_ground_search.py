@@ -0,0 +1,125 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from grounds.models import Ground
+from grounds.search import legacy_search, search_grounds
+
+
+WORDS = [
+    "arena", "futsal", "kick", "goal", "striker", "champions", "united",
+    "city", "park", "valley", "royal", "green", "sports", "hub", "stadium",
+]
+PLACES = [
+    "Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Chitwan", "Butwal",
+    "Biratnagar", "Dharan", "Hetauda", "Nepalgunj",
+]
+TERMS = ["futsal", "kath", "champ", "lalitpur arena", "stadum", "pokhra", "royal green"]
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed throwaway grounds on PostgreSQL and compare full-text/trigram "
+        "search latency against the icontains path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grounds", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--target-ms",
+            type=float,
+            default=10.0,
+            help="p99 latency the search path must stay under.",
+        )
+
+    def handle(self, *args, **options):
+        # Other backends run icontains for both paths, which measures nothing.
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                f"bench_ground_search needs PostgreSQL; the default database is {connection.vendor}."
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                raise CommandError("bench_ground_search needs the pg_trgm extension (see grounds migration 0007).")
+
+        try:
+            with transaction.atomic():
+                self.seed(options["grounds"])
+                self.run(options["repeat"], options["page_size"], options["target_ms"])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def seed(self, count):
+        rng = random.Random(42)
+        owner = get_user_model().objects.create_user(
+            username="bench-search-owner",
+            email="bench-search-owner@example.com",
+            password=None,
+            phone="bench-search",
+        )
+
+        batch = []
+        for i in range(count):
+            batch.append(Ground(
+                owner=owner,
+                name=f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+                location=f"{rng.choice(PLACES)}-{rng.randint(1, 32)}",
+                description=" ".join(rng.choice(WORDS) for _ in range(12)),
+                price_per_hour=rng.randint(800, 3000),
+                status=Ground.Status.APPROVED,
+            ))
+            if len(batch) == 5000:
+                Ground.objects.bulk_create(batch)
+                batch = []
+        Ground.objects.bulk_create(batch)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE grounds_ground")
+
+        self.stdout.write(f"Seeded {count} grounds on PostgreSQL.")
+
+    def run(self, repeat, page_size, target_ms):
+        base = Ground.objects.filter(status=Ground.Status.APPROVED).order_by("-created_at")
+        paths = {
+            "icontains": lambda term: legacy_search(base, term),
+            "search": lambda term: search_grounds(base, term),
+        }
+
+        over_target = []
+        for term in TERMS:
+            for label, build in paths.items():
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows = list(build(term)[:page_size])
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                timings.sort()
+                p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+                self.stdout.write(
+                    f"{term!r:18} {label:10} rows={len(rows):3} "
+                    f"p50={statistics.median(timings):8.2f}ms p99={p99:8.2f}ms"
+                )
+                if label == "search" and p99 >= target_ms:
+                    over_target.append(f"{term!r} ({p99:.2f}ms)")
+
+        if over_target:
+            self.stdout.write(self.style.ERROR(
+                f"search p99 over the {target_ms:g}ms target for: {', '.join(over_target)}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"search p99 under the {target_ms:g}ms target for all {len(TERMS)} terms."
+            ))
@@ -0,0 +1,105 @@
+import datetime as dt
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from bookings.models import Booking
+from grounds.heatmap import occupancy_heatmap
+from grounds.models import Ground, SlotOccupancy
+from grounds.slot_grid import DEFAULT_GRID
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Seed a year of throwaway bookings and measure occupancy heatmap latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grounds", type=int, default=50)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--fill", type=float, default=0.6, help="Share of slots booked.")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                owner, start, end = self.seed(options["grounds"], options["days"], options["fill"])
+                self.run(owner, start, end, options["repeat"])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def seed(self, count, days, fill):
+        rng = random.Random(42)
+        owner = get_user_model().objects.create_user(
+            username="bench-heatmap-owner",
+            email="bench-heatmap-owner@example.com",
+            password=None,
+            phone="bench-heatmap",
+        )
+        grounds = Ground.objects.bulk_create([
+            Ground(
+                owner=owner,
+                name=f"Bench Heatmap {i}",
+                location="Kathmandu",
+                price_per_hour=1000,
+                status=Ground.Status.APPROVED,
+            )
+            for i in range(count)
+        ])
+
+        end = dt.date.today()
+        start = end - dt.timedelta(days=days - 1)
+        bookings = []
+        occupancy = []
+        for ground in grounds:
+            for offset in range(days):
+                d = start + dt.timedelta(days=offset)
+                mask = 0
+                for i, (slot_start, slot_end) in enumerate(DEFAULT_GRID.slots):
+                    if rng.random() < fill:
+                        mask |= 1 << i
+                        bookings.append(Booking(
+                            ground=ground,
+                            date=d,
+                            start_time=slot_start,
+                            end_time=slot_end,
+                            status=Booking.Status.BOOKED,
+                        ))
+                occupancy.append(SlotOccupancy(
+                    ground=ground, date=d, open_mask=DEFAULT_GRID.full_mask, booked_mask=mask,
+                ))
+            if len(bookings) >= 20000:
+                Booking.objects.bulk_create(bookings, batch_size=5000)
+                bookings = []
+        Booking.objects.bulk_create(bookings, batch_size=5000)
+        SlotOccupancy.objects.bulk_create(occupancy, batch_size=5000)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE bookings_booking")
+                cursor.execute("ANALYZE grounds_slotoccupancy")
+
+        total = Booking.objects.filter(ground__owner=owner).count()
+        self.stdout.write(f"Seeded {total} bookings over {count} grounds on {connection.vendor}.")
+        return owner, start, end
+
+    def run(self, owner, start, end, repeat):
+        grounds = Ground.objects.filter(owner=owner)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            occupancy_heatmap(grounds, start, end)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f"heatmap p50={statistics.median(timings):8.2f}ms p99={p99:8.2f}ms"
+        )
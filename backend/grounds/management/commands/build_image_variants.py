@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from grounds.images import build_image_variants
+from grounds.models import Ground
+
+
+def build(job):
+    pk, image_name, known_hash = job
+    return pk, build_image_variants(image_name, known_hash)
+
+
+class Command(BaseCommand):
+    help = "Generate thumb/card/full image variants for existing ground images in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild variants even when the source image is unchanged.",
+        )
+
+    def handle(self, *args, **options):
+        jobs = [
+            (pk, image, "" if options["force"] else image_hash)
+            for pk, image, image_hash in (
+                Ground.objects
+                .exclude(image="")
+                .exclude(image__isnull=True)
+                .values_list("pk", "image", "image_hash")
+            )
+        ]
+        if not jobs:
+            self.stdout.write("No ground images to process.")
+            return
+
+        built = skipped = 0
+        with ProcessPoolExecutor(
+            max_workers=max(1, options["workers"]),
+            # Workers only touch storage. Set up Django for spawn-based platforms.
+            initializer=django.setup,
+        ) as pool:
+            for pk, result in pool.map(build, jobs, chunksize=8):
+                if result is None:
+                    skipped += 1
+                    continue
+                image_hash, variants = result
+                Ground.objects.filter(pk=pk).update(
+                    image_hash=image_hash,
+                    image_variants=variants,
+                    updated_at=timezone.now(),
+                )
+                built += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {built} grounds ({skipped} already current)."
+        ))
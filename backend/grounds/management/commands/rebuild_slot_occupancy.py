@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from grounds.utils import reconcile_slot_occupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuild weekday slot masks and SlotOccupancy rows from availability and bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ground", type=int, action="append", dest="grounds")
+        parser.add_argument("--since", help="Only rebuild dates on or after YYYY-MM-DD.")
+
+    def handle(self, *args, **options):
+        since = parse_date(options["since"]) if options["since"] else None
+
+        with transaction.atomic():
+            drift = reconcile_slot_occupancy(
+                ground_ids=options["grounds"],
+                since=since,
+                repair=True,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt slot occupancy ({len(drift)} rows changed)."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from grounds.models import Ground
+from grounds.utils import refresh_next_available
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Ground.next_available_at for grounds whose next free slot has "
+        "started or who had none in the horizon. Run every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every ground.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        grounds = Ground.objects.all()
+        if not options["all"]:
+            grounds = grounds.filter(
+                Q(next_available_at__lte=now) | Q(next_available_at__isnull=True)
+            )
+
+        changed = refresh_next_available(grounds, now=now)
+        self.stdout.write(self.style.SUCCESS(f"Updated next_available_at on {changed} grounds."))
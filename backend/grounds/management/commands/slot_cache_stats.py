@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from grounds.slot_cache import reset_slot_cache_stats, slot_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show slot grid cache hit/miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing.")
+
+    def handle(self, *args, **options):
+        stats = slot_cache_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.1%}"
+        )
+
+        if options["reset"]:
+            reset_slot_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from grounds.utils import reconcile_slot_occupancy
+
+
+class Command(BaseCommand):
+    help = "Compare stored slot bitmaps with availability and bookings, optionally repairing drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ground", type=int, action="append", dest="grounds")
+        parser.add_argument("--since", help="Only check dates on or after YYYY-MM-DD.")
+        parser.add_argument("--repair", action="store_true", help="Rewrite drifted rows.")
+
+    def handle(self, *args, **options):
+        since = parse_date(options["since"]) if options["since"] else None
+
+        with transaction.atomic():
+            drift = reconcile_slot_occupancy(
+                ground_ids=options["grounds"],
+                since=since,
+                repair=options["repair"],
+            )
+
+        for kind, key, stored, expected in drift:
+            self.stdout.write(f"{kind} {key}: stored={stored} expected={expected}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Slot occupancy is consistent."))
+        elif options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(drift)} drifted rows."))
+        else:
+            self.stdout.write(self.style.WARNING(f"Found {len(drift)} drifted rows."))
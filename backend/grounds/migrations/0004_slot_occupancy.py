@@ -0,0 +1,92 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0003_groundavailability_groundblock"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("open_mask", models.BigIntegerField()),
+                ("booked_mask", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "ground",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_occupancy",
+                        to="grounds.ground",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ground", "date"),
+                        name="uniq_slot_occupancy_ground_date",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="WeeklySlotMask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day_of_week",
+                    models.IntegerField(
+                        choices=[
+                            (0, "Mon"),
+                            (1, "Tue"),
+                            (2, "Wed"),
+                            (3, "Thu"),
+                            (4, "Fri"),
+                            (5, "Sat"),
+                            (6, "Sun"),
+                        ]
+                    ),
+                ),
+                ("open_mask", models.BigIntegerField()),
+                (
+                    "ground",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekly_slot_masks",
+                        to="grounds.ground",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ground", "day_of_week"), name="uniq_weekly_slot_mask"
+                    )
+                ],
+            },
+        ),
+    ]
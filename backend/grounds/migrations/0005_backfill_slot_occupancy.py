@@ -0,0 +1,77 @@
+import datetime as dt
+
+from django.db import migrations
+
+
+# The fixed hourly layout in use when this migration was written.
+FIXED_SLOTS = [(dt.time(h, 0), dt.time(h + 1, 0)) for h in range(6, 19)]
+
+
+FULL_MASK = (1 << len(FIXED_SLOTS)) - 1
+
+
+def open_mask_for_windows(windows):
+    if not windows:
+        return FULL_MASK
+    mask = 0
+    for i, (s, e) in enumerate(FIXED_SLOTS):
+        for w_start, w_end in windows:
+            if w_start.replace(second=0, microsecond=0) <= s and e <= w_end:
+                mask |= 1 << i
+                break
+    return mask
+
+
+def booked_mask_for_range(start_time, end_time):
+    mask = 0
+    for i, (s, _) in enumerate(FIXED_SLOTS):
+        if start_time <= s < end_time:
+            mask |= 1 << i
+    return mask
+
+
+def backfill(apps, schema_editor):
+    GroundAvailability = apps.get_model("grounds", "GroundAvailability")
+    WeeklySlotMask = apps.get_model("grounds", "WeeklySlotMask")
+    SlotOccupancy = apps.get_model("grounds", "SlotOccupancy")
+    Booking = apps.get_model("bookings", "Booking")
+
+    windows = {}
+    for ground_id, dow, start, end in GroundAvailability.objects.values_list(
+        "ground_id", "day_of_week", "start_time", "end_time"
+    ):
+        windows.setdefault((ground_id, dow), []).append((start, end))
+
+    weekly = {key: open_mask_for_windows(w) for key, w in windows.items()}
+    WeeklySlotMask.objects.bulk_create(
+        WeeklySlotMask(ground_id=ground_id, day_of_week=dow, open_mask=mask)
+        for (ground_id, dow), mask in weekly.items()
+    )
+
+    booked = {}
+    for ground_id, d, start, end in Booking.objects.filter(status="BOOKED").values_list(
+        "ground_id", "date", "start_time", "end_time"
+    ):
+        booked[(ground_id, d)] = booked.get((ground_id, d), 0) | booked_mask_for_range(start, end)
+
+    SlotOccupancy.objects.bulk_create(
+        SlotOccupancy(
+            ground_id=ground_id,
+            date=d,
+            open_mask=weekly.get((ground_id, d.weekday()), FULL_MASK),
+            booked_mask=mask,
+        )
+        for (ground_id, d), mask in booked.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0004_slot_occupancy"),
+        ("bookings", "0005_remove_booking_uniq_booking_slot_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
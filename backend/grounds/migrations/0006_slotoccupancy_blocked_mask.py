@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0005_backfill_slot_occupancy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slotoccupancy",
+            name="blocked_mask",
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:53
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+FORWARD_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION grounds_ground_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.location, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER grounds_ground_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON grounds_ground
+    FOR EACH ROW EXECUTE FUNCTION grounds_ground_search_vector_update()
+    """,
+    "UPDATE grounds_ground SET name = name",
+    "CREATE INDEX grounds_ground_search_vector_gin ON grounds_ground USING gin (search_vector)",
+    "CREATE INDEX grounds_ground_name_trgm ON grounds_ground USING gin (name gin_trgm_ops)",
+    "CREATE INDEX grounds_ground_location_trgm ON grounds_ground USING gin (location gin_trgm_ops)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS grounds_ground_location_trgm",
+    "DROP INDEX IF EXISTS grounds_ground_name_trgm",
+    "DROP INDEX IF EXISTS grounds_ground_search_vector_gin",
+    "DROP TRIGGER IF EXISTS grounds_ground_search_vector_trigger ON grounds_ground",
+    "DROP FUNCTION IF EXISTS grounds_ground_search_vector_update()",
+]
+
+
+def run_postgres_sql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0006_slotoccupancy_blocked_mask"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="ground",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            run_postgres_sql(FORWARD_SQL),
+            run_postgres_sql(REVERSE_SQL),
+        ),
+    ]
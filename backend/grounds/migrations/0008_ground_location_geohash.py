@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:56
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0007_ground_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ground",
+            name="geohash",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="ground",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-90),
+                    django.core.validators.MaxValueValidator(90),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="ground",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-180),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0008_ground_location_geohash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ground",
+            index=models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="grounds_gro_status_22f5c2_idx",
+            ),
+        ),
+    ]
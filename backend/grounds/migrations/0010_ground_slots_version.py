@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0009_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ground",
+            name="slots_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
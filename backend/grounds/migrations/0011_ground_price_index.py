@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0010_ground_slots_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ground",
+            index=models.Index(
+                fields=["status", "price_per_hour", "id"],
+                name="grounds_gro_status_ab1219_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:16
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0011_ground_price_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ground",
+            name="closes_at",
+            field=models.TimeField(default=datetime.time(19, 0)),
+        ),
+        migrations.AddField(
+            model_name="ground",
+            name="opens_at",
+            field=models.TimeField(default=datetime.time(6, 0)),
+        ),
+        migrations.AddField(
+            model_name="ground",
+            name="slot_mask",
+            field=models.BigIntegerField(default=8191, editable=False),
+        ),
+        migrations.AddField(
+            model_name="ground",
+            name="slot_minutes",
+            field=models.PositiveSmallIntegerField(
+                choices=[(30, "30 minutes"), (60, "60 minutes"), (90, "90 minutes")],
+                default=60,
+            ),
+        ),
+    ]
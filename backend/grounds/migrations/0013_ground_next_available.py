@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0012_ground_slot_grid"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ground",
+            name="next_available_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="ground",
+            index=models.Index(
+                fields=["status", "next_available_at", "id"],
+                name="grounds_gro_status_c58c9a_idx",
+            ),
+        ),
+    ]
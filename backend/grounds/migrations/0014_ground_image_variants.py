@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0013_ground_next_available"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ground",
+            name="image_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="ground",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
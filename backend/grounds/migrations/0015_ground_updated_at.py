@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("grounds", "0014_ground_image_variants"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ground",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="groundavailability",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="ground",
+            index=models.Index(
+                fields=["status", "updated_at"], name="grounds_gro_status_9e0d3c_idx"
+            ),
+        ),
+    ]
@@ -1,7 +1,18 @@
 # grounds/models.py
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from .geo import encode_geohash
+from .slot_constants import (
+    DEFAULT_CLOSES_AT,
+    DEFAULT_OPENS_AT,
+    DEFAULT_SLOT_MINUTES,
+    SLOT_MINUTES_CHOICES,
+)
+from .slot_grid import DEFAULT_GRID, get_slot_grid
+
 
 class Ground(models.Model):
     class Size(models.TextChoices):
@@ -32,6 +43,32 @@ class Ground(models.Model):
     )
 
     image = models.ImageField(upload_to="grounds/", blank=True, null=True)
+    # sha256 of the upload the variants were built from, and
+    # {variant: {format: storage path}} (see grounds.images).
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Derived from latitude/longitude on save; prefix-searched for "near me".
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
+
+    opens_at = models.TimeField(default=DEFAULT_OPENS_AT)
+    closes_at = models.TimeField(default=DEFAULT_CLOSES_AT)
+    slot_minutes = models.PositiveSmallIntegerField(
+        choices=SLOT_MINUTES_CHOICES,
+        default=DEFAULT_SLOT_MINUTES,
+    )
+    # Every slot of the grid; derived on save so SQL can use it as "all open".
+    slot_mask = models.BigIntegerField(default=DEFAULT_GRID.full_mask, editable=False)
 
     status = models.CharField(
         max_length=10,
@@ -40,10 +77,52 @@ class Ground(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Bumped whenever the slot grid may have changed; part of the slot cache key.
+    slots_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Start of the earliest free slot within the look-ahead horizon, or null
+    # when there is none. Refreshed whenever slots_version is bumped and by
+    # the refresh_next_available sweep as time passes.
+    next_available_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Maintained by a database trigger on PostgreSQL (see migration 0007).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at", "-id"]),
+            models.Index(fields=["status", "price_per_hour", "id"]),
+            models.Index(fields=["status", "next_available_at", "id"]),
+            models.Index(fields=["status", "updated_at"]),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.location})"
 
+    @property
+    def slot_grid(self):
+        return get_slot_grid(self.opens_at, self.closes_at, self.slot_minutes)
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ""
+        self.slot_mask = self.slot_grid.full_mask
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields) | {"updated_at"}
+            if {"latitude", "longitude"} & update_fields:
+                update_fields.add("geohash")
+            if {"opens_at", "closes_at", "slot_minutes"} & update_fields:
+                update_fields.add("slot_mask")
+            kwargs["update_fields"] = update_fields
+
+        super().save(*args, **kwargs)
+
 
 class GroundAvailability(models.Model):
     """
@@ -74,6 +153,7 @@ class GroundAvailability(models.Model):
     end_time = models.TimeField()
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["ground", "day_of_week", "start_time"]
@@ -131,4 +211,64 @@ class GroundBlock(models.Model):
         return (
             f"{self.ground.name} BLOCK - {self.date} "
             f"{self.start_time}-{self.end_time}"
-        )
\ No newline at end of file
+        )
+
+class WeeklySlotMask(models.Model):
+    """
+    Open-slot bitmask per weekday, compiled from GroundAvailability.
+    Bit i is set when slot i of the ground's slot grid is inside an
+    availability window.
+    A missing row means the weekday has no windows (every slot open).
+    """
+
+    ground = models.ForeignKey(
+        Ground,
+        on_delete=models.CASCADE,
+        related_name="weekly_slot_masks",
+    )
+
+    day_of_week = models.IntegerField(choices=GroundAvailability.DayOfWeek.choices)
+    open_mask = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ground", "day_of_week"],
+                name="uniq_weekly_slot_mask",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ground_id} {self.get_day_of_week_display()} {self.open_mask:b}"
+
+
+class SlotOccupancy(models.Model):
+    """
+    Materialized slot state for one ground on one date.
+    Rows are written when a booking, block or availability change touches
+    the date; dates without a row fall back to the ground's WeeklySlotMask.
+    """
+
+    ground = models.ForeignKey(
+        Ground,
+        on_delete=models.CASCADE,
+        related_name="slot_occupancy",
+    )
+
+    date = models.DateField()
+    open_mask = models.BigIntegerField()
+    booked_mask = models.BigIntegerField(default=0)
+    blocked_mask = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ground", "date"],
+                name="uniq_slot_occupancy_ground_date",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ground_id} {self.date} open={self.open_mask:b} booked={self.booked_mask:b}"
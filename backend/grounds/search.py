@@ -0,0 +1,60 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast, Greatest
+
+
+SEARCH_CONFIG = "simple"
+
+
+def prefix_tsquery(term):
+    """Turn free text into a raw tsquery matching every word as a prefix."""
+    words = re.findall(r"\w+", term.lower())
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def legacy_search(qs, term):
+    return qs.filter(Q(name__icontains=term) | Q(location__icontains=term))
+
+
+def search_grounds(qs, term):
+    """
+    Filter and rank grounds for a free-text search.
+
+    On PostgreSQL this matches the trigger-maintained search_vector (name,
+    location and description, prefix matching) or trigram similarity on
+    name/location for typos, both served by GIN indexes, and orders by
+    relevance. Other backends fall back to the icontains filter.
+
+    Both scores are cast to double precision: they are keyset cursor keys,
+    and a real (float4) does not survive the JSON round trip exactly.
+    """
+    if connections[qs.db].vendor != "postgresql":
+        return legacy_search(qs, term)
+
+    matches = Q(name__trigram_similar=term) | Q(location__trigram_similar=term)
+    rank = Value(0.0, output_field=FloatField())
+
+    raw_query = prefix_tsquery(term)
+    if raw_query:
+        query = SearchQuery(raw_query, search_type="raw", config=SEARCH_CONFIG)
+        matches |= Q(search_vector=query)
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+
+    return (
+        qs
+        .annotate(
+            search_rank=rank,
+            search_similarity=Cast(
+                Greatest(
+                    TrigramSimilarity("name", term),
+                    TrigramSimilarity("location", term),
+                ),
+                FloatField(),
+            ),
+        )
+        .filter(matches)
+        .order_by("-search_rank", "-search_similarity", "-created_at")
+    )
@@ -1,5 +1,34 @@
 from rest_framework import serializers
-from .models import Ground, GroundAvailability
+from .images import image_url, variant_urls
+from .models import Ground, GroundAvailability, GroundBlock
+from .slot_constants import MAX_SLOTS_PER_DAY
+from .slot_grid import get_slot_grid
+
+
+def validate_coordinates(attrs, instance=None):
+    latitude = attrs.get("latitude", getattr(instance, "latitude", None))
+    longitude = attrs.get("longitude", getattr(instance, "longitude", None))
+    if (latitude is None) != (longitude is None):
+        raise serializers.ValidationError("latitude and longitude must be provided together.")
+    return attrs
+
+
+def validate_slot_grid(attrs, instance=None):
+    opens_at = attrs.get("opens_at", getattr(instance, "opens_at", None))
+    closes_at = attrs.get("closes_at", getattr(instance, "closes_at", None))
+    slot_minutes = attrs.get("slot_minutes", getattr(instance, "slot_minutes", None))
+    if None in (opens_at, closes_at, slot_minutes):
+        return attrs
+
+    if closes_at <= opens_at:
+        raise serializers.ValidationError("closes_at must be after opens_at.")
+
+    grid = get_slot_grid(opens_at, closes_at, slot_minutes)
+    if not len(grid):
+        raise serializers.ValidationError("Opening hours must fit at least one slot.")
+    if len(grid) > MAX_SLOTS_PER_DAY:
+        raise serializers.ValidationError(f"A day cannot have more than {MAX_SLOTS_PER_DAY} slots.")
+    return attrs
 
 
 class GroundCreateSerializer(serializers.ModelSerializer):
@@ -13,15 +42,26 @@ class GroundCreateSerializer(serializers.ModelSerializer):
             "description",
             "phone",
             "ground_size",
+            "opens_at",
+            "closes_at",
+            "slot_minutes",
             "image",
+            "latitude",
+            "longitude",
             "status",
             "created_at",
         ]
         read_only_fields = ["id", "status", "created_at"]
 
+    def validate(self, attrs):
+        validate_slot_grid(attrs)
+        return validate_coordinates(attrs)
+
 
 class GroundListSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Ground
@@ -32,20 +72,30 @@ class GroundListSerializer(serializers.ModelSerializer):
             "price_per_hour",
             "ground_size",
             "image_url",
+            "image_variants",
+            "latitude",
+            "longitude",
+            "distance_km",
+            "next_available_at",
             "status",
             "created_at",
         ]
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if not obj.image:
-            return None
-        url = obj.image.url
-        return request.build_absolute_uri(url) if request else url
+        return image_url(obj, self.context.get("request"))
+
+    def get_image_variants(self, obj):
+        return variant_urls(obj, self.context.get("request"))
+
+    def get_distance_km(self, obj):
+        # Only annotated when the list is filtered with ?near=
+        distance = getattr(obj, "distance_km", None)
+        return None if distance is None else round(distance, 2)
 
 
 class GroundDetailSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     owner_id = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -59,10 +109,19 @@ class GroundDetailSerializer(serializers.ModelSerializer):
             "description",
             "phone",
             "ground_size",
+            "opens_at",
+            "closes_at",
+            "slot_minutes",
             "image_url",
+            "image_variants",
+            "latitude",
+            "longitude",
             "status",
             "created_at",
         ]
+        # Changing the grid must rebuild the stored masks, which only the
+        # owner edit view does.
+        read_only_fields = ["opens_at", "closes_at", "slot_minutes"]
 
     def get_image_url(self, obj):
         request = self.context.get("request")
@@ -71,6 +130,9 @@ class GroundDetailSerializer(serializers.ModelSerializer):
         url = obj.image.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_image_variants(self, obj):
+        return variant_urls(obj, self.context.get("request"))
+
 
 class OwnerGroundEditSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
@@ -87,13 +149,22 @@ class OwnerGroundEditSerializer(serializers.ModelSerializer):
             "description",
             "phone",
             "ground_size",
+            "opens_at",
+            "closes_at",
+            "slot_minutes",
             "image",        
             "image_url",
+            "latitude",
+            "longitude",
             "status",
             "created_at",
         ]
         read_only_fields = ["id", "owner_id", "status", "created_at", "image_url"]
 
+    def validate(self, attrs):
+        validate_slot_grid(attrs, self.instance)
+        return validate_coordinates(attrs, self.instance)
+
     def get_image_url(self, obj):
         request = self.context.get("request")
         if not obj.image:
@@ -137,4 +208,42 @@ class DayAvailabilitySerializer(serializers.Serializer):
 
 
 class AvailabilityBulkUpsertSerializer(serializers.Serializer):
-    availability = DayAvailabilitySerializer(many=True)
\ No newline at end of file
+    availability = DayAvailabilitySerializer(many=True)
+
+
+class GroundBlockSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GroundBlock
+        fields = [
+            "id",
+            "ground",
+            "date",
+            "start_time",
+            "end_time",
+            "reason",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class GroundBlockBulkCreateSerializer(serializers.Serializer):
+    MAX_DAYS = 366
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    days_of_week = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        required=False,
+        allow_empty=False,
+    )
+    windows = AvailabilityWindowSerializer(many=True, allow_empty=False)
+    reason = serializers.CharField(max_length=200, required=False, allow_blank=True, default="")
+
+    def validate(self, attrs):
+        if attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+
+        if (attrs["end_date"] - attrs["start_date"]).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Date range cannot exceed {self.MAX_DAYS} days.")
+
+        return attrs
@@ -0,0 +1,81 @@
+import datetime as dt
+
+from django.core.cache import cache
+
+from .utils import slot_state_for_date, slot_states_for_range
+
+
+SLOT_CACHE_TIMEOUT = 60 * 60 * 24
+HITS_KEY = "slots:stats:hits"
+MISSES_KEY = "slots:stats:misses"
+
+
+def slot_cache_key(ground, d):
+    # Ground.slots_version is bumped on every change to the grid, so stale
+    # entries are never read again and simply age out of the LRU.
+    return f"slots:{ground.pk}:{d.isoformat()}:{ground.slots_version}"
+
+
+def record(key, amount):
+    if not amount:
+        return
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+
+
+def get_slots(ground, d):
+    key = slot_cache_key(ground, d)
+    slots = cache.get(key)
+    if slots is not None:
+        record(HITS_KEY, 1)
+        return slots
+
+    record(MISSES_KEY, 1)
+    slots = ground.slot_grid.render(*slot_state_for_date(ground, d))
+    cache.set(key, slots, SLOT_CACHE_TIMEOUT)
+    return slots
+
+
+def get_slot_calendar(ground, start, end):
+    """Return [(date, slots), ...] from start to end, computing only uncached days."""
+    keys = {}
+    d = start
+    while d <= end:
+        keys[d] = slot_cache_key(ground, d)
+        d += dt.timedelta(days=1)
+
+    cached = cache.get_many(keys.values())
+    missing = [d for d, key in keys.items() if key not in cached]
+
+    record(HITS_KEY, len(keys) - len(missing))
+    record(MISSES_KEY, len(missing))
+
+    if missing:
+        grid = ground.slot_grid
+        computed = {
+            keys[d]: grid.render(*masks)
+            for d, *masks in slot_states_for_range(ground, missing[0], missing[-1])
+            if keys[d] not in cached
+        }
+        cache.set_many(computed, SLOT_CACHE_TIMEOUT)
+        cached.update(computed)
+
+    return [(d, cached[key]) for d, key in keys.items()]
+
+
+def slot_cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+    }
+
+
+def reset_slot_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -1,18 +1,16 @@
 # grounds/slot_constants.py
 import datetime as dt
 
-FIXED_SLOTS = [
-    (dt.time(6, 0), dt.time(7, 0)),
-    (dt.time(7, 0), dt.time(8, 0)),
-    (dt.time(8, 0), dt.time(9, 0)),
-    (dt.time(9, 0), dt.time(10, 0)),
-    (dt.time(10, 0), dt.time(11, 0)),
-    (dt.time(11, 0), dt.time(12, 0)),
-    (dt.time(12, 0), dt.time(13, 0)),
-    (dt.time(13, 0), dt.time(14, 0)),
-    (dt.time(14, 0), dt.time(15, 0)),
-    (dt.time(15, 0), dt.time(16, 0)),
-    (dt.time(16, 0), dt.time(17, 0)),
-    (dt.time(17, 0), dt.time(18, 0)),
-    (dt.time(18, 0), dt.time(19, 0)),
+DEFAULT_OPENS_AT = dt.time(6, 0)
+DEFAULT_CLOSES_AT = dt.time(19, 0)
+DEFAULT_SLOT_MINUTES = 60
+
+SLOT_MINUTES_CHOICES = [
+    (30, "30 minutes"),
+    (60, "60 minutes"),
+    (90, "90 minutes"),
 ]
+
+# Slot masks are stored in signed 64-bit columns.
+MAX_SLOTS_PER_DAY = 63
+MAX_SLOTS_PER_BOOKING = 5
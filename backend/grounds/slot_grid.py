@@ -0,0 +1,173 @@
+import datetime as dt
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from types import MappingProxyType
+
+from .slot_constants import DEFAULT_CLOSES_AT, DEFAULT_OPENS_AT, DEFAULT_SLOT_MINUTES
+
+
+class IntervalIndex:
+    """
+    Sorted (start, end) intervals with O(log n) containment and overlap
+    tests. Keeping the running maximum of end times over intervals sorted by
+    start is equivalent to searching the merged intervals, without losing
+    the "inside one interval" semantics containment needs.
+    """
+
+    def __init__(self, intervals):
+        ordered = sorted(intervals)
+        self._starts = [start for start, _ in ordered]
+        self._max_ends = list(accumulate((end for _, end in ordered), max))
+
+    def __bool__(self):
+        return bool(self._starts)
+
+    def contains(self, start, end):
+        i = bisect_right(self._starts, start)
+        return i > 0 and self._max_ends[i - 1] >= end
+
+    def overlaps(self, start, end):
+        i = bisect_left(self._starts, end)
+        return i > 0 and self._max_ends[i - 1] > start
+
+
+def minute_of_day(t):
+    return t.hour * 60 + t.minute
+
+
+def time_from_minute(minute):
+    return dt.time(minute // 60, minute % 60)
+
+
+class SlotGrid:
+    """
+    The slots of one (opens_at, closes_at, slot_minutes) layout, compiled
+    into immutable lookup tables. Bit i of every slot mask is slots[i].
+    Obtain grids through get_slot_grid() so each layout is built once.
+    """
+
+    __slots__ = (
+        "opens_at",
+        "closes_at",
+        "slot_minutes",
+        "slots",
+        "labels",
+        "full_mask",
+        "start_index",
+        "end_index",
+    )
+
+    def __init__(self, opens_at, closes_at, slot_minutes):
+        first = minute_of_day(opens_at)
+        last = minute_of_day(closes_at)
+
+        slots = tuple(
+            (time_from_minute(m), time_from_minute(m + slot_minutes))
+            for m in range(first, last - slot_minutes + 1, slot_minutes)
+        )
+
+        self.opens_at = opens_at
+        self.closes_at = closes_at
+        self.slot_minutes = slot_minutes
+        self.slots = slots
+        self.labels = tuple((s.strftime("%H:%M"), e.strftime("%H:%M")) for s, e in slots)
+        self.full_mask = (1 << len(slots)) - 1
+        self.start_index = MappingProxyType({s: i for i, (s, _) in enumerate(slots)})
+        self.end_index = MappingProxyType({e: i for i, (_, e) in enumerate(slots)})
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __repr__(self):
+        return f"SlotGrid({self.opens_at}, {self.closes_at}, {self.slot_minutes})"
+
+    def span(self, start_time, end_time):
+        """(first, last) slot indexes for a slot-aligned range, else None."""
+        first = self.start_index.get(start_time)
+        last = self.end_index.get(end_time)
+        if first is None or last is None or last < first:
+            return None
+        return first, last
+
+    def is_slot(self, start_time, end_time):
+        span = self.span(start_time, end_time)
+        return span is not None and span[0] == span[1]
+
+    def span_mask(self, start_time, end_time):
+        """Bits of the consecutive slots a slot-aligned range covers, else None."""
+        span = self.span(start_time, end_time)
+        if span is None:
+            return None
+        first, last = span
+        return (1 << (last + 1)) - (1 << first)
+
+    def range_mask(self, start_time, end_time):
+        """Slots a booking occupies; unaligned ranges fall back to overlap_mask()."""
+        mask = self.span_mask(start_time, end_time)
+        if mask is None:
+            return self.overlap_mask([(start_time, end_time)])
+        return mask
+
+    def open_mask(self, windows):
+        """windows: iterable of (start_time, end_time) for a single weekday."""
+        # Slot views historically compared "%H:%M" strings, so window starts
+        # are truncated to the minute before comparing.
+        index = IntervalIndex(
+            (start.replace(second=0, microsecond=0), end) for start, end in windows
+        )
+        if not index:
+            return self.full_mask
+
+        mask = 0
+        for i, (s, e) in enumerate(self.slots):
+            if index.contains(s, e):
+                mask |= 1 << i
+        return mask
+
+    def overlap_mask(self, intervals):
+        """Slots overlapping any of the (start_time, end_time) intervals."""
+        index = IntervalIndex(intervals)
+        if not index:
+            return 0
+
+        mask = 0
+        for i, (s, e) in enumerate(self.slots):
+            if index.overlaps(s, e):
+                mask |= 1 << i
+        return mask
+
+    def window_mask(self, start_time, end_time):
+        """Slots that lie entirely inside [start_time, end_time]."""
+        mask = 0
+        for i, (s, e) in enumerate(self.slots):
+            if start_time <= s and e <= end_time:
+                mask |= 1 << i
+        return mask
+
+    def render(self, open_mask, booked_mask, blocked_mask=0):
+        slots = []
+        for i, (start_label, end_label) in enumerate(self.labels):
+            bit = 1 << i
+            booked = bool(booked_mask & bit)
+            blocked = bool(blocked_mask & bit)
+            slots.append({
+                "start_time": start_label,
+                "end_time": end_label,
+                "booked": booked,
+                "blocked": blocked,
+                "available": bool(open_mask & bit) and not booked and not blocked,
+            })
+        return slots
+
+
+@lru_cache(maxsize=256)
+def get_slot_grid(
+    opens_at=DEFAULT_OPENS_AT,
+    closes_at=DEFAULT_CLOSES_AT,
+    slot_minutes=DEFAULT_SLOT_MINUTES,
+):
+    return SlotGrid(opens_at, closes_at, slot_minutes)
+
+
+DEFAULT_GRID = get_slot_grid()
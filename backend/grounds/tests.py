@@ -1,3 +1,1124 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresWrapper
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authapp.models import User
+from bookings.models import Booking
+from grounds.geo import covering_cells, decode_geohash_bounds, encode_geohash
+from grounds.images import VARIANT_ROOT
+from grounds.models import Ground, GroundAvailability, GroundBlock, SlotOccupancy
+from grounds.search import prefix_tsquery
+from grounds.slot_cache import slot_cache_stats
+from grounds.slot_grid import DEFAULT_GRID, IntervalIndex
+from grounds.utils import (
+    next_available_times,
+    refresh_blocked_masks,
+    refresh_weekly_masks,
+    sync_booking_occupancy,
+    window_mask_expression,
+)
+from grounds.views import serve_image_variant
+
+
+def legacy_has_open_slot(ground, d):
+    # Per-ground reference implementation the set-based filter replaced.
+    windows = list(GroundAvailability.objects.filter(ground=ground, day_of_week=d.weekday()))
+    bookings = list(Booking.objects.filter(ground=ground, date=d, status=Booking.Status.BOOKED))
+
+    for s, e in ground.slot_grid.slots:
+        start_str = s.strftime("%H:%M")
+        end_str = e.strftime("%H:%M")
+        open_ = not windows or any(
+            w.start_time.strftime("%H:%M") <= start_str and end_str <= w.end_time.strftime("%H:%M")
+            for w in windows
+        )
+        booked = any(b.start_time <= s < b.end_time for b in bookings)
+        if open_ and not booked:
+            return True
+    return False
+
+
+class GroundTestBase(APITestCase):
+    def setUp(self):
+        # Test databases reuse primary keys, so cached grids must not leak between tests.
+        cache.clear()
+        self.owner = User.objects.create_user(
+            username="groundowner",
+            email="groundowner@test.com",
+            password="test12345",
+            user_type="owner",
+            phone="9800000501",
+        )
+        self.player = User.objects.create_user(
+            username="groundplayer",
+            email="groundplayer@test.com",
+            password="test12345",
+            user_type="player",
+            phone="9800000502",
+        )
+        self.day = date(2026, 5, 4)  # Monday
+
+    def make_ground(self, name):
+        return Ground.objects.create(
+            owner=self.owner,
+            name=name,
+            location="Kathmandu",
+            price_per_hour=1000,
+            status=Ground.Status.APPROVED,
+        )
+
+    def add_window(self, ground, day_of_week, start, end):
+        GroundAvailability.objects.create(
+            ground=ground, day_of_week=day_of_week, start_time=start, end_time=end
+        )
+        refresh_weekly_masks(ground, [day_of_week])
+
+    def book(self, ground, start, end, booking_status=Booking.Status.BOOKED):
+        booking = Booking.objects.create(
+            ground=ground,
+            date=self.day,
+            start_time=start,
+            end_time=end,
+            player=self.player,
+            created_by=self.player,
+            status=booking_status,
+        )
+        sync_booking_occupancy(booking)
+        return booking
+
+    def upcoming_monday(self):
+        # Free-slot search skips slots that have already started.
+        today = timezone.localdate()
+        return today + timedelta(days=7 - today.weekday())
+
+    def slots_for(self, ground, d=None):
+        d = d or self.day
+        response = self.client.get(f"/api/grounds/{ground.id}/slots/", {"date": d.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row["start_time"]: row for row in response.data["slots"]}
+
+
+class GroundDateFilterTests(GroundTestBase):
+    def listed_ids(self):
+        response = self.client.get("/api/grounds/", {"date": self.day.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row["id"] for row in response.data["results"]}
+
+    # TC-G-01
+    def test_date_filter_matches_legacy_logic(self):
+        no_windows = self.make_ground("No windows")
+
+        closed_window = self.make_ground("Window too short")
+        self.add_window(closed_window, 0, time(6, 30), time(7, 0))
+
+        seconds_window = self.make_ground("Window with seconds")
+        self.add_window(seconds_window, 0, time(9, 0, 30), time(10, 0))
+
+        fully_booked = self.make_ground("Fully booked")
+        self.add_window(fully_booked, 0, time(17, 0), time(19, 0))
+        self.book(fully_booked, time(17, 0), time(19, 0))
+
+        pending_only = self.make_ground("Pending only")
+        self.add_window(pending_only, 0, time(17, 0), time(18, 0))
+        self.book(pending_only, time(17, 0), time(18, 0), Booking.Status.PENDING)
+
+        other_day = self.make_ground("Open another day")
+        self.add_window(other_day, 0, time(6, 0), time(6, 30))
+        self.add_window(other_day, 1, time(6, 0), time(19, 0))
+
+        grounds = [no_windows, closed_window, seconds_window, fully_booked, pending_only, other_day]
+        expected = {g.id for g in grounds if legacy_has_open_slot(g, self.day)}
+
+        self.assertEqual(self.listed_ids(), expected)
+        self.assertEqual(expected, {no_windows.id, seconds_window.id, pending_only.id})
+
+    # TC-G-02
+    def test_date_filter_query_count_is_constant(self):
+        for i in range(3):
+            self.make_ground(f"Ground {i}")
+
+        # One aggregate for the ETag validator, one for the page itself.
+        with self.assertNumQueries(2):
+            self.listed_ids()
+
+        for i in range(10):
+            ground = self.make_ground(f"More {i}")
+            self.book(ground, time(6, 0), time(7, 0))
+
+        with self.assertNumQueries(2):
+            self.listed_ids()
+
+
+class SlotOccupancyTests(GroundTestBase):
+    # TC-G-03
+    def test_booking_and_cancel_update_bitmap(self):
+        ground = self.make_ground("Bitmap")
+        self.add_window(ground, 0, time(6, 0), time(9, 0))
+        booking = self.book(ground, time(7, 0), time(9, 0))
+
+        row = SlotOccupancy.objects.get(ground=ground, date=self.day)
+        self.assertEqual(row.open_mask, 0b111)
+        self.assertEqual(row.booked_mask, 0b110)
+
+        slots = self.slots_for(ground)
+        self.assertTrue(slots["06:00"]["available"])
+        self.assertTrue(slots["07:00"]["booked"])
+        self.assertFalse(slots["08:00"]["available"])
+        self.assertFalse(slots["10:00"]["available"])
+
+        booking.status = Booking.Status.CANCELLED
+        booking.save(update_fields=["status"])
+        sync_booking_occupancy(booking, Booking.Status.BOOKED)
+
+        row.refresh_from_db()
+        self.assertEqual(row.booked_mask, 0)
+
+    # TC-G-04
+    def test_availability_upsert_updates_stored_dates(self):
+        ground = self.make_ground("Upsert")
+        self.book(ground, time(6, 0), time(7, 0))
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(
+            f"/api/grounds/{ground.id}/availability/bulk/",
+            {"availability": [{"day_of_week": 0, "windows": [{"start_time": "06:00", "end_time": "08:00"}]}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        row = SlotOccupancy.objects.get(ground=ground, date=self.day)
+        self.assertEqual(row.open_mask, 0b11)
+        self.assertEqual(row.booked_mask, 0b1)
+        self.assertTrue(self.slots_for(ground, date(2026, 5, 11))["07:00"]["available"])
+
+    # TC-G-05
+    def test_verify_command_repairs_drift(self):
+        ground = self.make_ground("Drift")
+        self.book(ground, time(6, 0), time(7, 0))
+        SlotOccupancy.objects.filter(ground=ground).update(booked_mask=0)
+        Booking.objects.create(
+            ground=ground,
+            date=date(2026, 5, 5),
+            start_time=time(8, 0),
+            end_time=time(9, 0),
+            player=self.player,
+            created_by=self.player,
+            status=Booking.Status.BOOKED,
+        )
+
+        out = StringIO()
+        call_command("verify_slot_occupancy", stdout=out)
+        self.assertIn("Found 2 drifted rows", out.getvalue())
+
+        call_command("verify_slot_occupancy", "--repair", stdout=StringIO())
+
+        out = StringIO()
+        call_command("verify_slot_occupancy", stdout=out)
+        self.assertIn("consistent", out.getvalue())
+        self.assertEqual(
+            SlotOccupancy.objects.get(ground=ground, date=date(2026, 5, 5)).booked_mask,
+            0b100,
+        )
+
+
+class GroundSlotCalendarTests(GroundTestBase):
+    # TC-G-06
+    def test_calendar_matches_single_day_view(self):
+        ground = self.make_ground("Calendar")
+        self.add_window(ground, 0, time(6, 0), time(10, 0))
+        self.add_window(ground, 2, time(17, 0), time(19, 0))
+        self.book(ground, time(7, 0), time(8, 0))
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f"/api/grounds/{ground.id}/calendar/",
+                {"from": "2026-05-04", "to": "2026-05-10"},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["days"]), 7)
+
+        for day in response.data["days"]:
+            single = self.client.get(f"/api/grounds/{ground.id}/slots/", {"date": day["date"]})
+            self.assertEqual(day["slots"], single.data["slots"])
+
+    # TC-G-07
+    def test_calendar_rejects_invalid_ranges(self):
+        ground = self.make_ground("Calendar range")
+        url = f"/api/grounds/{ground.id}/calendar/"
+
+        self.assertEqual(self.client.get(url, {"from": "2026-05-04"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {"from": "2026-05-10", "to": "2026-05-04"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.client.get(url, {"from": "2026-01-01", "to": "2026-12-31"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+
+
+class GroundBlockTests(GroundTestBase):
+    # TC-G-08
+    def test_interval_index_matches_linear_scan(self):
+        intervals = [
+            (time(6, 0), time(7, 30)),
+            (time(7, 0), time(8, 0)),
+            (time(12, 0), time(13, 0)),
+            (time(12, 30), time(15, 0)),
+        ]
+        index = IntervalIndex(intervals)
+
+        for s, e in DEFAULT_GRID.slots:
+            self.assertEqual(index.contains(s, e), any(a <= s and e <= b for a, b in intervals))
+            self.assertEqual(index.overlaps(s, e), any(a < e and s < b for a, b in intervals))
+
+    # TC-G-09
+    def test_bulk_blocks_close_slots_and_filter(self):
+        ground = self.make_ground("Blocked")
+        self.add_window(ground, 0, time(6, 0), time(8, 0))
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(
+            f"/api/grounds/{ground.id}/blocks/bulk/",
+            {
+                "start_date": "2026-05-01",
+                "end_date": "2026-05-31",
+                "days_of_week": [0],
+                "windows": [{"start_time": "06:00", "end_time": "07:30"}],
+                "reason": "Maintenance",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 4)
+        self.assertEqual(GroundBlock.objects.filter(ground=ground).count(), 4)
+
+        slots = self.slots_for(ground)
+        self.assertTrue(slots["06:00"]["blocked"])
+        self.assertTrue(slots["07:00"]["blocked"])
+        self.assertFalse(slots["07:00"]["available"])
+        self.assertNotIn(ground.id, {row["id"] for row in self.client.get(
+            "/api/grounds/", {"date": self.day.isoformat()}
+        ).data["results"]})
+
+        block = GroundBlock.objects.get(ground=ground, date=self.day)
+        response = self.client.delete(f"/api/grounds/{ground.id}/blocks/{block.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(self.slots_for(ground)["06:00"]["available"])
+
+        out = StringIO()
+        call_command("verify_slot_occupancy", stdout=out)
+        self.assertIn("consistent", out.getvalue())
+
+    # TC-G-10
+    def test_only_owner_can_create_blocks(self):
+        ground = self.make_ground("Not yours")
+        self.client.force_authenticate(user=self.player)
+
+        response = self.client.post(
+            f"/api/grounds/{ground.id}/blocks/bulk/",
+            {
+                "start_date": "2026-05-04",
+                "end_date": "2026-05-04",
+                "windows": [{"start_time": "06:00", "end_time": "07:00"}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class GroundSearchTests(GroundTestBase):
+    # TC-G-11
+    def test_prefix_tsquery_sanitizes_input(self):
+        self.assertEqual(prefix_tsquery("Royal  Futsal!"), "royal:* & futsal:*")
+        self.assertEqual(prefix_tsquery("kath' | !"), "kath:*")
+        self.assertEqual(prefix_tsquery("&&"), "")
+
+    # TC-G-12
+    def test_search_matches_name_or_location(self):
+        by_name = self.make_ground("Royal Arena")
+        by_location = Ground.objects.create(
+            owner=self.owner,
+            name="Other",
+            location="Lalitpur",
+            price_per_hour=1000,
+            status=Ground.Status.APPROVED,
+        )
+        self.make_ground("Unrelated")
+
+        response = self.client.get("/api/grounds/", {"search": "royal"})
+        self.assertEqual({row["id"] for row in response.data["results"]}, {by_name.id})
+
+        response = self.client.get("/api/grounds/", {"search": "lalit"})
+        self.assertEqual({row["id"] for row in response.data["results"]}, {by_location.id})
+
+    # TC-G-41
+    @skipUnless(connection.vendor == "postgresql", "ranked search needs PostgreSQL")
+    def test_search_pages_through_rank_ties_exactly_once(self):
+        # Equal names tie on both scores, so page boundaries fall inside ties.
+        expected = {self.make_ground(name).id for name in ["Royal Futsal"] * 5 + ["Royal Futsal Arena"] * 4}
+        self.make_ground("Unrelated")
+
+        seen = []
+        response = self.client.get("/api/grounds/", {"search": "royal futsal", "page_size": 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [row["id"] for row in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+
+class GroundNearTests(GroundTestBase):
+    def place(self, name, latitude, longitude):
+        ground = self.make_ground(name)
+        ground.latitude = latitude
+        ground.longitude = longitude
+        ground.save(update_fields=["latitude", "longitude"])
+        return ground
+
+    # TC-G-13
+    def test_geohash_is_kept_in_sync_with_coordinates(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+        ground = self.place("Anywhere", 27.7172, 85.3240)
+        ground.refresh_from_db()
+        self.assertEqual(ground.geohash, encode_geohash(27.7172, 85.3240))
+
+        ground.latitude = ground.longitude = None
+        ground.save()
+        ground.refresh_from_db()
+        self.assertEqual(ground.geohash, "")
+
+    # TC-G-14
+    def test_near_filters_by_radius_and_orders_by_distance(self):
+        kathmandu = self.place("Kathmandu Futsal", 27.7172, 85.3240)
+        lalitpur = self.place("Lalitpur Futsal", 27.6644, 85.3188)
+        self.place("Pokhara Futsal", 28.2096, 83.9856)
+        self.make_ground("No Coordinates")
+
+        response = self.client.get("/api/grounds/", {"near": "27.7100,85.3240", "radius_km": "10"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["results"]], [kathmandu.id, lalitpur.id])
+        self.assertLess(response.data["results"][0]["distance_km"], 1)
+        self.assertAlmostEqual(response.data["results"][1]["distance_km"], 5.1, delta=0.2)
+
+    # TC-G-15
+    def test_near_includes_grounds_across_a_cell_boundary(self):
+        latitude, longitude = 27.7172, 85.3240
+        cell = next(iter(covering_cells(latitude, longitude, 5)))
+        _, lat_max, _, _ = decode_geohash_bounds(encode_geohash(latitude, longitude, len(cell)))
+
+        # 0.01 degrees (about 1 km) north of the edge of the centre cell.
+        neighbour = self.place("Over The Edge", lat_max + 0.01, longitude)
+        centre = self.place("Centre", lat_max - 0.01, longitude)
+
+        response = self.client.get("/api/grounds/", {"near": f"{lat_max},{longitude}", "radius_km": "5"})
+
+        self.assertEqual({row["id"] for row in response.data["results"]}, {neighbour.id, centre.id})
+        self.assertNotEqual(neighbour.geohash[:len(cell)], centre.geohash[:len(cell)])
+
+
+class SlotCacheTests(GroundTestBase):
+    def setUp(self):
+        super().setUp()
+        self.ground = self.make_ground("Cached")
+
+    # TC-G-16
+    def test_repeat_reads_are_served_from_cache(self):
+        first = self.slots_for(self.ground)
+
+        with self.assertNumQueries(1):
+            second = self.slots_for(self.ground)
+
+        self.assertEqual(first, second)
+        self.assertEqual(slot_cache_stats()["hits"], 1)
+        self.assertEqual(slot_cache_stats()["misses"], 1)
+
+        out = StringIO()
+        call_command("slot_cache_stats", "--reset", stdout=out)
+        self.assertIn("hits=1 misses=1", out.getvalue())
+        self.assertEqual(slot_cache_stats()["hits"], 0)
+
+    # TC-G-17
+    def test_writes_invalidate_cached_grids(self):
+        self.assertTrue(self.slots_for(self.ground)["06:00"]["available"])
+
+        booking = self.book(self.ground, time(6, 0), time(7, 0))
+        self.assertFalse(self.slots_for(self.ground)["06:00"]["available"])
+
+        booking.status = Booking.Status.CANCELLED
+        booking.save(update_fields=["status"])
+        sync_booking_occupancy(booking, Booking.Status.BOOKED)
+        self.assertTrue(self.slots_for(self.ground)["06:00"]["available"])
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(
+            f"/api/grounds/{self.ground.id}/availability/bulk/",
+            {"availability": [{
+                "day_of_week": 0,
+                "windows": [{"start_time": "08:00", "end_time": "10:00"}],
+            }]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.slots_for(self.ground)["06:00"]["available"])
+        self.assertTrue(self.slots_for(self.ground)["08:00"]["available"])
+
+    # TC-G-18
+    def test_calendar_only_computes_uncached_days(self):
+        url = f"/api/grounds/{self.ground.id}/calendar/"
+        self.slots_for(self.ground)
+
+        response = self.client.get(url, {"from": "2026-05-03", "to": "2026-05-05"})
+        self.assertEqual(len(response.data["days"]), 3)
+        self.assertEqual(slot_cache_stats()["hits"], 1)
+        self.assertEqual(slot_cache_stats()["misses"], 3)
+
+        with self.assertNumQueries(1):
+            self.client.get(url, {"from": "2026-05-03", "to": "2026-05-05"})
+
+
+class FreeSlotSearchTests(GroundTestBase):
+    url = "/api/grounds/free-slots/"
+
+    def setUp(self):
+        super().setUp()
+        self.day = self.upcoming_monday()
+        self.cheap = self.make_ground("Cheap")
+        self.cheap.price_per_hour = 800
+        self.cheap.save()
+        self.add_window(self.cheap, 0, time(17, 0), time(19, 0))
+        self.book(self.cheap, time(17, 0), time(18, 0))
+
+        self.dear = self.make_ground("Dear")
+        self.dear.price_per_hour = 1800
+        self.dear.ground_size = Ground.Size.SEVEN
+        self.dear.save()
+        GroundBlock.objects.create(
+            ground=self.dear, date=self.day, start_time=time(18, 0), end_time=time(19, 0)
+        )
+        refresh_blocked_masks(self.dear, [self.day])
+
+        self.pricey = self.make_ground("Pricey")
+        self.pricey.price_per_hour = 5000
+        self.pricey.save()
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (row["ground_id"], row["date"], row["start_time"])
+            for row in response.data["results"]
+        ]
+
+    # TC-G-19
+    def test_search_matches_per_ground_slot_grids(self):
+        params = {"date": self.day.isoformat(), "start_time": "16:00", "end_time": "19:00"}
+
+        # The grounds query plus one for the live holds on them.
+        with self.assertNumQueries(2):
+            found = self.search(**params)
+
+        expected = [
+            (ground.id, self.day.isoformat(), start)
+            for ground in (self.cheap, self.dear, self.pricey)
+            for start, slot in self.slots_for(ground).items()
+            if slot["available"] and "16:00" <= start and slot["end_time"] <= "19:00"
+        ]
+        self.assertEqual(found, expected)
+        self.assertEqual(found[0], (self.cheap.id, self.day.isoformat(), "18:00"))
+
+        self.assertEqual(
+            {g for g, _, _ in self.search(max_price=2000, **params)},
+            {self.cheap.id, self.dear.id},
+        )
+        self.assertEqual(
+            {g for g, _, _ in self.search(ground_size="SEVEN", **params)},
+            {self.dear.id},
+        )
+
+    # TC-G-20
+    def test_sort_by_start_and_limit(self):
+        day = self.day.isoformat()
+        params = {
+            "from": day,
+            "to": (self.day + timedelta(days=1)).isoformat(),
+            "start_time": "17:00",
+            "end_time": "19:00",
+            "sort": "start",
+        }
+
+        with self.assertNumQueries(2):
+            found = self.search(limit=4, **params)
+        self.assertEqual(found, [
+            (self.dear.id, day, "17:00"),
+            (self.pricey.id, day, "17:00"),
+            (self.cheap.id, day, "18:00"),
+            (self.pricey.id, day, "18:00"),
+        ])
+
+        # Later days come after every slot of the first, whatever the price.
+        found = self.search(limit=20, **params)
+        self.assertEqual(len(found), 10)
+        self.assertEqual(found[:4], [
+            (self.dear.id, day, "17:00"),
+            (self.pricey.id, day, "17:00"),
+            (self.cheap.id, day, "18:00"),
+            (self.pricey.id, day, "18:00"),
+        ])
+        self.assertEqual(sorted(found[4:], key=lambda slot: slot[2]), found[4:])
+        self.assertEqual({slot[1] for slot in found[4:]}, {params["to"]})
+
+    # TC-G-39
+    def test_search_skips_held_and_started_slots(self):
+        params = {"date": self.day.isoformat(), "start_time": "17:00", "end_time": "19:00"}
+
+        hold = self.book(self.pricey, time(17, 0), time(18, 0), Booking.Status.PENDING)
+        Booking.objects.filter(pk=hold.pk).update(expires_at=timezone.now() + timedelta(minutes=10))
+        self.assertNotIn((self.pricey.id, self.day.isoformat(), "17:00"), self.search(**params))
+
+        Booking.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertIn((self.pricey.id, self.day.isoformat(), "17:00"), self.search(**params))
+
+        past = self.day - timedelta(days=14)
+        self.assertEqual(self.search(date=past.isoformat()), [])
+
+        now = timezone.localtime()
+        found = self.search(date=now.date().isoformat())
+        self.assertTrue(all(start > now.strftime("%H:%M") for _, _, start in found), found)
+
+    # TC-G-21
+    def test_invalid_search_parameters(self):
+        for params in (
+            {},
+            {"from": "2026-05-04", "to": "2026-05-20"},
+            {"date": "2026-05-04", "start_time": "7pm"},
+            {"date": "2026-05-04", "ground_size": "ELEVEN"},
+            {"date": "2026-05-04", "sort": "rating"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    # TC-G-37
+    def test_window_mask_shifts_by_integers_on_postgres(self):
+        # EXTRACT is numeric on PostgreSQL and there is no bigint << numeric,
+        # so compile for it and check every shift amount is cast to integer.
+        postgres = PostgresWrapper(
+            {**connection.settings_dict, "ENGINE": "django.db.backends.postgresql"},
+            alias="postgres-compile",
+        )
+        query = Ground.objects.annotate(
+            window=window_mask_expression(time(6, 15), time(9, 0))
+        ).values("window").query
+        sql, _ = query.get_compiler(connection=postgres).as_sql()
+
+        shifts = sql.split("<< ")[1:]
+        self.assertEqual(len(shifts), 2)
+        for operand in shifts:
+            depth = 0
+            for end, char in enumerate(operand):
+                depth += {"(": 1, ")": -1}.get(char, 0)
+                if depth == 0:
+                    break
+            self.assertTrue(operand[end + 1:].startswith("::integer"), operand)
+
+
+class AvailabilityUpsertTests(GroundTestBase):
+    def upsert(self, ground, availability):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(
+            f"/api/grounds/{ground.id}/availability/bulk/",
+            {"availability": availability},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    # TC-G-22
+    def test_upsert_only_applies_changed_windows(self):
+        ground = self.make_ground("Diff")
+        monday = {"day_of_week": 0, "windows": [
+            {"start_time": "06:00", "end_time": "08:00"},
+            {"start_time": "17:00", "end_time": "19:00"},
+        ]}
+        tuesday = {"day_of_week": 1, "windows": [{"start_time": "06:00", "end_time": "19:00"}]}
+
+        data = self.upsert(ground, [monday, tuesday])
+        self.assertEqual((data["created"], data["deleted"], data["unchanged"]), (3, 0, 0))
+        kept = GroundAvailability.objects.get(ground=ground, day_of_week=0, start_time=time(6, 0))
+
+        version = Ground.objects.get(pk=ground.pk).slots_version
+        data = self.upsert(ground, [monday, tuesday])
+        self.assertEqual((data["created"], data["deleted"], data["unchanged"]), (0, 0, 3))
+        self.assertEqual(data["changed_days"], [])
+        self.assertEqual(Ground.objects.get(pk=ground.pk).slots_version, version)
+
+        monday["windows"][1] = {"start_time": "18:00", "end_time": "19:00"}
+        data = self.upsert(ground, [monday, tuesday])
+        self.assertEqual((data["created"], data["deleted"], data["unchanged"]), (1, 1, 2))
+        self.assertEqual(data["changed_days"], [0])
+        self.assertTrue(GroundAvailability.objects.filter(pk=kept.pk).exists())
+
+        slots = self.slots_for(ground)
+        self.assertTrue(slots["07:00"]["available"])
+        self.assertFalse(slots["17:00"]["available"])
+        self.assertTrue(slots["18:00"]["available"])
+
+
+class SlotGridTests(GroundTestBase):
+    def setUp(self):
+        super().setUp()
+        self.day = self.upcoming_monday()
+
+    def make_grid_ground(self, name, opens_at, closes_at, slot_minutes):
+        ground = self.make_ground(name)
+        ground.opens_at = opens_at
+        ground.closes_at = closes_at
+        ground.slot_minutes = slot_minutes
+        ground.save()
+        return ground
+
+    # TC-G-23
+    def test_grid_lookup_tables(self):
+        ground = self.make_grid_ground("Half hours", time(6, 0), time(8, 0), 30)
+        grid = ground.slot_grid
+
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(ground.slot_mask, 0b1111)
+        self.assertEqual(grid.span(time(6, 30), time(7, 30)), (1, 2))
+        self.assertIsNone(grid.span(time(7, 30), time(6, 30)))
+        self.assertTrue(grid.is_slot(time(7, 0), time(7, 30)))
+        self.assertFalse(grid.is_slot(time(7, 0), time(8, 0)))
+        self.assertEqual(grid.overlap_mask([(time(6, 45), time(7, 15))]), 0b0110)
+        self.assertEqual(grid.span_mask(time(6, 30), time(7, 30)), 0b0110)
+        self.assertIsNone(grid.span_mask(time(6, 45), time(7, 30)))
+        self.assertEqual(grid.range_mask(time(6, 45), time(7, 15)), 0b0110)
+        self.assertIs(grid, Ground.objects.get(pk=ground.pk).slot_grid)
+
+        self.book(ground, time(6, 30), time(7, 0))
+        slots = self.slots_for(ground)
+        self.assertEqual(list(slots), ["06:00", "06:30", "07:00", "07:30"])
+        self.assertFalse(slots["06:30"]["available"])
+        self.assertTrue(slots["07:00"]["available"])
+
+    # TC-G-24
+    def test_booking_must_match_ground_grid(self):
+        ground = self.make_grid_ground("Ninety", time(7, 0), time(13, 0), 90)
+        self.client.force_authenticate(user=self.player)
+
+        def create(start, end):
+            return self.client.post(
+                "/api/bookings/",
+                {
+                    "ground": ground.id,
+                    "date": self.day.isoformat(),
+                    "start_time": start,
+                    "end_time": end,
+                },
+                format="json",
+            )
+
+        response = create("07:00", "08:00")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = create("08:30", "10:00")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+    # TC-G-25
+    def test_layout_change_rebuilds_masks_and_search(self):
+        ground = self.make_grid_ground("Relayout", time(6, 0), time(8, 0), 60)
+        self.add_window(ground, 0, time(6, 0), time(8, 0))
+        self.book(ground, time(7, 0), time(8, 0))
+        self.assertEqual(list(self.slots_for(ground)), ["06:00", "07:00"])
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.patch(
+            f"/api/owner/grounds/{ground.id}/edit/",
+            {"slot_minutes": 30},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+        slots = self.slots_for(ground)
+        self.assertEqual(list(slots), ["06:00", "06:30", "07:00", "07:30"])
+        self.assertEqual([slots[s]["available"] for s in slots], [True, True, False, False])
+
+        response = self.client.get(
+            "/api/grounds/free-slots/",
+            {"date": self.day.isoformat(), "start_time": "06:15", "end_time": "08:00"},
+        )
+        self.assertEqual(
+            [(row["ground_id"], row["start_time"]) for row in response.data["results"]],
+            [(ground.id, "06:30")],
+        )
+
+        response = self.client.patch(
+            f"/api/owner/grounds/{ground.id}/edit/",
+            {"opens_at": "09:00", "closes_at": "09:20"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # TC-G-38
+    def test_ground_detail_update_cannot_change_grid(self):
+        ground = self.make_grid_ground("Fixed grid", time(6, 0), time(8, 0), 60)
+        version = Ground.objects.get(pk=ground.pk).slots_version
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.patch(
+            f"/api/grounds/{ground.id}/",
+            {"opens_at": "20:00", "closes_at": "08:00", "slot_minutes": 30, "name": "Renamed"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+        ground.refresh_from_db()
+        self.assertEqual(ground.name, "Renamed")
+        self.assertEqual(
+            (ground.opens_at, ground.closes_at, ground.slot_minutes, ground.slot_mask),
+            (time(6, 0), time(8, 0), 60, 0b11),
+        )
+        self.assertEqual(ground.slots_version, version)
+
+
+class OccupancyHeatmapTests(GroundTestBase):
+    url = "/api/owner/grounds/heatmap/"
+
+    def setUp(self):
+        super().setUp()
+        self.hourly = self.make_ground("Hourly")
+        self.half = self.make_ground("Half hourly")
+        self.half.closes_at = time(8, 0)
+        self.half.slot_minutes = 30
+        self.half.save()
+
+        bookings = [
+            (self.hourly, date(2026, 5, 4), time(6, 0), time(8, 0), Booking.Status.BOOKED),
+            (self.hourly, date(2026, 5, 11), time(6, 0), time(7, 0), Booking.Status.BOOKED),
+            (self.hourly, date(2026, 5, 12), time(18, 0), time(19, 0), Booking.Status.BOOKED),
+            (self.hourly, date(2026, 5, 13), time(9, 0), time(10, 0), Booking.Status.CANCELLED),
+            (self.half, date(2026, 5, 4), time(6, 30), time(7, 30), Booking.Status.BOOKED),
+            (self.half, date(2026, 5, 20), time(6, 0), time(6, 30), Booking.Status.BOOKED),
+        ]
+        for ground, d, start, end, booking_status in bookings:
+            sync_booking_occupancy(Booking.objects.create(
+                ground=ground,
+                date=d,
+                start_time=start,
+                end_time=end,
+                player=self.player,
+                created_by=self.player,
+                status=booking_status,
+            ))
+
+    def heatmap(self, **params):
+        response = self.client.get(self.url, {"from": "2026-05-04", "to": "2026-05-17", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def reference(self, grounds, start, end, slots):
+        # Straight loop over bookings and slots, the behaviour the arrays must match.
+        booked = [[0] * len(slots) for _ in range(7)]
+        for booking in Booking.objects.filter(
+            ground__in=grounds, status=Booking.Status.BOOKED, date__range=(start, end)
+        ):
+            for i, (s, e) in enumerate(slots):
+                if booking.start_time.strftime("%H:%M") < e and s < booking.end_time.strftime("%H:%M"):
+                    booked[booking.date.weekday()][i] += 1
+        return booked
+
+    # TC-G-26
+    def test_single_ground_heatmap_matches_reference(self):
+        self.client.force_authenticate(user=self.owner)
+        data = self.heatmap(ground=self.hourly.id)
+
+        self.assertEqual(data["slot_minutes"], 60)
+        self.assertEqual(len(data["slots"]), len(self.hourly.slot_grid))
+        self.assertEqual(data["slots"][0], ("06:00", "07:00"))
+        self.assertEqual(
+            data["booked"],
+            self.reference([self.hourly], date(2026, 5, 4), date(2026, 5, 17), data["slots"]),
+        )
+        self.assertEqual(data["capacity"][0][0], 2)
+        self.assertEqual(data["occupancy"][0][:3], [1.0, 0.5, 0.0])
+        self.assertEqual(data["occupancy"][1][12], 0.5)
+
+    # TC-G-27
+    def test_owner_heatmap_aligns_mixed_grids(self):
+        self.client.force_authenticate(user=self.owner)
+        data = self.heatmap(**{"to": "2026-05-24"})
+
+        self.assertEqual(data["slot_minutes"], 30)
+        self.assertEqual(data["slots"][1], ("06:30", "07:00"))
+        self.assertEqual(
+            data["booked"],
+            self.reference(
+                [self.hourly, self.half], date(2026, 5, 4), date(2026, 5, 24), data["slots"]
+            ),
+        )
+        # Three Mondays; both grounds cover 06:00-08:00, only the hourly one later.
+        self.assertEqual(data["capacity"][0][:5], [6, 6, 6, 6, 3])
+        self.assertEqual(data["booked"][0][:4], [2, 3, 2, 1])
+
+    # TC-G-28
+    def test_heatmap_scoping(self):
+        other_owner = User.objects.create_user(
+            username="otherowner",
+            email="otherowner@test.com",
+            password="test12345",
+            user_type="owner",
+            phone="9800000503",
+        )
+        self.client.force_authenticate(user=other_owner)
+        response = self.client.get(self.url, {"ground": self.hourly.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.heatmap()["slots"], [])
+
+        staff = User.objects.create_user(
+            username="staffer",
+            email="staffer@test.com",
+            password="test12345",
+            phone="9800000504",
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=staff)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.heatmap(owner=self.owner.pk)["slot_minutes"], 30)
+
+    # TC-G-40
+    def test_impossible_dates_are_bad_requests(self):
+        self.client.force_authenticate(user=self.owner)
+        for url, params in (
+            (self.url, {"to": "2026-02-30"}),
+            (self.url, {"from": "2026-02-30", "to": "2026-03-02"}),
+            (f"/api/grounds/{self.hourly.id}/slots/", {"date": "2026-02-30"}),
+            (f"/api/grounds/{self.hourly.id}/calendar/", {"from": "2026-02-28", "to": "2026-02-30"}),
+            ("/api/grounds/free-slots/", {"date": "2026-02-30"}),
+            (f"/api/grounds/{self.hourly.id}/blocks/", {"from": "2026-02-30"}),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (url, params))
+
+        response = self.client.get("/api/grounds/", {"date": "2026-02-30"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class NextAvailableTests(GroundTestBase):
+    def at(self, d, t):
+        return timezone.make_aware(datetime.combine(d, t), timezone.get_current_timezone())
+
+    # TC-G-29
+    def test_next_available_follows_slot_changes(self):
+        ground = self.make_ground("Next")
+        self.add_window(ground, 0, time(7, 0), time(9, 0))
+        now = self.at(self.day, time(6, 30))
+
+        def next_at():
+            return next_available_times([Ground.objects.get(pk=ground.pk)], now)[ground.pk]
+
+        self.assertEqual(next_at(), self.at(self.day, time(7, 0)))
+        self.book(ground, time(7, 0), time(8, 0))
+        self.assertEqual(next_at(), self.at(self.day, time(8, 0)))
+
+        GroundBlock.objects.create(
+            ground=ground, date=self.day, start_time=time(8, 0), end_time=time(9, 0)
+        )
+        refresh_blocked_masks(ground, [self.day])
+        self.assertEqual(next_at(), self.at(self.day + timedelta(days=1), time(6, 0)))
+
+        later = self.at(self.day, time(7, 0))
+        self.assertEqual(
+            next_available_times([ground], later)[ground.pk],
+            self.at(self.day + timedelta(days=1), time(6, 0)),
+        )
+
+    # TC-G-30
+    def test_writes_and_sweep_keep_column_current(self):
+        ground = self.make_ground("Column")
+        self.assertIsNone(ground.next_available_at)
+        call_command("refresh_next_available", stdout=StringIO())
+
+        ground.refresh_from_db()
+        first = ground.next_available_at
+        self.assertGreater(first, timezone.now())
+
+        local = timezone.localtime(first)
+        slot = ground.slot_grid.span(local.time(), ground.slot_grid.slots[-1][1])[0]
+        self.day = local.date()
+        self.book(ground, *ground.slot_grid.slots[slot])
+        ground.refresh_from_db()
+        self.assertGreater(ground.next_available_at, first)
+
+        Ground.objects.filter(pk=ground.pk).update(next_available_at=timezone.now() - timedelta(hours=1))
+        out = StringIO()
+        call_command("refresh_next_available", stdout=out)
+        self.assertIn("on 1 grounds", out.getvalue())
+
+    # TC-G-31
+    def test_ordering_by_next_available(self):
+        soon, later, full = (self.make_ground(name) for name in ("Soon", "Later", "Full"))
+        base = timezone.now()
+        Ground.objects.filter(pk=soon.pk).update(next_available_at=base + timedelta(hours=1))
+        Ground.objects.filter(pk=later.pk).update(next_available_at=base + timedelta(hours=5))
+        Ground.objects.filter(pk=full.pk).update(next_available_at=None)
+
+        response = self.client.get("/api/grounds/", {"ordering": "next_available", "page_size": 1})
+        self.assertEqual([row["id"] for row in response.data["results"]], [soon.id])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["id"] for row in response.data["results"]], [later.id])
+        self.assertIsNone(response.data["next"])
+
+
+def png_upload(name="pitch.png", size=(2000, 1200), color=(30, 140, 60)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ImageVariantTests(GroundTestBase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_with_image(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(
+            "/api/grounds/",
+            {
+                "name": "Photo Ground",
+                "location": "Kathmandu",
+                "price_per_hour": "1000",
+                "image": png_upload(),
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return Ground.objects.get(pk=response.data["id"])
+
+    # TC-G-32
+    def test_upload_builds_content_addressed_variants(self):
+        ground = self.create_with_image()
+
+        self.assertEqual(set(ground.image_variants), {"thumb", "card", "full"})
+        for name, expected in (("thumb", (160, 160)), ("card", (640, 360)), ("full", (1600, 960))):
+            for fmt, path in ground.image_variants[name].items():
+                self.assertRegex(path, rf"^grounds/variants/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.{fmt}$")
+                with default_storage.open(path) as f:
+                    self.assertEqual(Image.open(f).size, expected)
+
+        Ground.objects.filter(pk=ground.pk).update(status=Ground.Status.APPROVED)
+        row = self.client.get("/api/grounds/").data["results"][0]
+        self.assertTrue(row["image_url"].endswith(ground.image_variants["card"]["jpeg"]))
+        self.assertTrue(row["image_variants"]["thumb"]["webp"].startswith("http://testserver/media/"))
+
+        response = self.client.patch(
+            f"/api/owner/grounds/{ground.id}/edit/",
+            {"image": png_upload("again.png")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updated = Ground.objects.get(pk=ground.pk)
+        self.assertNotEqual(updated.image.name, ground.image.name)
+        self.assertEqual(updated.image_variants, ground.image_variants)
+
+    # TC-G-33
+    def test_variants_are_served_with_far_future_cache_headers(self):
+        ground = self.create_with_image()
+        path = ground.image_variants["thumb"]["jpeg"]
+
+        # Django only serves media while DEBUG is on; tests run with it off.
+        self.assertEqual(self.client.get(f"/media/{path}").status_code, status.HTTP_404_NOT_FOUND)
+
+        response = serve_image_variant(RequestFactory().get(f"/media/{path}"), path.removeprefix(f"{VARIANT_ROOT}/"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        self.assertIn("immutable", response["Cache-Control"])
+
+    # TC-G-34
+    def test_backfill_builds_missing_variants_in_a_process_pool(self):
+        ground = self.make_ground("Legacy")
+        ground.image.save("legacy.png", png_upload("legacy.png", color=(200, 10, 10)))
+        self.assertEqual(ground.image_variants, {})
+
+        out = StringIO()
+        call_command("build_image_variants", "--workers", "2", stdout=out)
+        self.assertIn("Built variants for 1 grounds", out.getvalue())
+        ground.refresh_from_db()
+        self.assertTrue(default_storage.exists(ground.image_variants["card"]["webp"]))
+
+        out = StringIO()
+        call_command("build_image_variants", "--workers", "2", stdout=out)
+        self.assertIn("(1 already current)", out.getvalue())
+
+
+class ConditionalGetTests(GroundTestBase):
+    # TC-G-35
+    def test_ground_list_answers_unchanged_polls_with_304(self):
+        leaving = self.make_ground("Leaving")
+        ground = self.make_ground("Polled")
+        first = self.client.get("/api/grounds/")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Last-Modified", first)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):
+            again = self.client.get("/api/grounds/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A row leaving the filter does not move max(updated_at) of the rest.
+        Ground.objects.filter(pk=leaving.pk).update(status=Ground.Status.PENDING)
+        response = self.client.get("/api/grounds/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["results"]], [ground.id])
+        etag = response["ETag"]
+
+        response = self.client.get("/api/grounds/", {"max_price": 500}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ground.price_per_hour = 1500
+        ground.save(update_fields=["price_per_hour"])
+        response = self.client.get("/api/grounds/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    # TC-G-36
+    def test_slots_revalidate_on_slots_version(self):
+        ground = self.make_ground("Slots")
+        url = f"/api/grounds/{ground.id}/slots/"
+        params = {"date": self.day.isoformat()}
+        etag = self.client.get(url, params)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.book(ground, time(6, 0), time(7, 0))
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["slots"][0]["available"])
@@ -6,6 +6,12 @@ from .views import (
     OwnerMyGroundsView,
     GroundAvailabilityBulkUpsertView,
     GroundSlotsForDateView,
+    GroundSlotCalendarView,
+    GroundFreeSlotSearchView,
+    GroundOccupancyHeatmapView,
+    GroundBlockListView,
+    GroundBlockBulkCreateView,
+    GroundBlockDetailView,
     OwnerGroundDetailUpdateView,
     OwnerGroundBookingsView,
 )
@@ -14,10 +20,14 @@ router = DefaultRouter()
 router.register(r"grounds", GroundViewSet, basename="grounds")
 
 urlpatterns = [
+    # must come before the router's grounds/<pk>/ route
+    path("grounds/free-slots/", GroundFreeSlotSearchView.as_view(), name="ground-free-slots"),
+
     path("", include(router.urls)),
 
     # owner grounds
     path("owner/grounds/", OwnerMyGroundsView.as_view(), name="owner-my-grounds"),
+    path("owner/grounds/heatmap/", GroundOccupancyHeatmapView.as_view(), name="owner-ground-heatmap"),
     path("owner/grounds/<int:pk>/edit/", OwnerGroundDetailUpdateView.as_view(), name="owner-ground-edit"),
     path("owner/grounds/<int:pk>/bookings/", OwnerGroundBookingsView.as_view(), name="owner-ground-bookings"),
 
@@ -32,4 +42,18 @@ urlpatterns = [
         GroundSlotsForDateView.as_view(),
         name="ground-slots-for-date",
     ),
+    path(
+        "grounds/<int:pk>/calendar/",
+        GroundSlotCalendarView.as_view(),
+        name="ground-slot-calendar",
+    ),
+
+    # one-off closures
+    path("grounds/<int:pk>/blocks/", GroundBlockListView.as_view(), name="ground-blocks"),
+    path("grounds/<int:pk>/blocks/bulk/", GroundBlockBulkCreateView.as_view(), name="ground-blocks-bulk"),
+    path(
+        "grounds/<int:pk>/blocks/<int:block_id>/",
+        GroundBlockDetailView.as_view(),
+        name="ground-block-detail",
+    ),
 ]
\ No newline at end of file
@@ -0,0 +1,624 @@
+import datetime as dt
+from operator import itemgetter
+
+from django.db.models import BigIntegerField, Case, Exists, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, ExtractHour, ExtractMinute, Greatest, Log, Round
+from django.utils import timezone
+
+from bookings.models import Booking
+from .models import Ground, GroundAvailability, GroundBlock, SlotOccupancy, WeeklySlotMask
+from .slot_grid import get_slot_grid, minute_of_day, time_from_minute
+
+
+NEXT_AVAILABLE_HORIZON_DAYS = 14
+
+
+def weekly_open_mask(ground, day_of_week):
+    mask = (
+        WeeklySlotMask.objects
+        .filter(ground=ground, day_of_week=day_of_week)
+        .values_list("open_mask", flat=True)
+        .first()
+    )
+    return ground.slot_grid.full_mask if mask is None else mask
+
+
+def slot_state_for_date(ground, d):
+    """Return (open_mask, booked_mask, blocked_mask) for a ground on date d."""
+    row = (
+        SlotOccupancy.objects
+        .filter(ground=ground, date=d)
+        .values_list("open_mask", "booked_mask", "blocked_mask")
+        .first()
+    )
+    if row:
+        return row
+    return weekly_open_mask(ground, d.weekday()), 0, 0
+
+
+def slot_states_for_range(ground, start, end):
+    """
+    Return [(date, open_mask, booked_mask, blocked_mask), ...] for every day from start
+    to end inclusive, using one weekday-mask query and one occupancy query.
+    """
+    full_mask = ground.slot_grid.full_mask
+    weekly = dict(
+        WeeklySlotMask.objects
+        .filter(ground=ground)
+        .values_list("day_of_week", "open_mask")
+    )
+    stored = {
+        row[0]: row[1:]
+        for row in (
+            SlotOccupancy.objects
+            .filter(ground=ground, date__range=(start, end))
+            .values_list("date", "open_mask", "booked_mask", "blocked_mask")
+        )
+    }
+
+    states = []
+    d = start
+    while d <= end:
+        masks = stored.get(d) or (weekly.get(d.weekday(), full_mask), 0, 0)
+        states.append((d, *masks))
+        d += dt.timedelta(days=1)
+    return states
+
+
+def available_on_date_q(d):
+    """
+    Q expression that keeps grounds with at least one open slot that is
+    neither booked nor blocked on date d: one indexed lookup into SlotOccupancy plus a bitwise test,
+    falling back to the weekday mask when no row exists for that date.
+    """
+    occupancy = SlotOccupancy.objects.filter(ground=OuterRef("pk"), date=d)
+    has_free_slot = (
+        occupancy
+        .annotate(taken=F("open_mask").bitand(F("booked_mask").bitor(F("blocked_mask"))))
+        .exclude(taken=F("open_mask"))
+    )
+
+    weekly = WeeklySlotMask.objects.filter(ground=OuterRef("pk"), day_of_week=d.weekday())
+    weekly_open = Exists(weekly.exclude(open_mask=0)) | ~Exists(weekly)
+
+    return Exists(has_free_slot) | (~Exists(occupancy) & weekly_open)
+
+
+def bump_slots_version(*ground_ids):
+    """
+    Invalidate cached slot grids and refresh next_available_at; call after
+    the change has been written.
+    """
+    Ground.objects.filter(pk__in=ground_ids).update(
+        slots_version=F("slots_version") + 1,
+        updated_at=timezone.now(),
+    )
+    refresh_next_available(Ground.objects.filter(pk__in=ground_ids))
+
+
+def next_available_times(grounds, now=None):
+    """
+    Return {ground_id: datetime or None}: the start of each ground's first
+    free slot from `now` up to NEXT_AVAILABLE_HORIZON_DAYS ahead. Loads the
+    weekday masks and occupancy rows of all grounds in two queries.
+    """
+    now = timezone.localtime(now)
+    today = now.date()
+    last = today + dt.timedelta(days=NEXT_AVAILABLE_HORIZON_DAYS - 1)
+    ground_ids = [ground.pk for ground in grounds]
+
+    weekly = {
+        (ground_id, dow): mask
+        for ground_id, dow, mask in (
+            WeeklySlotMask.objects
+            .filter(ground_id__in=ground_ids)
+            .values_list("ground_id", "day_of_week", "open_mask")
+        )
+    }
+    stored = {
+        (ground_id, d): masks
+        for ground_id, d, *masks in (
+            SlotOccupancy.objects
+            .filter(ground_id__in=ground_ids, date__range=(today, last))
+            .values_list("ground_id", "date", "open_mask", "booked_mask", "blocked_mask")
+        )
+    }
+
+    result = {}
+    for ground in grounds:
+        grid = ground.slot_grid
+        result[ground.pk] = None
+        d = today
+        while d <= last and result[ground.pk] is None:
+            open_mask, booked_mask, blocked_mask = stored.get((ground.pk, d)) or (
+                weekly.get((ground.pk, d.weekday()), grid.full_mask), 0, 0,
+            )
+            for slot in set_bits(open_mask & ~(booked_mask | blocked_mask)):
+                start = grid.slots[slot][0]
+                if d > today or start > now.time():
+                    result[ground.pk] = timezone.make_aware(
+                        dt.datetime.combine(d, start), timezone.get_current_timezone()
+                    )
+                    break
+            d += dt.timedelta(days=1)
+    return result
+
+
+def refresh_next_available(grounds, now=None, batch_size=500):
+    """Recompute next_available_at for `grounds`, writing only changed rows. Returns the count."""
+    changed = []
+    batch = []
+    updated_at = timezone.now()
+
+    def flush():
+        times = next_available_times(batch, now)
+        for ground in batch:
+            if ground.next_available_at != times[ground.pk]:
+                ground.next_available_at = times[ground.pk]
+                ground.updated_at = updated_at
+                changed.append(ground)
+        batch.clear()
+
+    fields = ("id", "opens_at", "closes_at", "slot_minutes", "next_available_at")
+    for ground in grounds.only(*fields).iterator(chunk_size=batch_size):
+        batch.append(ground)
+        if len(batch) == batch_size:
+            flush()
+    if batch:
+        flush()
+
+    Ground.objects.bulk_update(changed, ["next_available_at", "updated_at"], batch_size=batch_size)
+    return len(changed)
+
+
+def integer(expression):
+    return Cast(expression, IntegerField())
+
+
+def opens_minute_expression():
+    # EXTRACT is numeric on PostgreSQL; the shifts and rounding divisions
+    # that use this need an integer.
+    return integer(ExtractHour("opens_at") * 60 + ExtractMinute("opens_at"))
+
+
+def window_mask_expression(start_time, end_time):
+    """
+    SQL twin of SlotGrid.window_mask evaluated against each ground's own
+    grid: slots lo..hi-1 where lo rounds the window start up to a slot
+    boundary and hi rounds the window end down.
+    """
+    def bigint(value):
+        return Cast(Value(value), BigIntegerField())
+
+    offset = opens_minute_expression()
+    before = Greatest(
+        Value(minute_of_day(start_time)) - offset, Value(0), output_field=IntegerField()
+    )
+    until = Greatest(
+        Value(minute_of_day(end_time)) - offset, Value(0), output_field=IntegerField()
+    )
+    lo = integer((before + F("slot_minutes") - 1) / F("slot_minutes"))
+    hi = integer(until / F("slot_minutes"))
+
+    return Greatest(
+        bigint(1).bitleftshift(hi) - bigint(1).bitleftshift(lo),
+        bigint(0),
+        output_field=BigIntegerField(),
+    ).bitand(F("slot_mask"))
+
+
+def free_mask_expression(d, window):
+    """
+    SQL expression for the free slots of the outer ground on date d inside
+    `window`: the stored occupancy row when there is one, else the weekday
+    mask, else every slot.
+    """
+    occupancy = (
+        SlotOccupancy.objects
+        .filter(ground=OuterRef("pk"), date=d)
+        .annotate(
+            # open & ~taken without XOR, which SQLite lacks.
+            free=F("open_mask") - F("open_mask").bitand(F("booked_mask").bitor(F("blocked_mask"))),
+        )
+        .values("free")[:1]
+    )
+    weekly = (
+        WeeklySlotMask.objects
+        .filter(ground=OuterRef("pk"), day_of_week=d.weekday())
+        .values("open_mask")[:1]
+    )
+    return Coalesce(
+        Subquery(occupancy),
+        Subquery(weekly),
+        F("slot_mask"),
+        output_field=BigIntegerField(),
+    ).bitand(window)
+
+
+def with_free_slots(grounds, dates, start_time, end_time, now=None):
+    """
+    Annotate grounds with free_0..free_n (one mask per date in `dates`,
+    limited to slots inside [start_time, end_time] that have not started
+    yet) and keep only grounds with a free slot on at least one of them.
+    Everything is evaluated in the grounds query itself. PENDING holds are
+    not in the occupancy masks; see bookings.holds.live_hold_masks.
+    """
+    now = timezone.localtime(now)
+    # Today only slots starting after the current minute are still bookable.
+    cutoff = minute_of_day(now) + 1
+
+    annotations = {}
+    for i, d in enumerate(dates):
+        window_start = start_time
+        if d == now.date():
+            window_start = max(start_time, time_from_minute(cutoff)) if cutoff < 24 * 60 else None
+
+        if d < now.date() or window_start is None:
+            annotations[f"free_{i}"] = Value(0, output_field=BigIntegerField())
+        else:
+            annotations[f"free_{i}"] = free_mask_expression(d, window_mask_expression(window_start, end_time))
+    has_free = Q()
+    for name in annotations:
+        has_free |= Q(**{f"{name}__gt": 0})
+    return grounds.annotate(**annotations).filter(has_free)
+
+
+def with_first_free_slot(grounds, days):
+    """
+    Annotate grounds from with_free_slots() with first_day and first_start:
+    the day index and start minute of their earliest free slot, so the
+    grounds query can be ordered by it.
+    """
+    def start_minute(mask):
+        lowest = mask.bitand(Value(0) - mask)
+        return opens_minute_expression() + integer(Round(Log(2, lowest))) * F("slot_minutes")
+
+    free = [(i, f"free_{i}") for i in range(days)]
+    return grounds.annotate(
+        first_day=Case(
+            *(When(**{f"{name}__gt": 0}, then=Value(i)) for i, name in free),
+            output_field=IntegerField(),
+        ),
+        first_start=Case(
+            *(When(**{f"{name}__gt": 0}, then=start_minute(F(name))) for _, name in free),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def set_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def first_free_slots(rows, limit, by_start=False):
+    """
+    Pick the first `limit` free slots. rows yields (row, grid, masks,
+    first_key) in the grounds query's order: by price, or by first_key
+    (first_day, first_start, price, pk) when by_start. masks are the
+    ground's per-day free masks. Returns (row, grid, day_index, slot_index)
+    tuples, ground by ground or earliest start first.
+
+    Rows are consumed lazily. By price, every slot of a ground comes before
+    the next ground's. By start, no slot of a later ground can sort before
+    its first_key, so reading stops once that passes the last kept slot.
+    """
+    found = []
+    for row, grid, masks, first_key in rows:
+        if by_start and len(found) >= limit:
+            found.sort(key=itemgetter(0))
+            del found[limit:]
+            if first_key > found[-1][0]:
+                break
+
+        for day, mask in enumerate(masks):
+            for slot in set_bits(mask):
+                key = (day, minute_of_day(grid.slots[slot][0]), *first_key[2:]) if by_start else None
+                found.append((key, row, grid, day, slot))
+
+        if not by_start and len(found) >= limit:
+            break
+
+    if by_start:
+        found.sort(key=itemgetter(0))
+    return [entry[1:] for entry in found[:limit]]
+
+
+def get_or_create_occupancy(ground, d):
+    row, _ = SlotOccupancy.objects.get_or_create(
+        ground=ground,
+        date=d,
+        defaults={"open_mask": weekly_open_mask(ground, d.weekday())},
+    )
+    return row
+
+
+def sync_booking_occupancy(booking, previous_status=None):
+    """
+    Apply a booking status change to its SlotOccupancy row. Only BOOKED
+    bookings occupy slots, so this sets bits when a booking becomes BOOKED
+    and clears them when it stops being BOOKED.
+    """
+    is_booked = booking.status == Booking.Status.BOOKED
+    was_booked = previous_status == Booking.Status.BOOKED
+
+    if is_booked == was_booked:
+        return
+
+    grid = booking.ground.slot_grid
+    mask = grid.range_mask(booking.start_time, booking.end_time)
+    if not mask:
+        return
+
+    if is_booked:
+        get_or_create_occupancy(booking.ground, booking.date)
+        new_value = F("booked_mask").bitor(mask)
+    else:
+        new_value = F("booked_mask").bitand(grid.full_mask ^ mask)
+
+    SlotOccupancy.objects.filter(
+        ground_id=booking.ground_id,
+        date=booking.date,
+    ).update(booked_mask=new_value)
+    bump_slots_version(booking.ground_id)
+
+
+def occupy_dates(ground, dates, start_time, end_time):
+    """
+    Mark the same slot range booked on many dates, for bookings created in
+    bulk: missing occupancy rows come from one INSERT and the bits are set
+    with one UPDATE.
+    """
+    mask = ground.slot_grid.range_mask(start_time, end_time)
+    if not (dates and mask):
+        return
+
+    weekly = dict(ground.weekly_slot_masks.values_list("day_of_week", "open_mask"))
+    SlotOccupancy.objects.bulk_create(
+        [
+            SlotOccupancy(
+                ground=ground,
+                date=d,
+                open_mask=weekly.get(d.weekday(), ground.slot_grid.full_mask),
+            )
+            for d in dates
+        ],
+        ignore_conflicts=True,
+    )
+    SlotOccupancy.objects.filter(ground=ground, date__in=dates).update(
+        booked_mask=F("booked_mask").bitor(mask)
+    )
+    bump_slots_version(ground.pk)
+
+
+def apply_availability_diff(ground, availability):
+    """
+    Make the stored windows for each submitted day match `availability`
+    (validated AvailabilityBulkUpsertSerializer data) by deleting and
+    inserting only the windows that differ. Call inside a transaction.
+    """
+    submitted = {
+        (day["day_of_week"], w["start_time"], w["end_time"])
+        for day in availability
+        for w in day["windows"]
+    }
+    days = {day["day_of_week"] for day in availability}
+
+    stored = {
+        (dow, start, end): pk
+        for pk, dow, start, end in (
+            GroundAvailability.objects
+            .select_for_update()
+            .filter(ground=ground, day_of_week__in=days)
+            .values_list("pk", "day_of_week", "start_time", "end_time")
+        )
+    }
+
+    to_delete = stored.keys() - submitted
+    to_create = submitted - stored.keys()
+
+    if to_delete:
+        GroundAvailability.objects.filter(pk__in=[stored[key] for key in to_delete]).delete()
+    GroundAvailability.objects.bulk_create([
+        GroundAvailability(ground=ground, day_of_week=dow, start_time=start, end_time=end)
+        for dow, start, end in sorted(to_create)
+    ])
+
+    changed_days = sorted({dow for dow, _, _ in to_delete | to_create})
+    if changed_days:
+        refresh_weekly_masks(ground, changed_days)
+
+    return {
+        "created": len(to_create),
+        "deleted": len(to_delete),
+        "unchanged": len(stored.keys() & submitted),
+        "changed_days": changed_days,
+    }
+
+
+def refresh_weekly_masks(ground, days):
+    """Recompile weekday masks for `days` and push them into stored dates."""
+    windows_by_day = {dow: [] for dow in days}
+    for dow, start, end in (
+        GroundAvailability.objects
+        .filter(ground=ground, day_of_week__in=days)
+        .values_list("day_of_week", "start_time", "end_time")
+    ):
+        windows_by_day[dow].append((start, end))
+
+    grid = ground.slot_grid
+    for dow, windows in windows_by_day.items():
+        mask = grid.open_mask(windows)
+        WeeklySlotMask.objects.update_or_create(
+            ground=ground,
+            day_of_week=dow,
+            defaults={"open_mask": mask},
+        )
+        SlotOccupancy.objects.filter(
+            ground=ground,
+            date__iso_week_day=dow + 1,
+        ).update(open_mask=mask)
+
+    bump_slots_version(ground.pk)
+
+
+def refresh_blocked_masks(ground, dates):
+    """Recompute blocked_mask for `dates`, creating occupancy rows as needed."""
+    dates = set(dates)
+    if not dates:
+        return
+
+    blocks = {}
+    for d, start, end in (
+        GroundBlock.objects
+        .filter(ground=ground, date__in=dates)
+        .values_list("date", "start_time", "end_time")
+    ):
+        blocks.setdefault(d, []).append((start, end))
+
+    rows = {row.date: row for row in SlotOccupancy.objects.filter(ground=ground, date__in=dates)}
+    weekly = dict(ground.weekly_slot_masks.values_list("day_of_week", "open_mask"))
+    grid = ground.slot_grid
+
+    to_create = []
+    to_update = []
+    for d in dates:
+        mask = grid.overlap_mask(blocks.get(d, []))
+        row = rows.get(d)
+        if row is None:
+            if mask:
+                to_create.append(SlotOccupancy(
+                    ground=ground,
+                    date=d,
+                    open_mask=weekly.get(d.weekday(), grid.full_mask),
+                    blocked_mask=mask,
+                ))
+        elif row.blocked_mask != mask:
+            row.blocked_mask = mask
+            to_update.append(row)
+
+    SlotOccupancy.objects.bulk_create(to_create)
+    SlotOccupancy.objects.bulk_update(to_update, ["blocked_mask", "updated_at"])
+    if to_create or to_update:
+        bump_slots_version(ground.pk)
+
+
+def reconcile_slot_occupancy(ground_ids=None, since=None, repair=False):
+    """
+    Recompute weekday masks and occupancy rows from GroundAvailability,
+    GroundBlock and BOOKED bookings. Returns a list of (kind, key, stored, expected) tuples
+    describing drift; rows are rewritten when repair=True.
+    """
+    grounds_qs = Ground.objects.all()
+    windows_qs = GroundAvailability.objects.all()
+    weekly_qs = WeeklySlotMask.objects.all()
+    occupancy_qs = SlotOccupancy.objects.all()
+    blocks_qs = GroundBlock.objects.all()
+    bookings_qs = Booking.objects.filter(status=Booking.Status.BOOKED)
+
+    if ground_ids is not None:
+        grounds_qs = grounds_qs.filter(pk__in=ground_ids)
+        windows_qs = windows_qs.filter(ground_id__in=ground_ids)
+        weekly_qs = weekly_qs.filter(ground_id__in=ground_ids)
+        occupancy_qs = occupancy_qs.filter(ground_id__in=ground_ids)
+        blocks_qs = blocks_qs.filter(ground_id__in=ground_ids)
+        bookings_qs = bookings_qs.filter(ground_id__in=ground_ids)
+
+    if since is not None:
+        occupancy_qs = occupancy_qs.filter(date__gte=since)
+        blocks_qs = blocks_qs.filter(date__gte=since)
+        bookings_qs = bookings_qs.filter(date__gte=since)
+
+    grids = {
+        pk: get_slot_grid(opens_at, closes_at, slot_minutes)
+        for pk, opens_at, closes_at, slot_minutes in grounds_qs.values_list(
+            "pk", "opens_at", "closes_at", "slot_minutes"
+        )
+    }
+
+    windows = {}
+    for ground_id, dow, start, end in windows_qs.values_list(
+        "ground_id", "day_of_week", "start_time", "end_time"
+    ):
+        windows.setdefault((ground_id, dow), []).append((start, end))
+
+    expected_weekly = {
+        key: grids[key[0]].open_mask(day_windows)
+        for key, day_windows in windows.items()
+    }
+    stored_weekly = {
+        (ground_id, dow): mask
+        for ground_id, dow, mask in weekly_qs.values_list("ground_id", "day_of_week", "open_mask")
+    }
+
+    drift = []
+    for key in stored_weekly.keys() | expected_weekly.keys():
+        full_mask = grids[key[0]].full_mask
+        stored = stored_weekly.get(key, full_mask)
+        expected = expected_weekly.get(key, full_mask)
+        if stored != expected:
+            drift.append(("weekly", key, stored, expected))
+
+    expected_booked = {}
+    for ground_id, d, start, end in bookings_qs.values_list(
+        "ground_id", "date", "start_time", "end_time"
+    ):
+        key = (ground_id, d)
+        mask = grids[ground_id].range_mask(start, end)
+        expected_booked[key] = expected_booked.get(key, 0) | mask
+
+    blocks = {}
+    for ground_id, d, start, end in blocks_qs.values_list(
+        "ground_id", "date", "start_time", "end_time"
+    ):
+        blocks.setdefault((ground_id, d), []).append((start, end))
+
+    expected_blocked = {
+        key: grids[key[0]].overlap_mask(day_blocks)
+        for key, day_blocks in blocks.items()
+    }
+
+    stored_rows = {
+        (ground_id, d): masks
+        for ground_id, d, *masks in occupancy_qs.values_list(
+            "ground_id", "date", "open_mask", "booked_mask", "blocked_mask"
+        )
+    }
+
+    for key in stored_rows.keys() | expected_booked.keys() | expected_blocked.keys():
+        ground_id, d = key
+        expected = [
+            expected_weekly.get((ground_id, d.weekday()), grids[ground_id].full_mask),
+            expected_booked.get(key, 0),
+            expected_blocked.get(key, 0),
+        ]
+        stored = stored_rows.get(key)
+        if stored != expected:
+            drift.append(("occupancy", key, stored, expected))
+
+    if repair:
+        for kind, key, _, expected in drift:
+            if kind == "weekly":
+                ground_id, dow = key
+                WeeklySlotMask.objects.update_or_create(
+                    ground_id=ground_id,
+                    day_of_week=dow,
+                    defaults={"open_mask": expected},
+                )
+            else:
+                ground_id, d = key
+                SlotOccupancy.objects.update_or_create(
+                    ground_id=ground_id,
+                    date=d,
+                    defaults={
+                        "open_mask": expected[0],
+                        "booked_mask": expected[1],
+                        "blocked_mask": expected[2],
+                    },
+                )
+
+        bump_slots_version(*{key[0] for _, key, _, _ in drift})
+
+    return drift
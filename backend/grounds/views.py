@@ -1,24 +1,64 @@
+import datetime as dt
+import os
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
-from django.utils.dateparse import parse_date
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_time
+from django.views.static import serve
 
 from rest_framework import permissions, status, viewsets
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.conditional import conditional_response
+from backend.params import parse_date_param
+from bookings.holds import live_hold_masks
 from bookings.models import Booking
 from bookings.serializers import BookingSerializer
-from .models import Ground, GroundAvailability
+from chat.utils import joined_group_ids
+from .models import Ground, GroundBlock
 from .serializers import (
     AvailabilityBulkUpsertSerializer,
+    GroundBlockBulkCreateSerializer,
+    GroundBlockSerializer,
     GroundCreateSerializer,
     GroundDetailSerializer,
     GroundListSerializer,
     OwnerGroundEditSerializer,
 )
-from .slot_constants import FIXED_SLOTS
+from .geo import filter_near, parse_near
+from .heatmap import occupancy_heatmap
+from .images import VARIANT_CACHE_CONTROL, VARIANT_ROOT, refresh_image_variants
+from .search import search_grounds
+from .slot_cache import get_slot_calendar, get_slots
+from .slot_grid import get_slot_grid
+from .utils import (
+    apply_availability_diff,
+    available_on_date_q,
+    bump_slots_version,
+    first_free_slots,
+    reconcile_slot_occupancy,
+    refresh_blocked_masks,
+    refresh_next_available,
+    with_first_free_slot,
+    with_free_slots,
+)
+
+
+MAX_CALENDAR_DAYS = 62
+MAX_SEARCH_DAYS = 7
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 200
+DEFAULT_NEAR_RADIUS_KM = 5
+MAX_NEAR_RADIUS_KM = 200
+DEFAULT_HEATMAP_DAYS = 90
+MAX_HEATMAP_DAYS = 1096
 
 
 class GroundViewSet(viewsets.ModelViewSet):
@@ -47,9 +87,11 @@ class GroundViewSet(viewsets.ModelViewSet):
         search = (params.get("search") or "").strip()
         max_price = (params.get("max_price") or "").strip()
         date_str = (params.get("date") or "").strip()
+        near = (params.get("near") or "").strip()
+        ordering = (params.get("ordering") or "").strip()
 
         if search:
-            qs = qs.filter(Q(name__icontains=search) | Q(location__icontains=search))
+            qs = search_grounds(qs, search)
 
         if max_price:
             try:
@@ -58,56 +100,52 @@ class GroundViewSet(viewsets.ModelViewSet):
                 pass
 
         if date_str:
-            d = parse_date(date_str)
-            if d:
-                dow = d.weekday()
-                keep_ids = []
-
-                for g in qs:
-                    windows = list(
-                        GroundAvailability.objects.filter(ground=g, day_of_week=dow)
-                    )
-
-                    def slot_open(start_str, end_str):
-                        if not windows:
-                            return True
-                        for w in windows:
-                            w_start = w.start_time.strftime("%H:%M")
-                            w_end = w.end_time.strftime("%H:%M")
-                            if w_start <= start_str and end_str <= w_end:
-                                return True
-                        return False
-
-                    bookings = Booking.objects.filter(
-                        ground=g,
-                        date=d,
-                        status=Booking.Status.BOOKED,
-                    )
-
-                    found_available = False
-                    for s, e in FIXED_SLOTS:
-                        start_str = s.strftime("%H:%M")
-                        end_str = e.strftime("%H:%M")
-
-                        is_booked = False
-                        for b in bookings:
-                            if s >= b.start_time and s < b.end_time:
-                                is_booked = True
-                                break
-
-                        if slot_open(start_str, end_str) and not is_booked:
-                            found_available = True
-                            break
+            try:
+                qs = qs.filter(available_on_date_q(parse_date_param(date_str)))
+            except ValueError:
+                pass
 
-                    if found_available:
-                        keep_ids.append(g.id)
+        point = parse_near(near) if near else None
+        if point:
+            try:
+                radius_km = float(params.get("radius_km") or DEFAULT_NEAR_RADIUS_KM)
+            except ValueError:
+                radius_km = DEFAULT_NEAR_RADIUS_KM
+            if radius_km <= 0:
+                radius_km = DEFAULT_NEAR_RADIUS_KM
+            radius_km = min(radius_km, MAX_NEAR_RADIUS_KM)
+            qs = filter_near(qs, *point, radius_km)
 
-                qs = qs.filter(id__in=keep_ids)
+        if ordering == "next_available":
+            # Grounds with no free slot inside the horizon have no value to sort by.
+            qs = qs.filter(next_available_at__isnull=False).order_by("next_available_at", "id")
 
         return qs
 
+    def list(self, request, *args, **kwargs):
+        # No Last-Modified: the max over the filtered rows stays put when a
+        # row leaves the filter, so only the ETag (which has the count) is safe.
+        stats = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+        )
+        return conditional_response(
+            request,
+            partial(super().list, request, *args, **kwargs),
+            (stats["count"], stats["last_modified"]),
+        )
+
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user, status=Ground.Status.PENDING)
+        ground = serializer.save(owner=self.request.user, status=Ground.Status.PENDING)
+        if ground.image:
+            refresh_image_variants(ground)
+        refresh_next_available(Ground.objects.filter(pk=ground.pk))
+
+    def perform_update(self, serializer):
+        ground = serializer.save()
+        if "image" in serializer.validated_data:
+            refresh_image_variants(ground)
 
 
 class OwnerMyGroundsView(APIView):
@@ -135,6 +173,19 @@ class OwnerGroundDetailUpdateView(APIView):
         serializer = OwnerGroundEditSerializer(ground, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def save(self, ground, serializer):
+        layout = (ground.opens_at, ground.closes_at, ground.slot_minutes)
+
+        with transaction.atomic():
+            serializer.save()
+            if (ground.opens_at, ground.closes_at, ground.slot_minutes) != layout:
+                # Stored masks are laid out on the old grid; rebuild them.
+                reconcile_slot_occupancy(ground_ids=[ground.pk], repair=True)
+
+        if "image" in serializer.validated_data:
+            refresh_image_variants(ground)
+        bump_slots_version(ground.pk)
+
     def patch(self, request, pk):
         print("PATCH DATA:", request.data)
         print("PATCH FILES:", request.FILES)
@@ -147,7 +198,7 @@ class OwnerGroundDetailUpdateView(APIView):
             context={"request": request},
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        self.save(ground, serializer)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request, pk):
@@ -162,7 +213,7 @@ class OwnerGroundDetailUpdateView(APIView):
             context={"request": request},
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        self.save(ground, serializer)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -174,7 +225,7 @@ class OwnerGroundBookingsView(APIView):
 
         bookings = (
             Booking.objects
-            .select_related("ground", "created_by")
+            .select_related("ground", "created_by", "chat_group")
             .filter(ground=ground)
             .order_by("-date", "-start_time")
         )
@@ -182,7 +233,7 @@ class OwnerGroundBookingsView(APIView):
         serializer = BookingSerializer(
             bookings,
             many=True,
-            context={"request": request}
+            context={"request": request, "joined_group_ids": joined_group_ids(request.user)}
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -202,33 +253,11 @@ class GroundAvailabilityBulkUpsertView(APIView):
         serializer = AvailabilityBulkUpsertSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        data = serializer.validated_data["availability"]
-
         with transaction.atomic():
-            days = [d["day_of_week"] for d in data]
-
-            GroundAvailability.objects.filter(
-                ground=ground,
-                day_of_week__in=days
-            ).delete()
-
-            to_create = []
-            for d in data:
-                dow = d["day_of_week"]
-                for w in d["windows"]:
-                    to_create.append(
-                        GroundAvailability(
-                            ground=ground,
-                            day_of_week=dow,
-                            start_time=w["start_time"],
-                            end_time=w["end_time"],
-                        )
-                    )
-
-            GroundAvailability.objects.bulk_create(to_create)
+            changes = apply_availability_diff(ground, serializer.validated_data["availability"])
 
         return Response(
-            {"detail": "Availability saved successfully."},
+            {"detail": "Availability saved successfully.", **changes},
             status=status.HTTP_200_OK
         )
 
@@ -240,7 +269,10 @@ class GroundSlotsForDateView(APIView):
         ground = get_object_or_404(Ground, pk=pk, status=Ground.Status.APPROVED)
 
         date_str = request.query_params.get("date")
-        d = parse_date(date_str) if date_str else None
+        try:
+            d = parse_date_param(date_str)
+        except ValueError:
+            d = None
 
         if not d:
             return Response(
@@ -248,53 +280,387 @@ class GroundSlotsForDateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        dow = d.weekday()
+        def build():
+            return Response(
+                {
+                    "ground_id": ground.id,
+                    "date": date_str,
+                    "slots": get_slots(ground, d),
+                },
+                status=status.HTTP_200_OK
+            )
 
-        windows = list(
-            GroundAvailability.objects.filter(ground=ground, day_of_week=dow)
+        # slots_version changes with every write that can affect the grid.
+        return conditional_response(
+            request,
+            build,
+            (ground.pk, d, ground.slots_version),
+            ground.updated_at,
         )
 
-        def within_availability(start_str, end_str):
-            if not windows:
-                return True
-            for w in windows:
-                w_start = w.start_time.strftime("%H:%M")
-                w_end = w.end_time.strftime("%H:%M")
-                if w_start <= start_str and end_str <= w_end:
-                    return True
-            return False
-
-        bookings = Booking.objects.filter(
-            ground=ground,
-            date=d,
-            status=Booking.Status.BOOKED,
-        )
 
-        slots = []
-        for s, e in FIXED_SLOTS:
-            start_str = s.strftime("%H:%M")
-            end_str = e.strftime("%H:%M")
+class GroundSlotCalendarView(APIView):
+    permission_classes = [permissions.AllowAny]
 
-            open_ = within_availability(start_str, end_str)
+    def get(self, request, pk):
+        ground = get_object_or_404(Ground, pk=pk, status=Ground.Status.APPROVED)
 
-            is_booked = False
-            for b in bookings:
-                if s >= b.start_time and s < b.end_time:
-                    is_booked = True
-                    break
+        try:
+            start = parse_date_param(request.query_params.get("from"))
+            end = parse_date_param(request.query_params.get("to"))
+        except ValueError:
+            start = end = None
 
-            slots.append({
-                "start_time": start_str,
-                "end_time": end_str,
-                "booked": bool(is_booked),
-                "available": bool(open_ and not is_booked),
-            })
+        if not (start and end):
+            return Response(
+                {"detail": "from=YYYY-MM-DD and to=YYYY-MM-DD are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end < start:
+            return Response(
+                {"detail": "to must not be before from."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if (end - start).days >= MAX_CALENDAR_DAYS:
+            return Response(
+                {"detail": f"Date range cannot exceed {MAX_CALENDAR_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        days = [
+            {
+                "date": d.isoformat(),
+                "slots": slots,
+            }
+            for d, slots in get_slot_calendar(ground, start, end)
+        ]
 
         return Response(
             {
                 "ground_id": ground.id,
-                "date": date_str,
-                "slots": slots,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "days": days,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class GroundOccupancyHeatmapView(APIView):
+    """
+    Day-of-week x slot occupancy for one ground (?ground=) or all of an
+    owner's grounds. Staff may pass ?owner= to view any owner's grounds.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+
+        try:
+            end = parse_date_param(params.get("to")) or dt.date.today()
+            start = parse_date_param(params.get("from"))
+        except ValueError:
+            start = end = None
+        if end and not params.get("from"):
+            start = end - dt.timedelta(days=DEFAULT_HEATMAP_DAYS - 1)
+
+        if not (start and end):
+            return Response(
+                {"detail": "from and to must be YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end < start:
+            return Response(
+                {"detail": "to must not be before from."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if (end - start).days >= MAX_HEATMAP_DAYS:
+            return Response(
+                {"detail": f"Date range cannot exceed {MAX_HEATMAP_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ground_id = params.get("ground")
+        owner_id = params.get("owner")
+        if not all(value.isdigit() for value in (ground_id, owner_id) if value is not None):
+            return Response(
+                {"detail": "ground and owner must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        grounds = Ground.objects.all()
+        if request.user.is_staff:
+            if ground_id is None and owner_id is None:
+                return Response(
+                    {"detail": "ground or owner is required."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if owner_id is not None:
+                grounds = grounds.filter(owner_id=owner_id)
+        else:
+            grounds = grounds.filter(owner=request.user)
+
+        if ground_id is not None:
+            grounds = grounds.filter(pk=get_object_or_404(grounds, pk=ground_id).pk)
+
+        return Response(
+            {
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                **occupancy_heatmap(grounds, start, end),
             },
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+class GroundFreeSlotSearchView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+
+        date_str = params.get("date")
+        from_str = params.get("from") or date_str
+        to_str = params.get("to") or date_str
+        try:
+            start = parse_date_param(from_str)
+            end = parse_date_param(to_str)
+        except ValueError:
+            start = end = None
+
+        if not (start and end):
+            return Response(
+                {"detail": "date=YYYY-MM-DD or from=YYYY-MM-DD&to=YYYY-MM-DD is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end < start:
+            return Response(
+                {"detail": "to must not be before from."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if (end - start).days >= MAX_SEARCH_DAYS:
+            return Response(
+                {"detail": f"Date range cannot exceed {MAX_SEARCH_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start_time = parse_time(params.get("start_time") or "00:00")
+            end_time = parse_time(params.get("end_time") or "23:59")
+        except ValueError:
+            start_time = end_time = None
+
+        if not (start_time and end_time):
+            return Response(
+                {"detail": "start_time and end_time must be HH:MM."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sort = params.get("sort") or "price"
+        if sort not in {"price", "start"}:
+            return Response(
+                {"detail": "sort must be 'price' or 'start'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        grounds = Ground.objects.filter(status=Ground.Status.APPROVED)
+
+        max_price = (params.get("max_price") or "").strip()
+        if max_price:
+            try:
+                grounds = grounds.filter(price_per_hour__lte=int(max_price))
+            except ValueError:
+                return Response(
+                    {"detail": "max_price must be a number."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        ground_size = params.get("ground_size")
+        if ground_size:
+            if ground_size not in Ground.Size.values:
+                return Response(
+                    {"detail": f"ground_size must be one of {', '.join(Ground.Size.values)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            grounds = grounds.filter(ground_size=ground_size)
+
+        try:
+            limit = min(int(params.get("limit") or DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT)
+        except ValueError:
+            limit = DEFAULT_SEARCH_LIMIT
+        limit = max(limit, 1)
+
+        dates = [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+        free = [f"free_{i}" for i in range(len(dates))]
+        fields = [
+            "id",
+            "name",
+            "location",
+            "price_per_hour",
+            "ground_size",
+            "opens_at",
+            "closes_at",
+            "slot_minutes",
+            *free,
+        ]
+
+        # One query either way: by price, or by each ground's first free
+        # slot across every date. Grounds are streamed and read only until
+        # the page is settled.
+        matching = with_free_slots(grounds, dates, start_time, end_time)
+        if sort == "start":
+            matching = with_first_free_slot(matching, len(dates)).order_by(
+                "first_day", "first_start", "price_per_hour", "pk"
+            )
+            fields += ["first_day", "first_start"]
+        else:
+            matching = matching.order_by("price_per_hour", "pk")
+
+        def candidates():
+            rows = matching.values_list(*fields).iterator(chunk_size=limit)
+            while chunk := list(islice(rows, limit)):
+                # Live holds are not in the occupancy masks; drop their slots.
+                held = live_hold_masks([row[0] for row in chunk], dates)
+                for row in chunk:
+                    masks = [
+                        mask & ~held.get((row[0], d), 0)
+                        for d, mask in zip(dates, row[8:8 + len(dates)])
+                    ]
+                    first_key = (*row[8 + len(dates):], row[3], row[0]) if sort == "start" else None
+                    yield row, get_slot_grid(*row[5:8]), masks, first_key
+
+        results = []
+        for row, grid, day, slot in first_free_slots(candidates(), limit, by_start=sort == "start"):
+            ground_id, name, location, price, size = row[:5]
+            start_label, end_label = grid.labels[slot]
+            results.append({
+                "ground_id": ground_id,
+                "ground_name": name,
+                "location": location,
+                "price_per_hour": price,
+                "ground_size": size,
+                "date": dates[day].isoformat(),
+                "start_time": start_label,
+                "end_time": end_label,
+            })
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class GroundBlockListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        ground = get_object_or_404(Ground, pk=pk, owner=request.user)
+
+        blocks = GroundBlock.objects.filter(ground=ground)
+
+        try:
+            start = parse_date_param(request.query_params.get("from"))
+            end = parse_date_param(request.query_params.get("to"))
+        except ValueError:
+            return Response(
+                {"detail": "from and to must be YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if start:
+            blocks = blocks.filter(date__gte=start)
+        if end:
+            blocks = blocks.filter(date__lte=end)
+
+        serializer = GroundBlockSerializer(blocks, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class GroundBlockBulkCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        ground = get_object_or_404(Ground, pk=pk)
+
+        if ground.owner_id != request.user.pk:
+            return Response(
+                {"detail": "Not allowed."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = GroundBlockBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        days_of_week = set(data.get("days_of_week") or range(7))
+        dates = []
+        d = data["start_date"]
+        while d <= data["end_date"]:
+            if d.weekday() in days_of_week:
+                dates.append(d)
+            d += dt.timedelta(days=1)
+
+        with transaction.atomic():
+            existing = set(
+                GroundBlock.objects
+                .filter(ground=ground, date__in=dates)
+                .values_list("date", "start_time", "end_time")
+            )
+
+            to_create = []
+            for d in dates:
+                for w in data["windows"]:
+                    key = (d, w["start_time"], w["end_time"])
+                    if key in existing:
+                        continue
+                    existing.add(key)
+                    to_create.append(
+                        GroundBlock(
+                            ground=ground,
+                            date=d,
+                            start_time=w["start_time"],
+                            end_time=w["end_time"],
+                            reason=data["reason"],
+                        )
+                    )
+
+            GroundBlock.objects.bulk_create(to_create)
+            refresh_blocked_masks(ground, {block.date for block in to_create})
+
+        return Response(
+            {
+                "detail": "Blocks saved successfully.",
+                "created": len(to_create),
+                "dates": sorted({block.date.isoformat() for block in to_create}),
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class GroundBlockDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, pk, block_id):
+        block = get_object_or_404(
+            GroundBlock,
+            pk=block_id,
+            ground_id=pk,
+            ground__owner=request.user,
+        )
+
+        with transaction.atomic():
+            block.delete()
+            refresh_blocked_masks(block.ground, [block.date])
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def serve_image_variant(request, path):
+    """Serve a content-addressed image variant with far-future cache headers."""
+    response = serve(request, path, document_root=os.path.join(settings.MEDIA_ROOT, VARIANT_ROOT))
+    patch_cache_control(response, **VARIANT_CACHE_CONTROL)
+    return response
@@ -7,6 +7,7 @@ from rest_framework.test import APITestCase
 
 from authapp.models import User
 from bookings.models import Booking
+from bookings.tests import BookingTestBase
 from grounds.models import Ground
 from payments.views import create_booking_from_intent, payment_cache_key
 from chat.models import ChatGroup
@@ -180,4 +181,35 @@ class PaymentIntentFailureTests(TestCase):
         self.assertIsNone(booking)
         self.assertEqual(result, "intent_not_found")
 
-        
\ No newline at end of file
+
+class PaymentIntentSlotTakenTests(BookingTestBase):
+    prefix = "taken"
+
+    # TC-PF-03
+    def test_intent_for_taken_range_reports_slot_taken(self):
+        Booking.objects.create(
+            ground=self.ground,
+            date="2026-04-12",
+            start_time="07:00",
+            end_time="09:00",
+            player=self.owner,
+            status=Booking.Status.BOOKED,
+        )
+        cache.set(payment_cache_key("taken-tx"), {
+            "ground_id": self.ground.pk,
+            "date": "2026-04-12",
+            "start_time": "08:00",
+            "end_time": "10:00",
+            "user_id": self.player.pk,
+            "booking_type": "CLOSED",
+            "required_players": 1,
+            "open_game_note": "",
+            "total_amount": "2000",
+        })
+
+        booking, result = create_booking_from_intent("taken-tx", "TEST123")
+
+        self.assertIsNone(booking)
+        self.assertEqual(result, "slot_taken")
+        self.assertIsNone(cache.get(payment_cache_key("taken-tx")))
+        self.assertEqual(Booking.objects.filter(ground=self.ground).count(), 1)
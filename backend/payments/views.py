@@ -3,16 +3,26 @@ from decimal import Decimal, InvalidOperation
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 from django.http import HttpResponseRedirect
-from django.utils.dateparse import parse_date, parse_time
+from django.utils.dateparse import parse_time
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
 
+from backend.params import parse_date_param
+from bookings.availability import (
+    SlotTaken,
+    create_booking,
+    is_bookable_range,
+    overlapping_bookings,
+)
+from bookings.holds import confirm_hold, promoted_holds
 from bookings.models import Booking
+from bookings.rollups import apply_booking_rollup
 from grounds.models import Ground
-from grounds.slot_constants import FIXED_SLOTS
+from grounds.utils import sync_booking_occupancy
 from chat.utils import create_temporary_chat_for_booking
 from connections.models import ConnectionNotification
 from connections.utils import create_notification
@@ -27,25 +37,6 @@ from .utils import (
 CACHE_TIMEOUT_SECONDS = 60 * 30  # 30 minutes
 
 
-def is_valid_multi_slot(start_time, end_time):
-    slots = list(FIXED_SLOTS)
-
-    start_indexes = [i for i, (s, _) in enumerate(slots) if s == start_time]
-    end_indexes = [i for i, (_, e) in enumerate(slots) if e == end_time]
-
-    if not start_indexes or not end_indexes:
-        return False
-
-    start_idx = start_indexes[0]
-    end_idx = end_indexes[0]
-
-    if end_idx < start_idx:
-        return False
-
-    slot_count = end_idx - start_idx + 1
-    return 1 <= slot_count <= 5
-
-
 def payment_cache_key(tx_uuid: str) -> str:
     return f"esewa_booking_intent:{tx_uuid}"
 
@@ -79,7 +70,7 @@ def create_booking_from_intent(transaction_uuid: str, transaction_code: str = ""
         print("========== CREATE BOOKING FROM INTENT END ==========\n")
         return None, "ground_not_found"
 
-    d = parse_date(intent["date"])
+    d = parse_date_param(intent["date"])
     start_t = parse_time(intent["start_time"])
     end_t = parse_time(intent["end_time"])
     user_id = intent["user_id"]
@@ -98,20 +89,6 @@ def create_booking_from_intent(transaction_uuid: str, transaction_code: str = ""
     print("required_players:", required_players)
     print("payment_mode:", payment_mode)
 
-    overlap = Booking.objects.filter(
-        ground=ground,
-        date=d,
-        status=Booking.Status.BOOKED,
-        start_time__lt=end_t,
-        end_time__gt=start_t,
-    ).exists()
-
-    if overlap:
-        print("Overlap found -> slot already taken")
-        cache.delete(payment_cache_key(transaction_uuid))
-        print("========== CREATE BOOKING FROM INTENT END ==========\n")
-        return None, "slot_taken"
-
     existing = Booking.objects.filter(transaction_uuid=transaction_uuid).first()
     if existing:
         print("Booking already exists with transaction_uuid:", transaction_uuid)
@@ -126,32 +103,51 @@ def create_booking_from_intent(transaction_uuid: str, transaction_code: str = ""
     if paid_amount is None:
         paid_amount = Decimal(str(intent["total_amount"]))
 
+    booking_fields = {
+        "source": Booking.Source.ONLINE,
+        "payment_mode": payment_mode,
+        "status": Booking.Status.BOOKED,
+        "booking_type": booking_type,
+        "current_players": 1,
+        "required_players": required_players if str(booking_type).upper() == "OPEN" else 1,
+        "open_game_note": open_game_note if str(booking_type).upper() == "OPEN" else "",
+        "transaction_uuid": transaction_uuid,
+        "transaction_code": transaction_code,
+        "paid_amount": Decimal(str(paid_amount)),
+    }
+
     try:
-        booking = Booking.objects.create(
-            ground=ground,
-            date=d,
-            start_time=start_t,
-            end_time=end_t,
-            player_id=user_id,
-            created_by_id=user_id,
-            source=Booking.Source.ONLINE,
-            payment_mode=payment_mode,
-            status=Booking.Status.BOOKED,
-            booking_type=booking_type,
-            current_players=1,
-            required_players=required_players if str(booking_type).upper() == "OPEN" else 1,
-            open_game_note=open_game_note if str(booking_type).upper() == "OPEN" else "",
-            transaction_uuid=transaction_uuid,
-            transaction_code=transaction_code,
-            paid_amount=Decimal(str(paid_amount)),
-        )
+        with transaction.atomic():
+            # A waitlist hold the player has on this range becomes the
+            # paid booking.
+            hold = promoted_holds(user_id, ground, d, start_t, end_t).select_for_update().first()
+            if hold is not None:
+                booking = confirm_hold(hold, **booking_fields)
+            else:
+                booking = create_booking(
+                    ground=ground,
+                    date=d,
+                    start_time=start_t,
+                    end_time=end_t,
+                    player_id=user_id,
+                    created_by_id=user_id,
+                    **booking_fields,
+                )
         print("Booking created successfully -> booking.id:", booking.id)
+    except SlotTaken:
+        print("Overlap found -> slot already taken")
+        cache.delete(payment_cache_key(transaction_uuid))
+        print("========== CREATE BOOKING FROM INTENT END ==========\n")
+        return None, "slot_taken"
     except Exception as e:
         print("BOOKING CREATE ERROR:", str(e))
         cache.delete(payment_cache_key(transaction_uuid))
         print("========== CREATE BOOKING FROM INTENT END ==========\n")
         return None, "create_failed"
 
+    sync_booking_occupancy(booking)
+    apply_booking_rollup(booking)
+
     try:
         if str(booking.booking_type).upper() == "OPEN":
             create_temporary_chat_for_booking(booking)
@@ -214,14 +210,17 @@ class EsewaInitiateView(APIView):
         except Ground.DoesNotExist:
             return Response({"detail": "Ground not found."}, status=404)
 
-        d = parse_date(date_str)
-        start_t = parse_time(start_str)
-        end_t = parse_time(end_str)
+        try:
+            d = parse_date_param(date_str)
+            start_t = parse_time(start_str or "")
+            end_t = parse_time(end_str or "")
+        except ValueError:
+            d = start_t = end_t = None
 
         if not (d and start_t and end_t):
             return Response({"detail": "Invalid date/time."}, status=400)
 
-        if not is_valid_multi_slot(start_t, end_t):
+        if not is_bookable_range(ground.slot_grid, start_t, end_t):
             return Response({"detail": "Invalid slot."}, status=400)
 
         if booking_type not in [Booking.BookingType.OPEN, Booking.BookingType.CLOSED]:
@@ -250,12 +249,11 @@ class EsewaInitiateView(APIView):
         except (InvalidOperation, TypeError, ValueError):
             return Response({"detail": "Invalid total amount."}, status=400)
 
-        overlap = Booking.objects.filter(
-            ground=ground,
-            date=d,
-            status=Booking.Status.BOOKED,
-            start_time__lt=end_t,
-            end_time__gt=start_t,
+        # Advisory only: the booking is created after payment, where the
+        # database has the final say.
+        # The player's own waitlist hold on the range is what they are paying for.
+        overlap = overlapping_bookings(ground, d, start_t, end_t).exclude(
+            pk__in=promoted_holds(request.user.pk, ground, d, start_t, end_t)
         ).exists()
 
         if overlap: